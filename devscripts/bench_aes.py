@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+Benchmark the throughput of the native AES-CBC decryption.
+Compares the table-driven decryptor with the reference implementation
+"""
+
+# Allow direct execution
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+import argparse
+import time
+
+from yt_dlp.aes import _AESCBCDecryptor, aes_cbc_decrypt
+
+KEY_SIZES = (16, 24, 32)
+
+
+def benchmark(name, func, size):
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    print(f'{name}: {size / 1024:.0f} KiB in {elapsed:.2f}s ({size / 1024 / elapsed:.0f} KiB/sec)')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--size', type=int, default=256, help='Size of the data to decrypt in KiB (default: %(default)s)')
+    parser.add_argument('--key-sizes', nargs='+', type=int, choices=KEY_SIZES, default=[16], help='Key sizes in bytes (default: 16)')
+    args = parser.parse_args()
+
+    data = bytes(range(256)) * (args.size * 4)
+    iv = bytes(16)
+    for key_size in args.key_sizes:
+        key = bytes(range(key_size))
+        benchmark(f'table-driven AES-{key_size * 8}', lambda: _AESCBCDecryptor(key, iv).decrypt(data), len(data))
+        benchmark(f'reference AES-{key_size * 8}', lambda: aes_cbc_decrypt(list(data), list(key), list(iv)), len(data))
+
+
+if __name__ == '__main__':
+    main()
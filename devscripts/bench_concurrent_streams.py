@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Benchmark the time taken to download a video made of separate video and audio formats
+and a subtitle from a loopback server, which throttles each connection like a CDN would
+"""
+
+# Allow direct execution
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+import argparse
+import http.server
+import tempfile
+import threading
+import time
+
+from yt_dlp import YoutubeDL
+from yt_dlp.utils import parse_bytes
+
+CHUNK = os.urandom(64 * 1024)
+
+
+class HTTPRequestHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        size = self.server.sizes[self.path]
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/octet-stream')
+        self.send_header('Content-Length', str(size))
+        self.end_headers()
+        while size > 0:
+            self.wfile.write(CHUNK[:size])
+            size -= len(CHUNK)
+            time.sleep(len(CHUNK) / self.server.rate)
+
+
+def benchmark(name, base_url, params):
+    info = {
+        'id': 'video', 'title': 'video', 'ext': 'mp4', 'format_id': 'video+audio',
+        'webpage_url': base_url, 'extractor': 'generic', 'extractor_key': 'Generic',
+        'requested_formats': [
+            {'format_id': 'video', 'url': f'{base_url}/video', 'ext': 'mp4', 'protocol': 'http',
+             'vcodec': 'avc1', 'acodec': 'none'},
+            {'format_id': 'audio', 'url': f'{base_url}/audio', 'ext': 'm4a', 'protocol': 'http',
+             'vcodec': 'none', 'acodec': 'mp4a'},
+        ],
+        'requested_subtitles': {'en': {'url': f'{base_url}/subtitle', 'ext': 'vtt', 'protocol': 'http'}},
+    }
+    with tempfile.TemporaryDirectory() as tmpdir:
+        ydl = YoutubeDL({
+            'quiet': True, 'no_warnings': True, 'noprogress': True, 'writesubtitles': True,
+            # The formats are not merged, so that only the downloads are timed
+            'allow_unplayable_formats': True,
+            'outtmpl': os.path.join(tmpdir, '%(id)s.%(ext)s'),
+            **params,
+        })
+        start = time.perf_counter()
+        ydl.process_info(info)
+        elapsed = time.perf_counter() - start
+        size = sum(os.path.getsize(os.path.join(tmpdir, file)) for file in os.listdir(tmpdir))
+    print(f'{name}: {size / 2 ** 20:.0f} MiB in {elapsed:.2f}s ({size / 2 ** 20 / elapsed:.1f} MiB/sec)')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--video-size', type=int, default=24, help='Size of the video format in MiB (default: %(default)s)')
+    parser.add_argument('--audio-size', type=int, default=8, help='Size of the audio format in MiB (default: %(default)s)')
+    parser.add_argument('--subtitle-size', type=int, default=4, help='Size of the subtitle in MiB (default: %(default)s)')
+    parser.add_argument('--rate', type=float, default=8, help='Speed of each connection in MiB/sec (default: %(default)s)')
+    parser.add_argument('--limit-rate', help='--limit-rate to download with (default: none)')
+    args = parser.parse_args()
+
+    httpd = http.server.ThreadingHTTPServer(('127.0.0.1', 0), HTTPRequestHandler)
+    httpd.rate = args.rate * 2 ** 20
+    httpd.sizes = {
+        '/video': args.video_size * 2 ** 20,
+        '/audio': args.audio_size * 2 ** 20,
+        '/subtitle': args.subtitle_size * 2 ** 20,
+    }
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    base_url = f'http://127.0.0.1:{httpd.server_address[1]}'
+
+    params = {'ratelimit': parse_bytes(args.limit_rate) if args.limit_rate else None}
+
+    benchmark('sequential', base_url, params)
+    benchmark('--concurrent-streams 3', base_url, {**params, 'concurrent_streams': 3})
+    httpd.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Benchmark how many webpages/sec are searched for embeds by the generic extractor.
+Compares skipping the _EMBED_REGEX whose literal is not in the webpage with running all of them
+"""
+
+# Allow direct execution
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+import argparse
+import time
+
+from yt_dlp import YoutubeDL
+
+
+def load_webpages(paths):
+    for path in paths:
+        if os.path.isdir(path):
+            yield from load_webpages(sorted(os.path.join(path, name) for name in os.listdir(path)))
+        elif os.path.isfile(path):
+            with open(path, encoding='utf-8', errors='replace') as f:
+                yield path, f.read()
+
+
+def benchmark(name, ie, webpages, repeat):
+    results = {}
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for path, webpage in webpages:
+            results[path] = ie._extract_embeds('https://example.com/', webpage)
+    elapsed = time.perf_counter() - start
+    count = len(webpages) * repeat
+    print(f'{name}: {count} webpages in {elapsed:.2f}s ({count / elapsed:.1f} webpages/sec)')
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('paths', nargs='+', metavar='PATH', help='Saved webpages, or directories of them')
+    parser.add_argument('--repeat', type=int, default=3, help='Number of times to search each webpage (default: %(default)s)')
+    args = parser.parse_args()
+
+    webpages = list(load_webpages(args.paths))
+    if not webpages:
+        parser.error('No webpages found')
+    print(f'Loaded {len(webpages)} webpages ({sum(len(webpage) for _, webpage in webpages) / 1e6:.1f}M characters)')
+
+    ydl = YoutubeDL({'quiet': True})
+    ie = ydl.get_info_extractor('Generic')
+    ie._extract_embeds('https://example.com/', '')  # Compile the regexes
+    filtered = benchmark('Filtered', ie, webpages, args.repeat)
+
+    for extractor in ydl._ies.values():
+        extractor = getattr(extractor, 'real_class', extractor)
+        if '_EMBED_URL_LITERALS' in extractor.__dict__:
+            extractor._EMBED_URL_LITERALS = (None,) * len(extractor._EMBED_URL_LITERALS)
+    unfiltered = benchmark('Unfiltered', ie, webpages, args.repeat)
+
+    for path, _ in webpages:
+        if [e.get('url') for e in filtered[path]] != [e.get('url') for e in unfiltered[path]]:
+            print(f'Different embeds found in {path}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Benchmark how many URLs/sec are resolved to their extractor, as done for a batch file.
+Compares the indexed dispatch with a linear scan over all extractors
+"""
+
+# Allow direct execution
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+import argparse
+import itertools
+import time
+
+from test.helper import gettestcases
+from yt_dlp import YoutubeDL
+
+
+def benchmark(name, urls, resolve):
+    start = time.perf_counter()
+    for url in urls:
+        resolve(url)
+    elapsed = time.perf_counter() - start
+    print(f'{name}: {len(urls)} URLs in {elapsed:.2f}s ({len(urls) / elapsed:.0f} URLs/sec)')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--count', type=int, default=100_000, help='Number of URLs (default: %(default)s)')
+    parser.add_argument('--skip-linear', action='store_true', help='Do not benchmark the linear scan')
+    args = parser.parse_args()
+
+    urls = list(itertools.islice(itertools.cycle({tc['url'] for tc in gettestcases(True)}), args.count))
+    ydl = YoutubeDL({'quiet': True})
+
+    start = time.perf_counter()
+    ydl._ies_scanned = True
+    next(ydl._suitable_ies(urls[0]))
+    print(f'Built the index of {len(ydl._ies)} extractors in {time.perf_counter() - start:.2f}s')
+
+    benchmark('Indexed', urls, lambda url: next(ydl._suitable_ies(url), None))
+    if not args.skip_linear:
+        benchmark('Linear', urls, lambda url: next((key for key, ie in ydl._ies.items() if ie.suitable(url)), None))
+
+
+if __name__ == '__main__':
+    main()
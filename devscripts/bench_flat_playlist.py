@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Benchmark the memory use and entries/sec of --flat-playlist --dump-json on a synthetic playlist.
+Compares streaming the entries (--lazy-playlist) with processing the whole playlist
+"""
+
+# Allow direct execution
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+import argparse
+import subprocess
+import time
+
+from yt_dlp import YoutubeDL
+from yt_dlp.extractor.common import InfoExtractor
+
+MODES = {
+    'stream': {'lazy_playlist': True, 'stream_playlist': True},
+    'lazy': {'lazy_playlist': True},
+    'default': {},
+}
+
+
+class SyntheticPlaylistIE(InfoExtractor):
+    _VALID_URL = r'synthetic:(?P<count>\d+)'
+
+    def _real_extract(self, url):
+        count = int(self._match_valid_url(url).group('count'))
+        return self.playlist_result((self.url_result(
+            f'https://example.com/video/{i}', 'Generic', f'video{i}', f'Video {i}',
+            duration=i % 3600, view_count=i * 7, description=f'The description of video {i}',
+        ) for i in range(count)), 'synthetic', 'Synthetic playlist')
+
+
+def run(mode, count):
+    import resource
+
+    ydl = YoutubeDL({
+        'quiet': True,
+        'simulate': True,
+        'extract_flat': 'in_playlist',
+        'forcejson': True,
+        **MODES[mode],
+    })
+    ydl.add_info_extractor(SyntheticPlaylistIE())
+    start = time.perf_counter()
+    with open(os.devnull, 'w') as devnull:
+        ydl._out_files.out = devnull
+        ydl.extract_info(f'synthetic:{count}', ie_key='SyntheticPlaylist')
+    elapsed = time.perf_counter() - start
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f'{mode}: {count} entries in {elapsed:.2f}s ({count / elapsed:.0f} entries/sec), max RSS {max_rss:.0f} MiB')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--entries', type=int, default=1_000_000, help='Number of playlist entries (default: %(default)s)')
+    parser.add_argument('--modes', nargs='+', choices=MODES, default=list(MODES), help='Modes to compare (default: all)')
+    parser.add_argument('--run', choices=MODES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run:
+        run(args.run, args.entries)
+        return
+    # Each mode runs in a new process so that their memory use can be compared
+    for mode in args.modes:
+        subprocess.run([sys.executable, __file__, '--run', mode, '--entries', str(args.entries)], check=True)
+
+
+if __name__ == '__main__':
+    main()
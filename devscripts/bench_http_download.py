@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Benchmark the throughput of the native HTTP downloader against a loopback server.
+Compares reading into a reusable buffer with reading a new bytes object for every block
+"""
+
+# Allow direct execution
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+import argparse
+import http.server
+import tempfile
+import threading
+import time
+
+from yt_dlp import YoutubeDL
+from yt_dlp.downloader.http import HttpFD
+from yt_dlp.networking._urllib import UrllibResponseAdapter
+from yt_dlp.networking.common import Response
+from yt_dlp.utils import parse_bytes
+
+CHUNK = os.urandom(1024 * 1024)
+
+
+class HTTPRequestHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        size = self.server.size
+        self.send_response(200)
+        self.send_header('Content-Type', 'video/mp4')
+        self.send_header('Content-Length', str(size))
+        self.end_headers()
+        while size > 0:
+            self.wfile.write(CHUNK[:size])
+            size -= len(CHUNK)
+
+
+def benchmark(name, url, params, repeat):
+    ydl = YoutubeDL({'quiet': True, 'noprogress': True, **params})
+    downloader = HttpFD(ydl, ydl.params)
+    best = None
+    with tempfile.TemporaryDirectory() as tmpdir:
+        filename = os.path.join(tmpdir, 'file.mp4')
+        for _ in range(repeat):
+            start = time.perf_counter()
+            assert downloader.download(filename, {'url': url})[0]
+            elapsed = time.perf_counter() - start
+            best = min(best or elapsed, elapsed)
+            size = os.path.getsize(filename)
+            os.remove(filename)
+    print(f'{name}: {size / 2 ** 20:.0f} MiB in {best:.2f}s ({size / 2 ** 20 / best:.0f} MiB/sec)')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--size', type=int, default=1024, help='Size of the download in MiB (default: %(default)s)')
+    parser.add_argument('--repeat', type=int, default=3, help='Number of downloads; the fastest is reported (default: %(default)s)')
+    parser.add_argument('--buffer-size', default='1024', help='--buffer-size to download with (default: %(default)s)')
+    parser.add_argument('--no-resize-buffer', action='store_true', help='Do not resize the buffer during the download')
+    args = parser.parse_args()
+
+    httpd = http.server.ThreadingHTTPServer(('127.0.0.1', 0), HTTPRequestHandler)
+    httpd.size = args.size * 2 ** 20
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    url = f'http://127.0.0.1:{httpd.server_address[1]}/file.mp4'
+    params = {
+        'buffersize': parse_bytes(args.buffer_size),
+        'noresizebuffer': args.no_resize_buffer,
+    }
+
+    benchmark('readinto', url, params, args.repeat)
+    readinto = UrllibResponseAdapter.readinto
+    UrllibResponseAdapter.readinto = Response.readinto  # Copies the result of read() into the buffer
+    try:
+        benchmark('read', url, params, args.repeat)
+    finally:
+        UrllibResponseAdapter.readinto = readinto
+    httpd.shutdown()
+
+
+if __name__ == '__main__':
+    main()
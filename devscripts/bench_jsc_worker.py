@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Benchmark how many YouTube JS challenges/sec are solved by a JS runtime.
+Compares the persistent worker process with a new process for each call
+"""
+
+# Allow direct execution
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+import argparse
+import random
+import string
+import time
+
+from yt_dlp import YoutubeDL
+from yt_dlp.extractor.youtube.jsc._registry import _jsc_providers
+from yt_dlp.extractor.youtube.jsc.provider import JsChallengeRequest, JsChallengeType, NChallengeInput
+from yt_dlp.extractor.youtube.pot._director import YoutubeIEContentProviderLogger
+
+DEFAULT_PLAYER_URL = 'https://www.youtube.com/s/player/3d3ba064/player_ias_tce.vflset/en_US/base.js'
+
+
+def benchmark(name, provider, calls, batch, player_url):
+    start = time.perf_counter()
+    for _ in range(calls):
+        challenges = [''.join(random.choices(string.ascii_letters + string.digits, k=16)) for _ in range(batch)]
+        request = JsChallengeRequest(JsChallengeType.N, NChallengeInput(player_url, challenges), None)
+        for response in provider.bulk_solve([request]):
+            if response.error:
+                raise response.error
+    elapsed = time.perf_counter() - start
+    print(f'{name}: {calls * batch} challenges in {elapsed:.2f}s ({calls * batch / elapsed:.1f} challenges/sec)')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--runtime', default='deno', help='JS runtime to use (default: %(default)s)')
+    parser.add_argument('--calls', type=int, default=20, help='Number of bulk_solve calls (default: %(default)s)')
+    parser.add_argument('--batch', type=int, default=2, help='Number of challenges per call (default: %(default)s)')
+    parser.add_argument('--player-url', default=DEFAULT_PLAYER_URL, help='Player to use (default: %(default)s)')
+    args = parser.parse_args()
+
+    ydl = YoutubeDL({'quiet': True, 'js_runtimes': {args.runtime: {}}, 'remote_components': ['ejs:github']})
+    ie = ydl.get_info_extractor('Youtube')
+    provider_cls = next(
+        (provider for provider in _jsc_providers.value.values() if provider.PROVIDER_NAME == args.runtime), None)
+    if not provider_cls:
+        parser.error(f'Unknown JS runtime {args.runtime!r}')
+
+    def make_provider(worker):
+        logger = YoutubeIEContentProviderLogger(ie, f'jsc:{args.runtime}', log_level=YoutubeIEContentProviderLogger.LogLevel.WARNING)
+        provider = provider_cls(ie, logger, {})
+        provider.ejs_settings = {'worker': [str(worker).lower()]}
+        if not provider.is_available():
+            parser.error(f'{args.runtime} is not available')
+        return provider
+
+    with ydl:
+        ie._load_player(None, args.player_url)  # Do not count the player download
+        benchmark('Per-call process', make_provider(False), args.calls, args.batch, args.player_url)
+        provider = make_provider(True)
+        try:
+            benchmark('Worker process', provider, args.calls, args.batch, args.player_url)
+        finally:
+            provider.close()
+
+
+if __name__ == '__main__':
+    main()
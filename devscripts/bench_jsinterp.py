@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Benchmark how many calls/sec are made to functions of the native JS interpreter.
+Each function is extracted once and then called repeatedly, as the extractors do
+"""
+
+# Allow direct execution
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+import argparse
+import time
+
+from yt_dlp.jsinterp import JSInterpreter
+
+FUNCTIONS = {
+    'arithmetic': ('''
+        function f(a, b) {
+            var x = (a * 3 + b) % 7, y = a << 2 ^ b;
+            return x > y ? x - y : (y - x) / 2;
+        }''', (42, 17)),
+    'loop': ('''
+        function f(n) {
+            var s = 0;
+            for (var i = 0; i < n; i++) { if (i % 3 == 0) { continue; } s = s + i * 2; }
+            return s;
+        }''', (20,)),
+    'string': ('''
+        function f(a) {
+            var b = a.split("");
+            b.reverse();
+            b = b.slice(2);
+            var c = b[0]; b[0] = b[5 % b.length]; b[5 % b.length] = c;
+            return b.join("");
+        }''', ('abcdefghijklmnopqrstuvwxyz0123456789',)),
+    'switch': ('''
+        function f(x) {
+            var r = 0;
+            for (var i = 0; i < 10; i++) {
+                switch ((x + i) % 4) {
+                    case 0: r += 1; break;
+                    case 1: r += 10; break;
+                    default: r -= 1;
+                }
+            }
+            return r;
+        }''', (3,)),
+    'nested': ('''
+        function f(a) {
+            var o = {
+                sq: function(x) { return x * x; },
+                inc: function(x) { return x + 1; }
+            };
+            var g = function(x, y) { return o.sq(x) + o.inc(y); };
+            return [g(a, 1), g(a + 1, 2), g(a + 2, 3)];
+        }''', (5,)),
+}
+
+
+def benchmark(name, code, args, calls):
+    func = JSInterpreter(code).extract_function('f')
+    result = func(args)
+    start = time.perf_counter()
+    for _ in range(calls):
+        func(args)
+    elapsed = time.perf_counter() - start
+    print(f'{name}: {calls} calls in {elapsed:.2f}s ({calls / elapsed:.0f} calls/sec) => {result!r}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--calls', type=int, default=2000, help='Number of calls to each function (default: %(default)s)')
+    parser.add_argument('--functions', nargs='+', choices=FUNCTIONS, default=list(FUNCTIONS), help='Functions to call (default: all)')
+    args = parser.parse_args()
+
+    for name in args.functions:
+        benchmark(name, *FUNCTIONS[name], args.calls)
+
+
+if __name__ == '__main__':
+    main()
@@ -11,6 +11,7 @@
 
 from devscripts.utils import get_filename_args, read_file, write_file
 from yt_dlp.extractor import import_extractors
+from yt_dlp.extractor._dispatch import extractor_hosts
 from yt_dlp.extractor.common import InfoExtractor, SearchInfoExtractor
 from yt_dlp.globals import extractors
 
@@ -76,6 +77,14 @@ def build_ies(ies, bases, attr_base):
             names.append(ie.__name__)
 
     yield '\n_CLASS_LOOKUP = {%s}' % ', '.join(f'{name!r}: {name}' for name in names)
+    yield build_host_lookup(ies)
+
+
+def build_host_lookup(ies):
+    """Precompute the hosts of each extractor, used for indexing URLs. See yt_dlp/extractor/_dispatch.py"""
+    lookup = {ie.__name__: extractor_hosts(ie) for ie in ies}
+    return '\n_HOST_LOOKUP = {\n%s}' % ''.join(
+        f'    {name!r}: {hosts!r},\n' for name, hosts in lookup.items() if hosts is not None)
 
 
 def sort_ies(ies, ignored_bases):
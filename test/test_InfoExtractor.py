@@ -80,6 +80,22 @@ def test_get_netrc_login_info(self):
             with self.assertRaises(ExtractorError):
                 ie._get_netrc_login_info(netrc_machine=';echo rce')
 
+    def test_extract_embed_urls(self):
+        class EmbedIE(InfoExtractor):
+            _VALID_URL = False
+            _EMBED_REGEX = [
+                r'<iframe[^>]+src="(?P<url>https://embed\.example\.com/[^"]+)"',
+                r'(?i)<VIDEO[^>]+data-url="(?P<url>[^"]+)"',
+            ]
+
+        webpage = '<iframe src="https://embed.example.com/1"></iframe><Video data-url="https://example.com/2">'
+        self.assertEqual(
+            list(EmbedIE._extract_embed_urls('https://example.com/', webpage)),
+            ['https://embed.example.com/1', 'https://example.com/2'])
+        self.assertEqual(list(EmbedIE._extract_embed_urls('https://example.com/', webpage.replace('embed.', 'www.'))), [
+            'https://example.com/2'])
+        self.assertEqual(EmbedIE._EMBED_URL_LITERALS, ('https://embed.example.com/', 'data-url="'))
+
     def test_html_search_regex(self):
         html = '<p id="foo">Watch this <a href="http://www.youtube.com/watch?v=BaW_jenozKc">video</a></p>'
         search = lambda re, *args: self.ie._html_search_regex(re, html, *args)
@@ -14,18 +14,26 @@
 import contextlib
 import copy
 import json
+import tempfile
+import threading
+import time
 
 from test.helper import FakeYDL, assertRegexpMatches, try_rm
 from yt_dlp import YoutubeDL
 from yt_dlp.extractor.common import InfoExtractor
 from yt_dlp.postprocessor.common import PostProcessor
 from yt_dlp.utils import (
+    DownloadCancelled,
     ExtractorError,
+    FormatSorter,
     LazyList,
+    MaxDownloadsReached,
     OnDemandPagedList,
+    UnavailableVideoError,
     int_or_none,
     match_filter_func,
 )
+from yt_dlp.utils._utils import _YDLLogger as FakeLogger
 from yt_dlp.utils.traversal import traverse_obj
 
 TEST_URL = 'http://localhost/sample.mp4'
@@ -114,6 +122,31 @@ def test_prefer_free_formats(self):
         downloaded = ydl.downloaded_info_dicts[0]
         self.assertEqual(downloaded['ext'], 'webm')
 
+    def test_format_selector_cache(self):
+        ydl = YDL()
+        selector = ydl.build_format_selector('bv*+ba/b')
+        self.assertIs(ydl.build_format_selector('bv*+ba/b'), selector)
+        self.assertIsNot(ydl.build_format_selector('bv+ba/b'), selector)
+        ydl.params['allow_multiple_audio_streams'] = True
+        self.assertIsNot(ydl.build_format_selector('bv*+ba/b'), selector)
+
+        formats = [
+            {'format_id': '1', 'ext': 'mp4', 'vcodec': 'avc1.64001F', 'acodec': 'none', 'height': 1080, 'tbr': 3000, 'url': TEST_URL},
+            {'format_id': '2', 'ext': 'webm', 'vcodec': 'VP9', 'acodec': 'none', 'height': 1080, 'fps': 60, 'url': TEST_URL},
+            {'format_id': '3', 'ext': 'm4a', 'vcodec': 'none', 'acodec': 'mp4a.40.2', 'abr': 128, 'protocol': 'm3u8_native', 'url': TEST_URL},
+            {'format_id': '4', 'ext': 'webm', 'vcodec': 'none', 'acodec': 'opus', 'abr': 160, 'language_preference': 10, 'url': TEST_URL},
+            {'format_id': '5', 'ext': 'mp4', 'width': 640, 'preference': -1000, 'dynamic_range': 'HDR10', 'url': TEST_URL},
+        ]
+        for params, sort_fields in (({}, ()), ({'prefer_free_formats': True}, ('res:720', 'codec:vp9'))):
+            ydl = YDL({'format_sort': ['+size', 'br~150'], **params})
+            sorter = FormatSorter(ydl, sort_fields)
+            for fmt in formats:
+                self.assertEqual(sorter.calculate_preference(fmt), tuple(
+                    sorter._calculate_field_preference(fmt, field) for field in sorter._order))
+            info_dict = _make_result(copy.deepcopy(formats), _format_sort_fields=sort_fields)
+            ydl.sort_formats(info_dict)
+            self.assertEqual(info_dict['formats'], sorted(formats, key=sorter.calculate_preference))
+
     def test_format_selection(self):
         formats = [
             {'format_id': '35', 'ext': 'mp4', 'preference': 0, 'url': TEST_URL},
@@ -857,6 +890,31 @@ def gen():
         test('%(title3)s', ('foo/bar\\test', 'foo⧸bar⧹test'))
         test('folder/%(title3)s', ('folder/foo/bar\\test', f'folder{os.path.sep}foo⧸bar⧹test'))
 
+    def test_prepare_outtmpl_benchmark(self):
+        ydl = YoutubeDL({'quiet': True})
+        outtmpl = '%(playlist_index)s - %(title,id)s [%(id)s] %(duration>%H-%M-%S)s %(height+1,width|NA)d.%(ext)s'
+        infos = [{
+            'id': f'id{i}', 'title': f'Video {i}', 'ext': 'mp4', 'duration': i * 10,
+            'height': 720, 'playlist_index': i, '__last_playlist_index': 100,
+        } for i in range(100)]
+
+        def evaluate(compile_once):
+            start = time.perf_counter()
+            results = []
+            for info in infos:
+                if not compile_once:
+                    YoutubeDL._compile_outtmpl.cache_clear()
+                    YoutubeDL.escape_outtmpl.cache_clear()
+                results.append(ydl.evaluate_outtmpl(outtmpl, info, True))
+            return results, time.perf_counter() - start
+
+        compiled, compiled_time = evaluate(True)
+        uncompiled, uncompiled_time = evaluate(False)
+        self.assertEqual(compiled, uncompiled)
+        self.assertEqual(compiled[7], '007 - Video 7 [id7] 00-01-10 721.mp4')
+        # Wall-clock timings are only reported, since they depend on the load of the machine
+        print(f'outtmpl compiled once: {compiled_time:.4f}s, parsed each time: {uncompiled_time:.4f}s')
+
     def test_format_note(self):
         ydl = YoutubeDL()
         self.assertEqual(ydl._format_note({}), '')
@@ -1158,6 +1216,7 @@ def trouble(self, s, tb=None):
 
         class VideoIE(InfoExtractor):
             _VALID_URL = r'video:(?P<id>\d+)'
+            _RETURN_TYPE = 'video'
 
             def _real_extract(self, url):
                 video_id = self._match_id(url)
@@ -1212,6 +1271,191 @@ def _real_extract(self, url):
         self.assertEqual(downloaded['extractor'], 'Video')
         self.assertEqual(downloaded['extractor_key'], 'Video')
 
+    def test_concurrent_extractions(self):
+        class VideoIE(InfoExtractor):
+            _VALID_URL = r'video:(?P<id>\d+)'
+            _RETURN_TYPE = 'video'
+            running, max_running, extracted, clobbered = 0, 0, [], []
+            lock = threading.Lock()
+
+            def _real_extract(self, url):
+                video_id = self._match_id(url)
+                # Stands for the state of an extraction that is kept in the instance
+                self._video_id = video_id
+                with self.lock:
+                    VideoIE.running += 1
+                    VideoIE.max_running = max(VideoIE.max_running, VideoIE.running)
+                    VideoIE.extracted.append(video_id)
+                time.sleep(0.05)
+                with self.lock:
+                    VideoIE.running -= 1
+                if self._video_id != video_id:
+                    VideoIE.clobbered.append(video_id)
+                if video_id == '5':
+                    raise ExtractorError('foo', expected=True)
+                return {'id': video_id, 'title': f'Video {video_id}', 'url': TEST_URL}
+
+        class PlaylistIE(InfoExtractor):
+            _VALID_URL = r'playlist:'
+
+            def _real_extract(self, url):
+                return self.playlist_result(
+                    self.url_result(f'video:{n}', VideoIE, str(n)) for n in range(12))
+
+        class CountingYDL(YDL):
+            def process_info(self, info_dict):
+                super().process_info(info_dict)
+                # Same as YoutubeDL.process_info
+                self._num_downloads += 1
+                if self._num_downloads >= float(self.params.get('max_downloads') or 'inf'):
+                    raise MaxDownloadsReached
+
+        def test(params, expected):
+            VideoIE.max_running, VideoIE.extracted = 0, []
+            ydl = CountingYDL({'ignoreerrors': True, **params})
+            ydl.report_error = lambda *_, **__: None
+            ydl.archive = {'video 3'}
+            ydl.add_info_extractor(VideoIE(ydl))
+            ydl.add_info_extractor(PlaylistIE(ydl))
+            with contextlib.suppress(DownloadCancelled):
+                ydl.extract_info('playlist:')
+            self.assertEqual([info['id'] for info in ydl.downloaded_info_dicts], expected)
+            self.assertNotIn('3', VideoIE.extracted)
+            self.assertFalse(ydl._prefetched_extractions)
+            self.assertEqual(VideoIE.clobbered, [])
+            return VideoIE.max_running
+
+        expected = [str(n) for n in range(12) if n not in (3, 5)]
+        self.assertEqual(test({}, expected), 1)
+        self.assertGreater(test({'concurrent_extractions': 4}, expected), 1)
+        self.assertGreater(test({'concurrent_extractions': 4, 'lazy_playlist': True}, expected), 1)
+        self.assertGreater(test({'concurrent_extractions': 4, 'playlistreverse': True}, expected[::-1]), 1)
+        test({'concurrent_extractions': 4, 'playlist_items': '2:4,10'}, ['1', '2', '9'])
+        self.assertCountEqual(VideoIE.extracted, ['1', '2', '9'])
+
+        # Nothing is extracted ahead that would not be extracted in turn
+        test({'concurrent_extractions': 4, 'max_downloads': 4}, ['0', '1', '2', '4'])
+        self.assertCountEqual(VideoIE.extracted, ['0', '1', '2', '4'])
+        test({'concurrent_extractions': 4, 'break_on_existing': True}, ['0', '1', '2'])
+        self.assertCountEqual(VideoIE.extracted, ['0', '1', '2'])
+        test({'concurrent_extractions': 4, 'match_filter': match_filter_func('id != 7')}, [
+            n for n in expected if n != '7'])
+        self.assertNotIn('7', VideoIE.extracted)
+        test({'concurrent_extractions': 4, 'match_filter': match_filter_func(None, 'id != 4')}, ['0', '1', '2'])
+        self.assertCountEqual(VideoIE.extracted, ['0', '1', '2'])
+
+    def test_stream_playlist(self):
+        class PlaylistIE(InfoExtractor):
+            _VALID_URL = r'playlist:'
+            yielded = []
+
+            def _real_extract(self, url):
+                def entries():
+                    for n in range(1, 11):
+                        PlaylistIE.yielded.append(n)
+                        yield self.url_result(f'video:{n}', 'Generic', str(n), f'Video {n}')
+                return self.playlist_result(entries(), 'playlist', 'Playlist')
+
+        def test(params, expected):
+            PlaylistIE.yielded = []
+            ydl = YDL({'extract_flat': 'in_playlist', 'forcejson': True, 'lazy_playlist': True, **params})
+            ydl.add_info_extractor(PlaylistIE(ydl))
+            lines = []
+            ydl.to_stdout = lines.append
+            info = ydl.extract_info('playlist:')
+            self.assertEqual([(e['id'], e['playlist_index']) for e in map(json.loads, lines)], expected)
+            return info
+
+        expected = [(str(n), n) for n in range(1, 11)]
+        info = test({'stream_playlist': True}, expected)
+        self.assertEqual(info['entries'], [])
+        self.assertNotIn('requested_entries', info)
+        self.assertEqual(len(test({}, expected)['entries']), 10)
+
+        info = test({'stream_playlist': True, 'playlist_items': '2:4,8'}, [('2', 2), ('3', 3), ('4', 4), ('8', 8)])
+        self.assertEqual(PlaylistIE.yielded, list(range(1, 9)))
+        self.assertEqual(info['entries'], [])
+        # Items that are not in order need the entries to be kept
+        test({'stream_playlist': True, 'playlist_items': '4,2,4'}, [('4', 4), ('2', 2)])
+        test({'stream_playlist': True, 'playlist_items': '-2:'}, [('9', 9), ('10', 10)])
+
+    def test_concurrent_streams(self):
+        class StreamsYDL(YoutubeDL):
+            running, max_running, fail, completed, newline = 0, 0, None, 0, None
+            lock = threading.Lock()
+
+            def dl(self, name, info, subtitle=False, test=False):
+                with self.lock:
+                    StreamsYDL.running += 1
+                    StreamsYDL.max_running = max(StreamsYDL.max_running, StreamsYDL.running)
+                    StreamsYDL.newline = self._stream_params.get('progress_with_newline')
+                try:
+                    # Stands for the progress hooks that are called while downloading
+                    for _ in range(20):
+                        self._check_streams_stopped({})
+                        if self.fail and info.get('format_id') == self.fail:
+                            raise OSError('foo')
+                        time.sleep(0.01)
+                    with open(name, 'w') as f:
+                        f.write(info['url'])
+                    StreamsYDL.completed += 1
+                    return True, True
+                finally:
+                    with self.lock:
+                        StreamsYDL.running -= 1
+
+        def test(params, fail=None, is_live=False):
+            StreamsYDL.max_running, StreamsYDL.fail, StreamsYDL.completed = 0, fail, 0
+            with tempfile.TemporaryDirectory() as tmpdir:
+                ydl = StreamsYDL({
+                    'outtmpl': os.path.join(tmpdir, '%(id)s.%(ext)s'),
+                    'allow_unplayable_formats': True,
+                    'writesubtitles': True,
+                    'logger': FakeLogger(),
+                    **params,
+                })
+                formats = [
+                    {'format_id': 'video', 'url': TEST_URL, 'ext': 'mp4', 'vcodec': 'avc1', 'acodec': 'none'},
+                    {'format_id': 'audio', 'url': TEST_URL, 'ext': 'm4a', 'vcodec': 'none', 'acodec': 'mp4a'},
+                ]
+                info = {
+                    'id': 'testid', 'title': 'test', 'ext': 'mp4', 'format_id': 'video+audio',
+                    'requested_formats': formats,
+                    'requested_subtitles': {'en': {'url': TEST_URL, 'ext': 'vtt'}},
+                    'webpage_url': 'http://example.com/watch?v=testid', 'extractor': 'test',
+                    'is_live': is_live,
+                }
+                try:
+                    ydl.process_info(info)
+                finally:
+                    self.assertEqual(StreamsYDL.running, 0)
+                    self.assertFalse(ydl._stop_streams.is_set())
+                self.assertCountEqual(
+                    os.listdir(tmpdir), ['testid.fvideo.mp4', 'testid.faudio.m4a', 'testid.en.vtt'])
+                self.assertEqual(info['requested_subtitles']['en']['filepath'], os.path.join(tmpdir, 'testid.en.vtt'))
+                return StreamsYDL.max_running
+
+        self.assertEqual(test({}), 1)
+        self.assertFalse(StreamsYDL.newline)
+        self.assertEqual(test({'concurrent_streams': 3}), 3)
+        # The progress of the streams is not printed on the same line
+        self.assertTrue(StreamsYDL.newline)
+        # The streams of a live video can only be interrupted one at a time
+        self.assertEqual(test({'concurrent_streams': 3}, is_live=True), 1)
+        self.assertEqual(test({'concurrent_streams': 2}), 2)
+        with self.assertRaisesRegex(UnavailableVideoError, 'foo'):
+            test({'concurrent_streams': 3}, fail='audio')
+        # The other streams were stopped
+        self.assertEqual(StreamsYDL.completed, 0)
+
+    def test_dumps_info(self):
+        info = {
+            'id': '1', 'title': 'ü', 'tags': ('a', 'b'), 'formats': [{'format_id': '1', 'fragments': LazyList(range(3))}],
+            'set': {1}, 'object': object, 'nested': {'none': None, 'float': 1.5}, 1: 'int key',
+        }
+        self.assertEqual(YoutubeDL._dumps_info(info), json.dumps(YoutubeDL.sanitize_info(info)))
+        self.assertEqual(YoutubeDL._dumps_info(None), 'null')
+
     def test_header_cookies(self):
         from http.cookiejar import Cookie
 
@@ -11,8 +11,10 @@
 import base64
 
 from yt_dlp.aes import (
+    _AESCBCDecryptor,
     aes_cbc_decrypt,
     aes_cbc_decrypt_bytes,
+    aes_cbc_decryptor,
     aes_cbc_encrypt,
     aes_ctr_decrypt,
     aes_ctr_encrypt,
@@ -51,6 +53,17 @@ def test_cbc_decrypt(self):
             decrypted = aes_cbc_decrypt_bytes(data, bytes(self.key), bytes(self.iv))
             self.assertEqual(decrypted.rstrip(b'\x08'), self.secret_msg)
 
+    def test_cbc_decryptor(self):
+        data = list(range(256)) * 3
+        for key_size in (16, 24, 32):
+            key = list(range(key_size))
+            encrypted = bytes(aes_cbc_encrypt(data, key, self.iv))
+            for decryptor in (_AESCBCDecryptor, aes_cbc_decryptor):
+                cipher = decryptor(bytes(key), bytes(self.iv))
+                decrypted = b''.join(cipher.decrypt(encrypted[i:i + 48]) for i in range(0, len(encrypted), 48))
+                self.assertEqual(decrypted, bytes(data), f'{decryptor.__name__} {key_size}')
+        self.assertRaises(ValueError, _AESCBCDecryptor(bytes(self.key), bytes(self.iv)).decrypt, b'\0' * 15)
+
     def test_cbc_encrypt(self):
         data = list(self.secret_msg)
         encrypted = bytes(aes_cbc_encrypt(data, self.key, self.iv))
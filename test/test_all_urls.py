@@ -12,6 +12,7 @@
 
 from test.helper import gettestcases
 from yt_dlp.extractor import FacebookIE, YoutubeIE, gen_extractors
+from yt_dlp.extractor._dispatch import ExtractorIndex, embed_literal, hosts_from_regex
 
 
 class TestAllURLsMatching(unittest.TestCase):
@@ -82,6 +83,33 @@ def test_no_duplicates(self):
                         ie.suitable(url),
                         f'{type(ie).__name__} should not match URL {url!r} . That URL belongs to {tc["name"]}.')
 
+    def test_index(self):
+        index = ExtractorIndex({ie.ie_key(): ie for ie in self.ies})
+        for tc in gettestcases(include_onlymatching=True):
+            for url in (tc['url'], tc['url'].upper(), tc['url'].replace('://', '://user@', 1)):
+                if any(ie.ie_key() == tc['name'] and ie.suitable(url) for ie in self.ies):
+                    self.assertIn(tc['name'], index.candidates(url), f'Index does not find {tc["name"]} for {url!r}')
+
+    def test_hosts_from_regex(self):
+        self.assertEqual(hosts_from_regex(r'https?://(?:www\.)?example\.com/(?P<id>\d+)'), ({'example.com', 'www.example.com'}, set()))
+        self.assertEqual(hosts_from_regex(r'https?://(?:[^/]+\.)?example\.(?:com|org)/'), ({'example.com', 'example.org'}, set()))
+        self.assertEqual(hosts_from_regex(r'https?://[^/]+\.example\.com$'), ({'example.com'}, set()))
+        self.assertEqual(hosts_from_regex(r'https?://\w+example\.com/'), ({'com'}, set()))
+        self.assertEqual(hosts_from_regex(r'(?:example:|https?://example\.com/)(?P<id>\d+)'), ({'example.com'}, {'example:'}))
+        self.assertEqual(hosts_from_regex(r'https?://example\.[a-z]+/'), (set(), {'http://example.', 'https://example.'}))
+        # The host may end within `.+`
+        self.assertEqual(hosts_from_regex(r'https?://.+\.example\.com/'), (set(), {'http://', 'https://'}))
+        self.assertEqual(hosts_from_regex(r'https?://example\.com'), (set(), {'http://example.com', 'https://example.com'}))
+        self.assertIsNone(hosts_from_regex(r'(?:https?://)?[^/]+/video'))
+
+    def test_embed_literal(self):
+        self.assertEqual(embed_literal(r'<iframe[^>]+src=["\'](?P<url>https?://(?:www\.)?example\.com/embed/\d+)'), 'example.com/embed/')
+        self.assertEqual(embed_literal(r'<iframe[^>]+src="(?P<url>//Player\.Example\.com/[^"]+)"'), '//player.example.com/')
+        # Under re.IGNORECASE, "k" also matches "\u212a"
+        self.assertEqual(embed_literal(r'(?i)<video[^>]+src="(?P<url>https://kick\.com/[^"]+)"'), '.com/')
+        self.assertEqual(embed_literal(r'(?:<iframe|<embed)[^>]+(?P<url>https://(?:example\.com/v|vid\.example\.org)/\d+)'), 'https://')
+        self.assertIsNone(embed_literal(r'<(?:iframe|embed)[^>]+="(?P<url>[^"]+)"'))
+
     def test_keywords(self):
         self.assertMatch(':ytsubs', ['youtube:subscriptions'])
         self.assertMatch(':ytsubscriptions', ['youtube:subscriptions'])
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+
+# Allow direct execution
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+import shutil
+
+from test.helper import FakeYDL
+from yt_dlp.archive import SQLiteDownloadArchive, TextDownloadArchive, open_download_archive
+from yt_dlp.dependencies import sqlite3
+
+
+class TestDownloadArchive(unittest.TestCase):
+    def setUp(self):
+        TEST_DIR = os.path.dirname(os.path.abspath(__file__))
+        self.test_dir = os.path.join(TEST_DIR, 'testdata', 'archive_test')
+        self.tearDown()
+        os.makedirs(self.test_dir)
+
+    def tearDown(self):
+        if os.path.exists(self.test_dir):
+            shutil.rmtree(self.test_dir)
+
+    def _test_backend(self, filename):
+        filename = os.path.join(self.test_dir, filename)
+        archive, other = open_download_archive(filename), open_download_archive(filename)
+        self.assertNotIn('youtube abc', archive)
+        archive.add('youtube abc')
+        archive.update(['youtube def', 'vimeo 123'])
+        self.assertIn('youtube abc', archive)
+        self.assertIn('vimeo 123', archive)
+        # Additions by other processes are visible
+        self.assertIn('youtube def', other)
+        other.add('vimeo 456')
+        self.assertIn('vimeo 456', archive)
+        self.assertEqual(set(archive), {'youtube abc', 'youtube def', 'vimeo 123', 'vimeo 456'})
+
+        text_filename = os.path.join(self.test_dir, 'export.txt')
+        self.assertEqual(archive.export_text(text_filename), 4)
+        with open(text_filename, encoding='utf-8') as f:
+            self.assertEqual(set(f.read().splitlines()), set(archive))
+        with open(text_filename, 'a', encoding='utf-8') as f:
+            f.write('\nvimeo 789')
+        self.assertEqual(other.import_text(text_filename), 5)
+        self.assertIn('vimeo 789', archive)
+        archive.close()
+        other.close()
+        return open_download_archive(filename)
+
+    def test_text(self):
+        archive = self._test_backend('archive.txt')
+        self.assertIsInstance(archive, TextDownloadArchive)
+        self.assertIn('vimeo 789', archive)
+
+    @unittest.skipUnless(sqlite3, 'sqlite3 is not available')
+    def test_sqlite(self):
+        archive = self._test_backend('archive.sqlite')
+        self.assertIsInstance(archive, SQLiteDownloadArchive)
+        self.assertIn('vimeo 789', archive)
+        archive.close()
+
+    @unittest.skipUnless(sqlite3, 'sqlite3 is not available')
+    def test_ydl(self):
+        filename = os.path.join(self.test_dir, 'archive.db')
+        with FakeYDL({'download_archive': filename}) as ydl:
+            info = {'id': 'abc', 'extractor_key': 'Youtube'}
+            self.assertFalse(ydl.in_download_archive(info))
+            ydl.record_download_archive(info)
+            self.assertTrue(ydl.in_download_archive(info))
+        with FakeYDL({'download_archive': filename}) as ydl:
+            self.assertIsInstance(ydl.archive, SQLiteDownloadArchive)
+            self.assertTrue(ydl.in_download_archive(info))
+
+
+if __name__ == '__main__':
+    unittest.main()
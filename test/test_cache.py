@@ -9,9 +9,11 @@
 
 
 import shutil
+import time
 
 from test.helper import FakeYDL
 from yt_dlp.cache import Cache
+from yt_dlp.dependencies import sqlite3
 
 
 def _is_empty(d):
@@ -52,6 +54,47 @@ def test_cache(self):
         self.assertFalse(os.path.exists(self.test_dir))
         self.assertEqual(c.load('test_cache', 'k.'), None)
 
+    def _test_backend(self, backend):
+        ydl = FakeYDL({'cachedir': self.test_dir, 'cache_backend': backend})
+        c = Cache(ydl)
+        c.store('test_cache', 'k', {'x': 1})
+        c.store('test_cache', 'old', 1)
+        self.assertEqual(c.load('test_cache', 'k', min_ver='2000.01.01'), {'x': 1})
+        self.assertEqual(c.load('test_cache', 'k', min_ver='9999.01.01'), None)
+        # Loaded objects are not shared
+        c.load('test_cache', 'k')['x'] = 2
+        self.assertEqual(c.load('test_cache', 'k'), {'x': 1})
+        # Not memoized
+        self.assertEqual(Cache(ydl).load('test_cache', 'k'), {'x': 1})
+
+        ydl.params['cache_max_age'] = {'test_cache': 60}
+        self.assertEqual(c.load('test_cache', 'k'), {'x': 1})
+        ydl.params['cache_max_age'] = {'test_cache': 0, 'default': 60}
+        time.sleep(0.01)
+        self.assertEqual(c.load('test_cache', 'k', default=False), False)
+        self.assertEqual(c.load('test_cache2', 'k'), None)
+
+        ydl.params['cache_max_age'] = None
+        ydl.params['cache_max_size'] = 200
+        for i in range(10):
+            c.store('test_cache2', f'k{i}', 'x' * 50)
+            time.sleep(0.01)
+        c = Cache(ydl)
+        c.store('test_cache2', 'k10', 'x' * 50)
+        self.assertEqual(
+            [c.load('test_cache2', f'k{i}') is not None for i in range(11)],
+            [False] * 9 + [True] * 2)
+        c.remove()
+        self.assertEqual(c.load('test_cache2', 'k10'), None)
+
+    def test_files(self):
+        self._test_backend('files')
+
+    @unittest.skipUnless(sqlite3, 'sqlite3 is not available')
+    def test_sqlite(self):
+        self._test_backend('sqlite')
+        self.assertFalse(os.path.exists(self.test_dir))
+
 
 if __name__ == '__main__':
     unittest.main()
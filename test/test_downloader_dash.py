@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+
+# Allow direct execution
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+import http.server
+import re
+import threading
+import time
+
+from test.helper import http_server_port, try_rm
+from yt_dlp import YoutubeDL
+from yt_dlp.compat import compat_etree_fromstring
+from yt_dlp.downloader import get_suitable_downloader
+from yt_dlp.downloader.dash import DashSegmentsFD
+from yt_dlp.downloader.external import FFmpegFD
+from yt_dlp.extractor.common import InfoExtractor
+from yt_dlp.utils._utils import _YDLLogger as FakeLogger
+
+SEGMENT_COUNT = 10
+# Each request of the manifest moves its window of segments forward
+WINDOW_SIZE = 3
+WINDOW_STEP = 2
+TIMESCALE = 1000
+INIT_CONTENT = b'init' * 100
+
+
+def segment_content(index):
+    return (b'%03d' % index) * (100 + index * 50)
+
+
+def live_manifest(start, end, is_static=False):
+    return f'''<?xml version="1.0" encoding="UTF-8"?>
+<MPD xmlns="urn:mpeg:dash:schema:mpd:2011" profiles="urn:mpeg:dash:profile:isoff-live:2011"
+    type="{'static' if is_static else 'dynamic'}" minimumUpdatePeriod="PT0.1S"
+    availabilityStartTime="1970-01-01T00:00:00Z">
+  <Period id="0" start="PT0S">
+    <AdaptationSet mimeType="video/mp4" segmentAlignment="true">
+      <SegmentTemplate timescale="{TIMESCALE}" initialization="init-$RepresentationID$.mp4"
+          media="seg-$RepresentationID$-$Time$.m4s">
+        <SegmentTimeline>
+          <S t="{start * 100}" d="100" r="{end - start - 1}"/>
+        </SegmentTimeline>
+      </SegmentTemplate>
+      <Representation id="v1" bandwidth="100000" codecs="avc1.4d401f" width="640" height="360"/>
+    </AdaptationSet>
+  </Period>
+</MPD>
+'''
+
+
+class HTTPTestRequestHandler(http.server.BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        if self.path == '/live.mpd':
+            with self.server.lock:
+                start = min(self.server.manifest_requests * WINDOW_STEP, SEGMENT_COUNT - WINDOW_SIZE)
+                self.server.manifest_requests += 1
+            end = start + WINDOW_SIZE
+            content = live_manifest(start, end, is_static=end == SEGMENT_COUNT).encode()
+            content_type = 'application/dash+xml'
+        elif self.path == '/init-v1.mp4':
+            content = INIT_CONTENT
+            content_type = 'video/mp4'
+        elif mobj := re.fullmatch(r'/seg-v1-(\d+)\.m4s', self.path):
+            index = int(mobj.group(1)) // 100
+            with self.server.lock:
+                self.server.segment_requests.append(index)
+            content = segment_content(index)
+            content_type = 'video/mp4'
+        else:
+            assert False
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+
+class TestDashSegmentsFD(unittest.TestCase):
+    def setUp(self):
+        self.httpd = http.server.ThreadingHTTPServer(
+            ('127.0.0.1', 0), HTTPTestRequestHandler)
+        self.httpd.lock = threading.Lock()
+        self.port = http_server_port(self.httpd)
+        self.server_thread = threading.Thread(target=self.httpd.serve_forever)
+        self.server_thread.daemon = True
+        self.server_thread.start()
+
+    def tearDown(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def download_live(self, params):
+        self.httpd.manifest_requests = 0
+        self.httpd.segment_requests = []
+        params['logger'] = FakeLogger()
+        ydl = YoutubeDL(params)
+        formats = InfoExtractor(ydl)._extract_mpd_formats(
+            f'http://127.0.0.1:{self.port}/live.mpd', 'live', mpd_id='dash')
+        self.assertEqual([f['format_id'] for f in formats], ['dash-v1'])
+        downloader = DashSegmentsFD(ydl, params)
+        filename = 'testfile.mp4'
+        try_rm(filename)
+        self.assertTrue(downloader.real_download(filename, {
+            **formats[0],
+            'id': 'live',
+            'is_live': True,
+        }))
+        with open(filename, 'rb') as f:
+            self.assertEqual(f.read(), INIT_CONTENT + b''.join(map(segment_content, range(SEGMENT_COUNT))))
+        self.assertCountEqual(self.httpd.segment_requests, range(SEGMENT_COUNT))
+        try_rm(filename)
+
+    def test_live(self):
+        self.download_live({})
+
+    def test_live_concurrent(self):
+        self.download_live({'concurrent_fragment_downloads': 4})
+
+    def test_live_routing(self):
+        info_dict = {'protocol': 'http_dash_segments', 'url': 'http://127.0.0.1/live.mpd', 'is_live': True}
+        self.assertIs(get_suitable_downloader(info_dict, {}), FFmpegFD)
+        self.assertIs(get_suitable_downloader(info_dict, {'external_downloader': 'native'}), DashSegmentsFD)
+
+    def test_parse_live_number_template(self):
+        availability_start = time.time() - 3600
+        mpd_doc = compat_etree_fromstring(f'''<?xml version="1.0" encoding="UTF-8"?>
+<MPD xmlns="urn:mpeg:dash:schema:mpd:2011" type="dynamic" timeShiftBufferDepth="PT30S"
+    availabilityStartTime="{time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(availability_start))}">
+  <Period id="0" start="PT0S">
+    <AdaptationSet mimeType="audio/mp4">
+      <SegmentTemplate timescale="1" duration="6" startNumber="1" media="$Number$.m4s"/>
+      <Representation id="a1" bandwidth="64000" codecs="mp4a.40.2"/>
+    </AdaptationSet>
+  </Period>
+</MPD>
+''')
+        formats, _ = InfoExtractor(YoutubeDL({'logger': FakeLogger()}))._parse_mpd_formats_and_subtitles(
+            mpd_doc, mpd_base_url='http://127.0.0.1/', mpd_url='http://127.0.0.1/live.mpd')
+        numbers = [int(fragment['path'][:-len('.m4s')]) for fragment in formats[0]['fragments']]
+        # The last 30 seconds of the 600 segments of 6 seconds that are complete after an hour
+        self.assertEqual(len(numbers), 5)
+        self.assertIn(numbers[-1], (599, 600))
+        self.assertEqual(numbers, list(range(numbers[0], numbers[0] + 5)))
+
+
+if __name__ == '__main__':
+    unittest.main()
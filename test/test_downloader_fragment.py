@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+
+# Allow direct execution
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+import collections
+import http.server
+import threading
+import time
+from unittest.mock import patch
+
+from test.helper import http_server_port, try_rm
+from yt_dlp import YoutubeDL
+from yt_dlp.downloader.dash import DashSegmentsFD
+from yt_dlp.downloader.fragment import FragmentBufferPool, HttpQuietDownloader
+from yt_dlp.utils._utils import _YDLLogger as FakeLogger
+
+FRAGMENT_COUNT = 20
+SLOW_FRAGMENT = 3
+
+
+def fragment_content(index):
+    return (b'%03d' % index) * (100 + index * 50)
+
+
+class HTTPTestRequestHandler(http.server.BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        slow = False
+        if self.path.startswith('/frag/'):
+            index = int(self.path[len('/frag/'):])
+        elif self.path.startswith('/slow/'):
+            index = int(self.path[len('/slow/'):])
+            # Only the first request for the slow fragment trickles
+            self.server.requests[index] += 1
+            slow = index == SLOW_FRAGMENT and self.server.requests[index] == 1
+        else:
+            assert False
+        content = fragment_content(index)
+        self.send_response(200)
+        self.send_header('Content-Type', 'video/mp4')
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        if not slow:
+            self.wfile.write(content)
+            return
+        for i in range(0, len(content), 50):
+            self.wfile.write(content[i:i + 50])
+            self.wfile.flush()
+            time.sleep(0.1)
+
+
+class TestFragmentFD(unittest.TestCase):
+    def setUp(self):
+        self.httpd = http.server.ThreadingHTTPServer(
+            ('127.0.0.1', 0), HTTPTestRequestHandler)
+        self.httpd.requests = collections.Counter()
+        self.port = http_server_port(self.httpd)
+        self.server_thread = threading.Thread(target=self.httpd.serve_forever)
+        self.server_thread.daemon = True
+        self.server_thread.start()
+
+    def tearDown(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def download(self, params, path='frag', progress_hook=None):
+        params['logger'] = FakeLogger()
+        ydl = YoutubeDL(params)
+        downloader = DashSegmentsFD(ydl, params)
+        if progress_hook:
+            downloader.add_progress_hook(progress_hook)
+        filename = 'testfile.mp4'
+        try_rm(filename)
+        self.assertTrue(downloader.real_download(filename, {
+            'protocol': 'http_dash_segments',
+            'fragments': [
+                {'url': f'http://127.0.0.1:{self.port}/{path}/{i}'} for i in range(FRAGMENT_COUNT)],
+        }))
+        with open(filename, 'rb') as f:
+            self.assertEqual(f.read(), b''.join(map(fragment_content, range(FRAGMENT_COUNT))))
+        self.assertFalse([f for f in os.listdir() if f.startswith(f'{filename}.part-Frag')])
+        try_rm(filename)
+
+    def test_on_disk(self):
+        self.download({})
+        self.download({'concurrent_fragment_downloads': 4})
+
+    def test_in_memory(self):
+        self.download({'fragment_buffer_size': 1024 * 1024})
+        self.download({'fragment_buffer_size': 1024 * 1024, 'concurrent_fragment_downloads': 4})
+
+    def test_in_memory_spill(self):
+        self.download({'fragment_buffer_size': 500})
+        self.download({'fragment_buffer_size': 500, 'concurrent_fragment_downloads': 4})
+
+    def test_out_of_order(self):
+        self.download({'concurrent_fragment_downloads': 4}, 'slow')
+        self.assertEqual(self.httpd.requests[SLOW_FRAGMENT], 1)
+
+    def test_hedged(self):
+        downloaded = []
+        finish_frag_download = DashSegmentsFD._finish_frag_download
+
+        def record_downloaded(downloader, ctx, info_dict):
+            downloaded.append(ctx['progress'].downloaded)
+            return finish_frag_download(downloader, ctx, info_dict)
+
+        for params in ({}, {'fragment_buffer_size': 1024 * 1024}):
+            self.httpd.requests.clear()
+            downloaded.clear()
+            with patch.object(DashSegmentsFD, '_finish_frag_download', record_downloaded):
+                # Small blocks, so that the progress of the slow request is reported before it is aborted
+                self.download({
+                    **params, 'concurrent_fragment_downloads': 4, 'fragment_hedge_delay': 0.2,
+                    'buffersize': 16, 'noresizebuffer': True,
+                }, 'slow')
+            self.assertEqual(self.httpd.requests[SLOW_FRAGMENT], 2)
+            # What the aborted duplicate downloaded is not counted
+            self.assertEqual(downloaded, [sum(len(fragment_content(i)) for i in range(FRAGMENT_COUNT))])
+
+    def test_hedged_both_finished(self):
+        hook_progress = HttpQuietDownloader._hook_progress
+        barrier = threading.Barrier(2, timeout=10)
+
+        def finish_together(downloader, status, info_dict):
+            # Both downloads of the slow fragment finish before either of them can be aborted
+            if status['status'] == 'finished' and info_dict['url'].endswith(f'/slow/{SLOW_FRAGMENT}'):
+                barrier.wait()
+            return hook_progress(downloader, status, info_dict)
+
+        for params in ({}, {'fragment_buffer_size': 1024 * 1024}):
+            self.httpd.requests.clear()
+            barrier.reset()
+            statuses = []
+            with patch.object(HttpQuietDownloader, '_hook_progress', finish_together):
+                self.download({
+                    **params, 'concurrent_fragment_downloads': 4, 'fragment_hedge_delay': 0.2,
+                }, 'slow', lambda s: statuses.append((s.get('fragment_index'), s['downloaded_bytes'])))
+            self.assertEqual(self.httpd.requests[SLOW_FRAGMENT], 2)
+            # The fragment is counted once
+            self.assertEqual(max(index or 0 for index, _ in statuses), FRAGMENT_COUNT)
+            self.assertEqual(statuses[-1][1], sum(len(fragment_content(i)) for i in range(FRAGMENT_COUNT)))
+
+
+class TestFragmentBufferPool(unittest.TestCase):
+    def test_pool(self):
+        pool = FragmentBufferPool(10, 2)
+        buffers = [pool.acquire() for _ in range(3)]
+        self.assertEqual([b._rolled for b in buffers], [False, False, True])
+        buffers[0].write(b'x' * 11)
+        self.assertTrue(buffers[0]._rolled)
+        pool.release(buffers[1])
+        self.assertFalse(pool.acquire()._rolled)
+        self.assertTrue(pool.acquire()._rolled)
+
+
+if __name__ == '__main__':
+    unittest.main()
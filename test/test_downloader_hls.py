@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+
+# Allow direct execution
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+import http.server
+import struct
+import threading
+
+from test.helper import http_server_port, try_rm
+from yt_dlp import YoutubeDL
+from yt_dlp.aes import aes_cbc_encrypt_bytes
+from yt_dlp.downloader import get_suitable_downloader
+from yt_dlp.downloader.external import FFmpegFD
+from yt_dlp.downloader.hls import HlsFD
+from yt_dlp.utils._utils import _YDLLogger as FakeLogger
+
+SEGMENT_COUNT = 10
+# Each request of the playlist moves its window of segments forward
+WINDOW_SIZE = 3
+WINDOW_STEP = 2
+FIRST_SEQUENCE = 100
+KEY = bytes(range(16))
+IV = bytes(range(16, 32))
+
+
+def segment_content(index):
+    return (b'%03d' % index) * (100 + index * 50)
+
+
+def encrypted_segment_content(index, iv=None):
+    data = segment_content(index)
+    padding = 16 - len(data) % 16
+    return aes_cbc_encrypt_bytes(data + bytes([padding]) * padding, KEY, iv or struct.pack('>8xq', index))
+
+
+class HTTPTestRequestHandler(http.server.BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        if self.path == '/ending.m3u8':
+            # The playlist is no longer available once it has been requested
+            with self.server.lock:
+                self.server.playlist_requests += 1
+                if self.server.playlist_requests > 1:
+                    self.send_response(404)
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+            content = '\n'.join((
+                '#EXTM3U',
+                '#EXT-X-TARGETDURATION:0.1',
+                f'#EXT-X-MEDIA-SEQUENCE:{FIRST_SEQUENCE}',
+                *(f'#EXTINF:0.1,\nseg/{i}.ts' for i in range(WINDOW_SIZE)),
+                '',
+            )).encode()
+            content_type = 'application/vnd.apple.mpegurl'
+        elif self.path == '/live.m3u8':
+            with self.server.lock:
+                start = min(self.server.playlist_requests * WINDOW_STEP, SEGMENT_COUNT - WINDOW_SIZE)
+                self.server.playlist_requests += 1
+            end = start + WINDOW_SIZE
+            content = '\n'.join((
+                '#EXTM3U',
+                '#EXT-X-VERSION:3',
+                '#EXT-X-TARGETDURATION:0.1',
+                f'#EXT-X-MEDIA-SEQUENCE:{FIRST_SEQUENCE + start}',
+                *(f'#EXTINF:0.1,\nseg/{i}.ts' for i in range(start, end)),
+                *(['#EXT-X-ENDLIST'] if end == SEGMENT_COUNT else []),
+                '',
+            )).encode()
+            content_type = 'application/vnd.apple.mpegurl'
+        elif self.path == '/encrypted.m3u8':
+            content = '\n'.join((
+                '#EXTM3U',
+                '#EXT-X-TARGETDURATION:1',
+                '#EXT-X-KEY:METHOD=AES-128,URI="/key"',
+                *(f'#EXTINF:1,\nenc/{i}.ts' for i in range(SEGMENT_COUNT)),
+                '#EXT-X-ENDLIST',
+                '',
+            )).encode()
+            content_type = 'application/vnd.apple.mpegurl'
+        elif self.path == '/encrypted_iv.m3u8':
+            content = '\n'.join((
+                '#EXTM3U',
+                '#EXT-X-TARGETDURATION:1',
+                f'#EXT-X-KEY:METHOD=AES-128,URI="/key",IV=0x{IV.hex()}',
+                *(f'#EXTINF:1,\nenc_iv/{i}.ts' for i in range(SEGMENT_COUNT)),
+                '#EXT-X-ENDLIST',
+                '',
+            )).encode()
+            content_type = 'application/vnd.apple.mpegurl'
+        elif self.path == '/key':
+            content = KEY
+            content_type = 'application/octet-stream'
+        elif self.path.startswith('/enc_iv/'):
+            content = encrypted_segment_content(int(self.path[len('/enc_iv/'):-len('.ts')]), IV)
+            content_type = 'video/mp2t'
+        elif self.path.startswith('/enc/'):
+            content = encrypted_segment_content(int(self.path[len('/enc/'):-len('.ts')]))
+            content_type = 'video/mp2t'
+        elif self.path.startswith('/seg/'):
+            index = int(self.path[len('/seg/'):-len('.ts')])
+            with self.server.lock:
+                self.server.segment_requests.append(index)
+            content = segment_content(index)
+            content_type = 'video/mp2t'
+        else:
+            assert False
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+
+class TestHlsFD(unittest.TestCase):
+    def setUp(self):
+        self.httpd = http.server.ThreadingHTTPServer(
+            ('127.0.0.1', 0), HTTPTestRequestHandler)
+        self.httpd.lock = threading.Lock()
+        self.port = http_server_port(self.httpd)
+        self.server_thread = threading.Thread(target=self.httpd.serve_forever)
+        self.server_thread.daemon = True
+        self.server_thread.start()
+
+    def tearDown(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def download_live(self, params):
+        self.httpd.playlist_requests = 0
+        self.httpd.segment_requests = []
+        params['logger'] = FakeLogger()
+        ydl = YoutubeDL(params)
+        downloader = HlsFD(ydl, params)
+        filename = 'testfile.ts'
+        try_rm(filename)
+        self.assertTrue(downloader.real_download(filename, {
+            'id': 'live',
+            'url': f'http://127.0.0.1:{self.port}/live.m3u8',
+            'protocol': 'm3u8_native',
+            'ext': 'mp4',
+            'is_live': True,
+        }))
+        with open(filename, 'rb') as f:
+            self.assertEqual(f.read(), b''.join(map(segment_content, range(SEGMENT_COUNT))))
+        self.assertCountEqual(self.httpd.segment_requests, range(SEGMENT_COUNT))
+        try_rm(filename)
+
+    def test_live(self):
+        self.download_live({})
+
+    def test_live_concurrent(self):
+        self.download_live({'concurrent_fragment_downloads': 4})
+
+    def test_live_playlist_gone(self):
+        for params in ({}, {'ignoreerrors': 'only_download'}):
+            self.httpd.playlist_requests = 0
+            self.httpd.segment_requests = []
+            params.update({'logger': FakeLogger(), 'fragment_retries': 1, 'retry_sleep_functions': {'fragment': lambda _: 0}})
+            downloader = HlsFD(YoutubeDL(params), params)
+            filename = 'testfile.ts'
+            try:
+                # What was downloaded before the playlist disappeared is kept
+                self.assertTrue(downloader.real_download(filename, {
+                    'id': 'live',
+                    'url': f'http://127.0.0.1:{self.port}/ending.m3u8',
+                    'protocol': 'm3u8_native',
+                    'ext': 'mp4',
+                    'is_live': True,
+                }))
+                with open(filename, 'rb') as f:
+                    self.assertEqual(f.read(), b''.join(map(segment_content, range(WINDOW_SIZE))), params)
+                # The initial request and one per try of the refresh
+                self.assertEqual(self.httpd.playlist_requests, 3, params)
+            finally:
+                try_rm(filename)
+
+    def test_encrypted(self):
+        for params in ({}, {'concurrent_fragment_downloads': 4}, {'fragment_buffer_size': 1024 * 1024}):
+            params['logger'] = FakeLogger()
+            downloader = HlsFD(YoutubeDL(params), params)
+            filename = 'testfile.ts'
+            try_rm(filename)
+            self.assertTrue(downloader.real_download(filename, {
+                'id': 'encrypted',
+                'url': f'http://127.0.0.1:{self.port}/encrypted.m3u8',
+                'protocol': 'm3u8_native',
+                'ext': 'mp4',
+            }))
+            with open(filename, 'rb') as f:
+                self.assertEqual(f.read(), b''.join(map(segment_content, range(SEGMENT_COUNT))), params)
+            try_rm(filename)
+
+    def test_encrypted_keep_fragments(self):
+        for params in ({}, {'concurrent_fragment_downloads': 4}):
+            params.update({'keep_fragments': True, 'logger': FakeLogger()})
+            downloader = HlsFD(YoutubeDL(params), params)
+            filename = 'testfile.ts'
+            try:
+                self.assertTrue(downloader.real_download(filename, {
+                    'id': 'encrypted',
+                    'url': f'http://127.0.0.1:{self.port}/encrypted.m3u8',
+                    'protocol': 'm3u8_native',
+                    'ext': 'mp4',
+                }))
+                with open(filename, 'rb') as f:
+                    self.assertEqual(f.read(), b''.join(map(segment_content, range(SEGMENT_COUNT))), params)
+                for i in range(1, SEGMENT_COUNT + 1):
+                    with open(f'{filename}.part-Frag{i}', 'rb') as f:
+                        self.assertEqual(f.read(), encrypted_segment_content(i - 1), params)
+                    self.assertFalse(os.path.exists(f'{filename}.part-Frag{i}.decrypted'), params)
+            finally:
+                try_rm(filename)
+                for i in range(1, SEGMENT_COUNT + 1):
+                    try_rm(f'{filename}.part-Frag{i}')
+                    try_rm(f'{filename}.part-Frag{i}.decrypted')
+
+    def test_encrypted_resume(self):
+        for params in ({}, {'concurrent_fragment_downloads': 4}):
+            filename = 'testfile.ts'
+            info_dict = {
+                'id': 'encrypted',
+                'url': f'http://127.0.0.1:{self.port}/encrypted_iv.m3u8',
+                'protocol': 'm3u8_native',
+                'ext': 'mp4',
+            }
+            params['logger'] = FakeLogger()
+            downloader = HlsFD(YoutubeDL(params), params)
+            append_fragment = downloader._append_fragment
+            appended = []
+
+            def interrupt(ctx, frag_content):
+                appended.append(frag_content)
+                if len(appended) == 3:
+                    raise KeyboardInterrupt
+                append_fragment(ctx, frag_content)
+
+            downloader._append_fragment = interrupt
+            try:
+                with self.assertRaises(KeyboardInterrupt):
+                    downloader.real_download(filename, info_dict)
+                # The process would have exited, along with the downloads that were still running
+                for thread in threading.enumerate():
+                    if thread.name.startswith('ThreadPoolExecutor'):
+                        thread.join()
+
+                downloader = HlsFD(YoutubeDL(params), params)
+                self.assertTrue(downloader.real_download(filename, info_dict))
+                with open(filename, 'rb') as f:
+                    self.assertEqual(f.read(), b''.join(map(segment_content, range(SEGMENT_COUNT))), params)
+            finally:
+                try_rm(filename)
+                try_rm(f'{filename}.part')
+                try_rm(f'{filename}.ytdl')
+                for i in range(1, SEGMENT_COUNT + 1):
+                    try_rm(f'{filename}.part-Frag{i}')
+                    try_rm(f'{filename}.part-Frag{i}.decrypted')
+
+    def test_live_routing(self):
+        info_dict = {'protocol': 'm3u8_native', 'url': 'http://127.0.0.1/live.m3u8', 'is_live': True}
+        self.assertIs(get_suitable_downloader(info_dict, {}), FFmpegFD)
+        self.assertIs(get_suitable_downloader(info_dict, {'external_downloader': 'native'}), HlsFD)
+
+    def test_parse_live_fragments(self):
+        downloader = HlsFD(YoutubeDL({'logger': FakeLogger()}), {})
+        fragments = downloader._parse_fragments('\n'.join((
+            '#EXTM3U',
+            '#EXT-X-MEDIA-SEQUENCE:7',
+            '#EXT-X-MAP:URI="init.mp4"',
+            '#EXTINF:1,', 'a.m4s',
+            '#UPLYNK-SEGMENT:0,00000000,ad',
+            '#EXTINF:1,', 'ad.m4s',
+            '#UPLYNK-SEGMENT:0,00000000,segment',
+            '#EXTINF:1,', 'b.m4s',
+        )), 'http://127.0.0.1/live.m3u8', {}, live=True)
+        self.assertEqual(
+            [(fragment['url'], fragment.get('sequence')) for fragment in fragments],
+            [('http://127.0.0.1/init.mp4', None), ('http://127.0.0.1/a.m4s', 7), ('http://127.0.0.1/b.m4s', 9)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -9,6 +9,7 @@
 
 
 import http.server
+import json
 import re
 import threading
 
@@ -16,11 +17,13 @@
 from yt_dlp import YoutubeDL
 from yt_dlp.downloader.http import HttpFD
 from yt_dlp.utils._utils import _YDLLogger as FakeLogger
+from yt_dlp.utils.progress import RateLimiter
 
 TEST_DIR = os.path.dirname(os.path.abspath(__file__))
 
 
 TEST_SIZE = 10 * 1024
+TEST_DATA = bytes(i % 251 for i in range(TEST_SIZE))
 
 
 class HTTPTestRequestHandler(http.server.BaseHTTPRequestHandler):
@@ -36,23 +39,24 @@ def send_content_range(self, total=None):
                 start = int(mobj.group(1))
                 end = int(mobj.group(2))
         valid_range = start is not None and end is not None
+        self.server.ranges.append((start, end))
         if valid_range:
             content_range = f'bytes {start}-{end}'
             if total:
                 content_range += f'/{total}'
             self.send_header('Content-Range', content_range)
-        return (end - start + 1) if valid_range else total
+        return ((end - start + 1) if valid_range else total), start or 0
 
     def serve(self, range=True, content_length=True):
         self.send_response(200)
         self.send_header('Content-Type', 'video/mp4')
-        size = TEST_SIZE
+        size, start = TEST_SIZE, 0
         if range:
-            size = self.send_content_range(TEST_SIZE)
+            size, start = self.send_content_range(TEST_SIZE)
         if content_length:
             self.send_header('Content-Length', size)
         self.end_headers()
-        self.wfile.write(b'#' * size)
+        self.wfile.write(TEST_DATA[start:start + size])
 
     def do_GET(self):
         if self.path == '/regular':
@@ -69,8 +73,9 @@ def do_GET(self):
 
 class TestHttpFD(unittest.TestCase):
     def setUp(self):
-        self.httpd = http.server.HTTPServer(
+        self.httpd = http.server.ThreadingHTTPServer(
             ('127.0.0.1', 0), HTTPTestRequestHandler)
+        self.httpd.ranges = []
         self.port = http_server_port(self.httpd)
         self.server_thread = threading.Thread(target=self.httpd.serve_forever)
         self.server_thread.daemon = True
@@ -80,12 +85,14 @@ def download(self, params, ep):
         params['logger'] = FakeLogger()
         ydl = YoutubeDL(params)
         downloader = HttpFD(ydl, params)
+        downloader._MIN_SEGMENT_SIZE = 1000
         filename = 'testfile.mp4'
-        try_rm(filename)
         self.assertTrue(downloader.real_download(filename, {
             'url': f'http://127.0.0.1:{self.port}/{ep}',
         }), ep)
-        self.assertEqual(os.path.getsize(filename), TEST_SIZE, ep)
+        with open(filename, 'rb') as f:
+            self.assertEqual(f.read(), TEST_DATA, ep)
+        self.assertFalse(os.path.exists(f'{filename}.ytdl'))
         try_rm(filename)
 
     def download_all(self, params):
@@ -100,6 +107,75 @@ def test_chunked(self):
             'http_chunk_size': 1000,
         })
 
+    def test_segmented(self):
+        self.download_all({'http_connections': 4})
+        self.httpd.ranges.clear()
+        self.download({'http_connections': 4}, 'regular')
+        # The probe and one request per range
+        self.assertEqual(self.httpd.ranges[0], (0, 0))
+        self.assertEqual(sorted(self.httpd.ranges[1:]), [(0, 2559), (2560, 5119), (5120, 7679), (7680, 10239)])
+
+    def test_segmented_resume(self):
+        # The first range is complete and the second one is half done
+        ranges = [[0, 5120, 5120], [5120, 10240, 1000]]
+        with open('testfile.mp4.part', 'wb') as f:
+            f.write(TEST_DATA[:6120] + b'\0' * (TEST_SIZE - 6120))
+        with open('testfile.mp4.ytdl', 'w') as f:
+            json.dump({'downloader': {'content_length': TEST_SIZE, 'http_ranges': ranges}}, f)
+        self.download({'http_connections': 4}, 'regular')
+        self.assertEqual(self.httpd.ranges, [(0, 0), (6120, 10239)])
+
+    def test_segmented_state(self):
+        downloader = HttpFD(YoutubeDL({'logger': FakeLogger()}), {'http_connections': 4, 'buffersize': 256})
+        downloader._MIN_SEGMENT_SIZE = 1000
+        downloader._SEGMENTED_STATE_INTERVAL = 0
+        write_segmented_state = downloader._write_segmented_state
+        checked = []
+
+        def check_state(ytdl_filename, content_len, ranges):
+            # The progress that is saved only counts the bytes that are in the file
+            with open('testfile.mp4.part', 'rb') as f:
+                for r in ranges:
+                    f.seek(r['start'])
+                    self.assertEqual(f.read(r['downloaded']), TEST_DATA[r['start']:r['start'] + r['downloaded']])
+            checked.append(sum(r['downloaded'] for r in ranges))
+            write_segmented_state(ytdl_filename, content_len, ranges)
+
+        downloader._write_segmented_state = check_state
+        try:
+            self.assertTrue(downloader.real_download('testfile.mp4', {'url': f'http://127.0.0.1:{self.port}/regular'}))
+            self.assertGreater(len(checked), 2)
+        finally:
+            try_rm('testfile.mp4')
+            try_rm('testfile.mp4.part')
+            try_rm('testfile.mp4.ytdl')
+
+    def test_segmented_resume_single(self):
+        # Left over by a download over a single connection
+        with open('testfile.mp4.part', 'wb') as f:
+            f.write(TEST_DATA[:2000])
+        self.download({'http_connections': 2}, 'regular')
+        self.assertEqual(self.httpd.ranges[0], (0, 0))
+        self.assertEqual(sorted(self.httpd.ranges[1:]), [(2000, 6119), (6120, 10239)])
+
+    def test_segmented_rate_limiter(self):
+        rate_limiter = RateLimiter(TEST_SIZE * 1000)
+        consumed = []
+        rate_limiter.consume = consumed.append
+        downloader = HttpFD(YoutubeDL({'logger': FakeLogger()}), {
+            'http_connections': 4, 'buffersize': 256, 'noresizebuffer': True,
+            'ratelimit': TEST_SIZE * 1000, '_rate_limiter': rate_limiter,
+        })
+        downloader._MIN_SEGMENT_SIZE = 1000
+        try:
+            self.assertTrue(downloader.real_download('testfile.mp4', {'url': f'http://127.0.0.1:{self.port}/regular'}))
+            # Every byte is charged once, although the connections share their byte counter
+            self.assertEqual(sum(consumed), TEST_SIZE)
+        finally:
+            try_rm('testfile.mp4')
+            try_rm('testfile.mp4.part')
+            try_rm('testfile.mp4.ytdl')
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+
+# Allow direct execution
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+import io
+import json
+import threading
+import urllib.parse
+
+from test.helper import try_rm
+from yt_dlp import YoutubeDL
+from yt_dlp.downloader.youtube_live_chat import YoutubeLiveChatFD
+from yt_dlp.networking.common import Response
+from yt_dlp.networking.exceptions import HTTPError
+from yt_dlp.utils import DownloadError
+from yt_dlp.utils._utils import _YDLLogger as FakeLogger
+
+DURATION = 3600
+# The chat continues for a while after the end of the video
+OFFSETS = range(0, DURATION * 1000 + 60000, 7000)
+ACTIONS_PER_RESPONSE = 20
+
+WATCH_PAGE = '''<html><script>var ytInitialData = %s;</script>
+<script>ytcfg.set({"INNERTUBE_API_KEY": "key", "INNERTUBE_CONTEXT": {"client": {"clientName": "WEB", "clientVersion": "2.0", "visitorData": "visitor"}}});</script>
+</html>''' % json.dumps({'contents': {'twoColumnWatchNextResults': {'conversationBar': {'liveChatRenderer': {
+    'continuations': [{'reloadContinuationData': {'continuation': 'top'}}]}}}}})
+
+CHAT_PAGE = '''<html><script>window["ytInitialData"] = %s;</script></html>''' % json.dumps({
+    'continuationContents': {'liveChatContinuation': {'header': {'liveChatHeaderRenderer': {'viewSelector': {
+        'sortFilterSubMenuRenderer': {'subMenuItems': [
+            {'continuation': {'reloadContinuationData': {'continuation': 'top'}}},
+            {'continuation': {'reloadContinuationData': {'continuation': 'all', 'trackingParams': 'tracking'}}},
+        ]}}}}}}})
+
+
+def action(index):
+    return {'replayChatItemAction': {
+        'actions': [{'addChatItemAction': {'item': {'liveChatTextMessageRenderer': {'id': str(index)}}}}],
+        'videoOffsetTimeMsec': str(OFFSETS[index]),
+    }}
+
+
+EXPECTED = b''.join(json.dumps(action(i)).encode() + b'\n' for i in range(len(OFFSETS)))
+
+
+class FakeYouTube:
+    def __init__(self, fail_from=None):
+        self.lock = threading.Lock()
+        # The offset from which the requests of the replay fail
+        self.fail_from = fail_from
+        self.seeds = []
+
+    def urlopen(self, request):
+        url = urllib.parse.urlparse(request.url)
+        if url.path == '/watch':
+            content = WATCH_PAGE
+        elif url.path == '/live_chat_replay':
+            content = CHAT_PAGE
+        elif url.path == '/youtubei/v1/live_chat/get_live_chat_replay':
+            content = self.replay(json.loads(request.data))
+            if content is None:
+                raise HTTPError(Response(io.BytesIO(), request.url, {}, 500))
+        else:
+            raise AssertionError(f'Unexpected request: {request.url}')
+        content = content.encode()
+        return Response(io.BytesIO(content), request.url, {
+            'Content-Type': 'text/html', 'Content-Length': str(len(content))}, 200)
+
+    def replay(self, request_data):
+        continuation = request_data['continuation']
+        player_offset = int(request_data['currentPlayerState']['playerOffsetMs'])
+        if continuation == 'all':
+            with self.lock:
+                self.seeds.append(player_offset)
+            # The response starts a little before the requested offset
+            start = next((i for i, offset in enumerate(OFFSETS) if offset >= player_offset - 10000), len(OFFSETS))
+        else:
+            assert request_data['context']['clickTracking']['clickTrackingParams'] == continuation
+            start = int(continuation)
+        end = min(start + ACTIONS_PER_RESPONSE, len(OFFSETS))
+        if self.fail_from is not None and OFFSETS[start] >= self.fail_from:
+            return None
+        live_chat_continuation = {'actions': [action(i) for i in range(start, end)]}
+        if end < len(OFFSETS):
+            live_chat_continuation['continuations'] = [{'liveChatReplayContinuationData': {
+                'continuation': str(end), 'clickTrackingParams': str(end)}}]
+        return json.dumps({'continuationContents': {'liveChatContinuation': live_chat_continuation}})
+
+
+class TestYoutubeLiveChatFD(unittest.TestCase):
+    FILENAME = 'testfile.live_chat.json'
+
+    def tearDown(self):
+        try_rm(self.FILENAME)
+        try_rm(self.FILENAME + '.part')
+        try_rm(self.FILENAME + '.ytdl')
+
+    def download(self, youtube, **params):
+        params = {'logger': FakeLogger(), 'fragment_retries': 0, **params}
+        ydl = YoutubeDL(params)
+        ydl.urlopen = youtube.urlopen
+        downloader = YoutubeLiveChatFD(ydl, params)
+        return downloader.real_download(self.FILENAME, {
+            'url': 'https://www.youtube.com/watch?v=abcdefghijk',
+            'video_id': 'abcdefghijk',
+            'ext': 'json',
+            'protocol': 'youtube_live_chat_replay',
+            'duration': DURATION,
+        })
+
+    def assertDownloaded(self):
+        with open(self.FILENAME, 'rb') as f:
+            self.assertEqual(f.read(), EXPECTED)
+
+    def test_sequential(self):
+        youtube = FakeYouTube()
+        self.assertTrue(self.download(youtube))
+        self.assertDownloaded()
+        self.assertEqual(youtube.seeds, [0])
+
+    def test_partitions(self):
+        for params in ({}, {'fragment_buffer_size': 1024 * 1024}):
+            youtube = FakeYouTube()
+            self.assertTrue(self.download(youtube, concurrent_fragment_downloads=4, **params))
+            self.assertDownloaded()
+            self.assertEqual(sorted(youtube.seeds), [i * 300000 for i in range(12)])
+
+    def test_partitions_resume(self):
+        youtube = FakeYouTube(fail_from=1000000)
+        with self.assertRaises(DownloadError):
+            self.download(youtube, concurrent_fragment_downloads=4)
+        with open(self.FILENAME + '.ytdl') as f:
+            self.assertEqual(json.load(f)['downloader']['current_fragment']['index'], 3)
+
+        youtube = FakeYouTube()
+        self.assertTrue(self.download(youtube, concurrent_fragment_downloads=4))
+        self.assertDownloaded()
+        # The parts that were already downloaded are not requested again
+        self.assertEqual(sorted(youtube.seeds), [i * 300000 for i in range(3, 12)])
+
+    def test_replay_partitions(self):
+        downloader = YoutubeLiveChatFD(YoutubeDL({'logger': FakeLogger()}), {'concurrent_fragment_downloads': 4})
+        info_dict = {'protocol': 'youtube_live_chat_replay', 'duration': 700}
+        self.assertEqual(downloader._replay_partitions(info_dict), [(0, 233334), (233334, 466668), (466668, None)])
+        self.assertIsNone(downloader._replay_partitions({**info_dict, 'duration': 300}))
+        self.assertIsNone(downloader._replay_partitions({**info_dict, 'duration': None}))
+        self.assertIsNone(downloader._replay_partitions({**info_dict, 'protocol': 'youtube_live_chat'}))
+        downloader.params['concurrent_fragment_downloads'] = 1
+        self.assertIsNone(downloader._replay_partitions(info_dict))
+
+
+if __name__ == '__main__':
+    unittest.main()
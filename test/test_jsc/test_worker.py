@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+import pytest
+
+from yt_dlp.extractor.youtube.jsc._builtin.ejs import Script, ScriptSource, ScriptType, ScriptVariant
+from yt_dlp.extractor.youtube.jsc._builtin.node import NodeJCP
+from yt_dlp.extractor.youtube.jsc._builtin.worker import JsRuntimeWorker, JsRuntimeWorkerError, worker_script
+from yt_dlp.extractor.youtube.jsc.provider import (
+    JsChallengeProviderError,
+    JsChallengeRequest,
+    JsChallengeType,
+    NChallengeInput,
+    NChallengeOutput,
+)
+
+PLAYER_URL = 'https://www.youtube.com/s/player/12345678/player_ias.vflset/en_US/base.js'
+
+# Stand-in for the solver: "preprocesses" the player into code that sets an n solver prefixing
+# the reverse of a challenge with the upper-cased player, and a sig solver returning how many
+# times the preprocessed player has been evaluated
+FAKE_LIB = 'var lib = {};'
+FAKE_CORE = r'''
+var jsc = (input) => {
+  const preprocess = (player) => (player === 'crash' ? 'process.exit(1);' : `
+    globalThis.evaluations = (globalThis.evaluations || 0) + 1;
+    _result.n = (c) => ${JSON.stringify(player.toUpperCase())} + ':' + [...c].reverse().join('');
+    _result.sig = () => String(globalThis.evaluations);`);
+  const preprocessed = input.type === 'player' ? preprocess(input.player) : input.preprocessed_player;
+  const solvers = { n: null, sig: null };
+  Function('_result', preprocessed)(solvers);
+  const output = {
+    type: 'result',
+    responses: input.requests.map((request) => ({
+      type: 'result',
+      data: Object.fromEntries(request.challenges.map((c) => [c, solvers[request.type](c)])),
+    })),
+  };
+  if (input.output_preprocessed) {
+    output.preprocessed_player = preprocessed;
+  }
+  return output;
+};
+'''
+
+
+@pytest.fixture
+def jcp(ie, logger):
+    obj = NodeJCP(ie, logger, None)
+    if not obj.is_available():
+        pytest.skip(f'{obj.PROVIDER_NAME} is not available')
+    obj._lib_script = Script(ScriptType.LIB, ScriptVariant.UNKNOWN, ScriptSource.BUILTIN, '0', FAKE_LIB)
+    obj._core_script = Script(ScriptType.CORE, ScriptVariant.UNKNOWN, ScriptSource.BUILTIN, '0', FAKE_CORE)
+    obj.player_loads = 0
+
+    def _get_player(video_id, player_url):
+        obj.player_loads += 1
+        return obj.player
+
+    obj.player = 'player'
+    obj._get_player = _get_player
+    yield obj
+    obj.close()
+
+
+def solve(jcp, *challenges):
+    request = JsChallengeRequest(JsChallengeType.N, NChallengeInput(PLAYER_URL, list(challenges)), 'video_id')
+    return [response.response.output for response in jcp.bulk_solve([request])]
+
+
+def test_worker_is_reused(jcp):
+    assert solve(jcp, 'abc', 'def') == [NChallengeOutput({'abc': 'PLAYER:cba', 'def': 'PLAYER:fed'})]
+    worker = jcp._workers[PLAYER_URL]
+    assert solve(jcp, 'ghi') == [NChallengeOutput({'ghi': 'PLAYER:ihg'})]
+    assert jcp._workers[PLAYER_URL] is worker
+    assert jcp.player_loads == 1
+
+
+def test_worker_restart(jcp):
+    assert solve(jcp, 'abc') == [NChallengeOutput({'abc': 'PLAYER:cba'})]
+    worker = jcp._workers[PLAYER_URL]
+    worker._proc.kill()
+    worker._proc.wait()
+    assert solve(jcp, 'abc') == [NChallengeOutput({'abc': 'PLAYER:cba'})]
+    assert jcp._workers[PLAYER_URL] is not worker
+    assert not worker.alive
+    assert jcp.player_loads == 2
+
+
+def test_worker_crash(jcp):
+    jcp.player = 'crash'
+    with pytest.raises(JsChallengeProviderError, match='exited unexpectedly'):
+        solve(jcp, 'abc')
+    assert not jcp._workers
+
+
+def test_worker_disabled(jcp):
+    jcp.ejs_settings = {'worker': ['false']}
+    assert solve(jcp, 'abc') == [NChallengeOutput({'abc': 'PLAYER:cba'})]
+    assert not jcp._workers
+
+
+def test_worker_protocol(jcp):
+    worker = JsRuntimeWorker('node', jcp._worker_command, worker_script(FAKE_LIB, FAKE_CORE))
+    try:
+        assert worker.request({'type': 'solve', 'requests': []})['type'] == 'error'
+        assert worker.request({'type': 'unknown'}) == {'type': 'error', 'error': 'Unknown message type: unknown'}
+        output = worker.request({'type': 'load', 'player': 'x' * 200_000, 'output_preprocessed': True})
+        assert output['type'] == 'result'
+        assert output['responses'] == []
+        assert 'X' * 200_000 in output['preprocessed_player']
+        assert worker.request({'type': 'solve', 'requests': [{'type': 'n', 'challenges': ['ab']}]})['responses'] == [
+            {'type': 'result', 'data': {'ab': f'{"X" * 200_000}:ba'}}]
+        # The preprocessed player is only evaluated when it is loaded, by jsc() and by the worker
+        for _ in range(2):
+            assert worker.request({'type': 'solve', 'requests': [{'type': 'sig', 'challenges': ['ab']}]}) == {
+                'type': 'result', 'responses': [{'type': 'result', 'data': {'ab': '2'}}]}
+        assert worker.request({'type': 'load', 'preprocessed_player': output['preprocessed_player']}) == {
+            'type': 'result', 'responses': []}
+        assert worker.request({'type': 'solve', 'requests': [{'type': 'sig', 'challenges': ['ab']}]}) == {
+            'type': 'result', 'responses': [{'type': 'result', 'data': {'ab': '3'}}]}
+        assert worker.request({'type': 'solve', 'requests': [{'type': 'unknown', 'challenges': []}]}) == {
+            'type': 'result', 'responses': [{'type': 'error', 'error': 'Unknown request type: unknown'}]}
+    finally:
+        worker.close()
+    assert not worker.alive
+    with pytest.raises(JsRuntimeWorkerError):
+        worker.check_health()
@@ -508,6 +508,20 @@ def test_extract_function_with_global_stack(self):
         func = jsi.extract_function('c', {'e': 10}, {'f': 100, 'g': 1000})
         self.assertEqual(func([1]), 1111)
 
+    def test_repeated_calls(self):
+        jsi = JSInterpreter('''
+            function f(x) {
+                var a = [1, [2]], b = {"c": x}, c = [3], d = "xyz".split("");
+                a.push(x); a[1].push(x); c.push(x); d.reverse();
+                for (var i = 0; i < 3; i++) { if (i == x) { break; } x = x + i; }
+                return [a, b, c, d, x];
+            }''')
+        func = jsi.extract_function('f')
+        for _ in range(3):
+            # Each call must get its own copy of the literals
+            self.assertEqual(func([4]), [[1, [2, 4], 4], {'c': 4}, [3, 4], ['z', 'y', 'x'], 7])
+            self.assertEqual(func([1]), [[1, [2, 1], 1], {'c': 1}, [3, 1], ['z', 'y', 'x'], 1])
+
     def test_extract_object(self):
         jsi = JSInterpreter('var a={};a.xy={};var xy;var zxy={};xy={z:function(){return "abc"}};')
         self.assertTrue('z' in jsi.extract_object('xy', None))
@@ -90,6 +90,18 @@ def _redirect(self):
         self.send_header('Content-Length', '0')
         self.end_headers()
 
+    # Methods of the requests to /drop_reused
+    drop_reused_requests = []
+
+    def _drop_reused(self, method):
+        HTTPTestRequestHandler.drop_reused_requests.append(method)
+        if getattr(self, '_answered', False):
+            # Like a server that closes a kept-alive connection while a request is sent over it
+            self.close_connection = True
+            return
+        self._answered = True
+        self._method(method)
+
     def _method(self, method, payload=None):
         self.send_response(200)
         self.send_header('Content-Length', str(len(payload or '')))
@@ -118,6 +130,8 @@ def do_POST(self):
             self._redirect()
         elif self.path.startswith('/method'):
             self._method('POST', data)
+        elif self.path == '/drop_reused':
+            self._drop_reused('POST')
         elif self.path.startswith('/headers'):
             self._headers()
         else:
@@ -190,6 +204,8 @@ def do_GET(self):
             self._redirect()
         elif self.path.startswith('/method'):
             self._method('GET', str(self.headers).encode())
+        elif self.path == '/drop_reused':
+            self._drop_reused('GET')
         elif self.path.startswith('/headers'):
             self._headers()
         elif self.path.startswith('/308-to-headers'):
@@ -766,6 +782,23 @@ def test_partial_read_greater_than_response_then_full_read(self, handler):
                 assert res.read(0) == b''
                 assert res.read() == b''
 
+    def test_readinto(self, handler):
+        with handler() as rh:
+            for encoding in ('', 'gzip', 'deflate'):
+                res = validate_and_send(rh, Request(
+                    f'http://127.0.0.1:{self.http_port}/content-encoding',
+                    headers={'ytdl-encoding': encoding}))
+                buffer = bytearray(512)
+                assert res.readinto(memoryview(buffer)[:6]) == 6
+                assert buffer[:6] == b'<html>'
+                size = res.readinto(buffer)
+                assert buffer[:size] == b'<video src="/vid.mp4" /></html>'[:size]
+                data = bytes(buffer[:size])
+                while size := res.readinto(buffer):
+                    data += buffer[:size]
+                assert data == b'<video src="/vid.mp4" /></html>'
+                assert res.readinto(buffer) == 0
+
 
 @pytest.mark.parametrize('handler', ['Urllib', 'Requests', 'CurlCFFI'], indirect=True)
 @pytest.mark.handler_flaky('CurlCFFI', reason='segfaults')
@@ -953,6 +986,45 @@ def test_data_uri_partial_read_greater_than_response_then_full_read(self, handle
             assert res.fp.closed
             assert res.closed
 
+    def test_keep_alive(self, handler):
+        url = f'http://127.0.0.1:{self.http_port}/gen_200'
+        with handler() as rh:
+            pool = rh._connection_pool
+            for _ in range(3):
+                assert validate_and_send(rh, Request(url)).read() == b'<html></html>'
+            assert (pool.hits, pool.misses) == (2, 1)
+
+            # A connection with unread data left cannot be reused
+            res = validate_and_send(rh, Request(url))
+            res.close()
+            assert validate_and_send(rh, Request(url)).read() == b'<html></html>'
+            assert (pool.hits, pool.misses) == (3, 2)
+
+            # Connections are shared by all requests to the same host
+            validate_and_send(rh, Request(f'http://127.0.0.1:{self.http_port}/headers')).read()
+            assert (pool.hits, pool.misses) == (4, 2)
+
+        with handler(keep_alive_pool_size=0) as rh:
+            headers = validate_and_send(rh, Request(f'http://127.0.0.1:{self.http_port}/headers')).read()
+            assert b'Connection: close' in headers
+            assert (rh._connection_pool.hits, rh._connection_pool.misses) == (0, 0)
+
+    def test_keep_alive_closed(self, handler):
+        url = f'http://127.0.0.1:{self.http_port}/drop_reused'
+        requests = HTTPTestRequestHandler.drop_reused_requests
+        requests.clear()
+        with handler() as rh:
+            validate_and_send(rh, Request(url)).read()
+            # Sent again over a new connection
+            validate_and_send(rh, Request(url)).read()
+            assert requests == ['GET', 'GET', 'GET']
+
+            # The server may have processed it, so it is not sent again
+            requests.clear()
+            with pytest.raises(TransportError):
+                validate_and_send(rh, Request(url, data=b'data'))
+            assert requests == ['POST']
+
     def test_http_error_returns_content(self, handler):
         # urllib HTTPError will try close the underlying response if reference to the HTTPError object is lost
         def get_response():
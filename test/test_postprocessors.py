@@ -8,16 +8,27 @@
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 
+import json
+import shutil
 import subprocess
+import tempfile
+from unittest.mock import patch
 
+from test.helper import try_rm
 from yt_dlp import YoutubeDL
 from yt_dlp.utils import shell_quote
 from yt_dlp.postprocessor import (
     ExecPP,
+    FFmpegEmbedSubtitlePP,
+    FFmpegFixupStretchedPP,
+    FFmpegMetadataPP,
+    FFmpegPlanPP,
+    FFmpegPostProcessor,
     FFmpegThumbnailsConvertorPP,
     MetadataFromFieldPP,
     MetadataParserPP,
     ModifyChaptersPP,
+    PostProcessor,
     SponsorBlockPP,
 )
 
@@ -92,6 +103,122 @@ def test_parse_cmd(self):
         self.assertEqual(pp.parse_cmd('echo %(filepath)q', info), cmd)
 
 
+FAKE_FFMPEG = '''#!/bin/sh
+echo "$0 $*" >> "$(dirname "$0")/calls.log"
+if [ "$1" = "-bsfs" ]; then
+    echo "$(basename "$0") version 7.0 Copyright (c) the FFmpeg developers"
+else
+    echo '%s'
+fi
+'''
+
+
+@unittest.skipIf(os.name == 'nt', 'Uses shell scripts as ffmpeg')
+class TestFFmpegCache(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        metadata = {
+            'format': {'format_name': 'mov,mp4', 'duration': '12.5'},
+            'streams': [{'codec_type': 'video', 'codec_name': 'h264'}, {'codec_type': 'audio', 'codec_name': 'aac'}],
+        }
+        for name in ('ffmpeg', 'ffprobe'):
+            path = os.path.join(self.test_dir, name)
+            with open(path, 'w') as f:
+                f.write(FAKE_FFMPEG % json.dumps(metadata))
+            os.chmod(path, 0o755)
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def calls(self, arg):
+        with open(os.path.join(self.test_dir, 'calls.log')) as f:
+            return sum(arg in line.split() for line in f)
+
+    def make_pp(self):
+        return FFmpegPostProcessor(YoutubeDL({
+            'quiet': True,
+            'ffmpeg_location': self.test_dir,
+            'cachedir': os.path.join(self.test_dir, 'cache'),
+        }))
+
+    def test_version_cache(self):
+        self.assertEqual(self.make_pp()._versions, {'ffmpeg': '7.0', 'ffprobe': '7.0'})
+        self.assertEqual(self.calls('-bsfs'), 2)
+        # A new process only has the cache directory
+        FFmpegPostProcessor._version_cache.clear()
+        self.assertEqual(self.make_pp()._versions, {'ffmpeg': '7.0', 'ffprobe': '7.0'})
+        self.assertEqual(self.calls('-bsfs'), 2)
+
+        FFmpegPostProcessor._version_cache.clear()
+        os.utime(os.path.join(self.test_dir, 'ffmpeg'), (0, 0))
+        self.assertEqual(self.make_pp()._versions, {'ffmpeg': '7.0', 'ffprobe': '7.0'})
+        self.assertEqual(self.calls('-bsfs'), 3)
+
+    def test_probe_cache(self):
+        pp = self.make_pp()
+        filename = os.path.join(self.test_dir, 'test.mp4')
+        with open(filename, 'wb') as f:
+            f.write(b'\0' * 100)
+        self.assertEqual(pp.get_audio_codec(filename), 'aac')
+        self.assertEqual(pp._get_real_video_duration(filename), 12.5)
+        self.assertEqual(pp.get_metadata_object(filename)['format']['format_name'], 'mov,mp4')
+        self.assertEqual(self.calls('-show_streams'), 1)
+
+        # A file rewritten by ffmpeg keeps its size and utime
+        stat = os.stat(filename)
+        with open(filename + '.temp', 'wb') as f:
+            f.write(b'\1' * 100)
+        os.utime(filename + '.temp', ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        os.replace(filename + '.temp', filename)
+        self.assertEqual(pp.get_audio_codec(filename), 'aac')
+        self.assertEqual(self.calls('-show_streams'), 2)
+
+
+class TestFFmpegPlanPP(unittest.TestCase):
+    def test_combine(self):
+        Operation = FFmpegPlanPP._Operation
+        inputs, opts = FFmpegPlanPP._combine([
+            Operation(None, '', ['a.vtt', 'b.vtt'], [
+                *FFmpegPostProcessor.stream_copy_opts(ext='mp4'), '-map', '-0:s', '-map', '1:0', '-map', '2:0'], []),
+            Operation(None, '', [], [*FFmpegPostProcessor.stream_copy_opts(), '-aspect', '2.000000'], []),
+            Operation(None, '', ['test.meta'], [
+                *FFmpegPostProcessor.stream_copy_opts(), '-map_metadata', '1', '-metadata:s:0', 'language=eng'], []),
+        ], 'mp4')
+        self.assertEqual(inputs, ['a.vtt', 'b.vtt', 'test.meta'])
+        self.assertEqual(opts, [
+            *FFmpegPostProcessor.stream_copy_opts(ext='mp4'), '-map', '-0:s', '-map', '1:0', '-map', '2:0',
+            '-aspect', '2.000000', '-map_metadata', '3', '-metadata:s:0', 'language=eng'])
+
+    def test_run_all_pps(self):
+        sub_filename = 'test.en.vtt'
+        with open(sub_filename, 'w') as f:
+            f.write('WEBVTT\n')
+        ydl = YoutubeDL({'quiet': True})
+        ydl.add_post_processor(FFmpegMetadataPP(ydl, add_chapters=False, add_infojson=False), when='post_process')
+        ydl.add_post_processor(PostProcessor(ydl), when='post_process')
+        ydl.add_post_processor(FFmpegEmbedSubtitlePP(ydl), when='post_process')
+        ydl.add_post_processor(FFmpegMetadataPP(ydl, add_chapters=False, add_infojson=False), when='post_process')
+        info = {
+            'id': 'test', 'title': 'test', 'ext': 'mp4', 'vcodec': 'h264', 'acodec': 'aac', 'stretched_ratio': 2,
+            'requested_subtitles': {'en': {'ext': 'vtt', 'filepath': sub_filename}},
+            '__postprocessors': [FFmpegFixupStretchedPP(ydl)],
+        }
+        with patch.object(FFmpegPostProcessor, '_rewrite_file', autospec=True) as rewrite_file:
+            info = ydl.run_all_pps('post_process', dict(info, filepath='test.mp4'), additional_pps=info['__postprocessors'])
+        calls = [(type(pp), inputs, opts) for (pp, filename, inputs, opts), _ in rewrite_file.call_args_list]
+        self.assertEqual([(pp, inputs) for pp, inputs, _ in calls], [
+            (FFmpegPlanPP, []), (FFmpegPlanPP, [sub_filename])])
+        base_opts = list(FFmpegPostProcessor.stream_copy_opts(ext='mp4'))
+        self.assertEqual(calls[0][2][:len(base_opts) + 2], [*base_opts, '-aspect', '2.000000'])
+        self.assertIn('title=test', calls[0][2])
+        self.assertEqual(calls[1][2][len(base_opts):len(base_opts) + 4], ['-map', '-0:s', '-map', '1:0'])
+        self.assertEqual(calls[1][2].count('title=test'), 1)
+        self.assertNotIn('__ffmpeg_plan', info)
+        # The subtitles are only deleted once the plan has run
+        self.assertFalse(os.path.exists(sub_filename))
+        try_rm(sub_filename)
+
+
 class TestModifyChaptersPP(unittest.TestCase):
     def setUp(self):
         self._pp = ModifyChaptersPP(YoutubeDL())
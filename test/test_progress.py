@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+
+# Allow direct execution
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+import threading
+from unittest.mock import patch
+
+from yt_dlp import YoutubeDL
+from yt_dlp.downloader.http import HttpFD
+from yt_dlp.utils._utils import _YDLLogger as FakeLogger
+from yt_dlp.utils.progress import ProgressCalculator, RateLimiter
+
+
+class TestProgressCalculator(unittest.TestCase):
+    def test_threads(self):
+        progress = ProgressCalculator(1000)
+        barrier = threading.Barrier(8)
+
+        def download():
+            barrier.wait()
+            for _ in range(10):
+                for size in range(100, 1001, 100):
+                    progress.update(size)
+                progress.thread_reset()
+
+        threads = [threading.Thread(target=download) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(progress.downloaded, 1000 + 8 * 10 * 1000)
+
+    def test_thread_discard(self):
+        progress = ProgressCalculator(1000)
+        progress.update(300)
+        progress.thread_reset()
+        progress.update(200)
+        progress.thread_discard()
+        self.assertEqual(progress.downloaded, 1300)
+        progress.update(100)
+        self.assertEqual(progress.downloaded, 1400)
+
+    def test_total(self):
+        progress = ProgressCalculator(None)
+        progress.total = 500
+        progress.update(1000)
+        self.assertEqual(progress.downloaded, 1000)
+        self.assertEqual(progress.total, 1000)
+        progress.total = 200
+        self.assertEqual(progress.total, 1000)
+        progress.total = None
+        self.assertIsNone(progress.total)
+
+
+class TestRateLimiter(unittest.TestCase):
+    def test_consume(self):
+        now, sleeps = [100.0], []
+
+        def sleep(delay):
+            sleeps.append(delay)
+            now[0] += delay
+
+        with patch('time.monotonic', lambda: now[0]), patch('time.sleep', sleep):
+            limiter = RateLimiter(1000)
+            limiter.consume(500)
+            limiter.consume(0)
+            limiter.consume(1000)
+            # Up to a second of unused bandwidth is used up
+            now[0] += 10
+            limiter.consume(2000)
+        self.assertEqual(sleeps, [0.5, 1.0, 1.0])
+
+    def test_slow_down(self):
+        consumed = []
+        ydl = YoutubeDL({'logger': FakeLogger()})
+        downloader = HttpFD(ydl, {'ratelimit': 1000, '_rate_limiter': RateLimiter(1000)})
+        downloader.params['_rate_limiter'].consume = consumed.append
+        downloader.slow_down(10, None, 100)
+        downloader.slow_down(10, None, 250)
+        # Another download
+        downloader.slow_down(20, None, 50)
+        self.assertEqual(consumed, [100, 150, 50])
+
+
+class TestProgressRendering(unittest.TestCase):
+    def make_downloader(self, **params):
+        ydl = YoutubeDL({'logger': FakeLogger(), **params})
+        downloader = HttpFD(ydl, ydl.params)
+        rendered = []
+        downloader._report_progress_status = lambda s, _: rendered.append((s['status'], s.get('progress_idx')))
+        return downloader, rendered
+
+    def report(self, downloader, status, **kwargs):
+        downloader._hook_progress({
+            'status': status,
+            'downloaded_bytes': 100,
+            'total_bytes': 1000,
+            'filename': 'test',
+            **kwargs,
+        }, {})
+
+    def test_frame_rate(self):
+        downloader, rendered = self.make_downloader()
+        with patch('time.monotonic', return_value=100.0):
+            for _ in range(50):
+                self.report(downloader, 'downloading')
+            # Every progress line has its own frame
+            self.report(downloader, 'downloading', progress_idx=1)
+            self.report(downloader, 'downloading', progress_idx=1)
+            self.report(downloader, 'finished')
+        self.assertEqual(rendered, [('downloading', None), ('downloading', 1), ('finished', None)])
+
+        with patch('time.monotonic', return_value=100.0 + downloader._PROGRESS_FRAME_INTERVAL):
+            self.report(downloader, 'downloading')
+        self.assertEqual(len(rendered), 4)
+
+    def test_noprogress(self):
+        downloader, rendered = self.make_downloader(noprogress=True)
+        self.report(downloader, 'downloading')
+        self.assertEqual(rendered, [])
+
+    def test_hooks_delta(self):
+        downloader, _ = self.make_downloader()
+        statuses, coalesced = [], []
+        downloader.add_progress_hook(lambda s: statuses.append(s['status']))
+        downloader.add_progress_hook(lambda s: coalesced.append(s['status']), delta=10)
+        with patch('time.monotonic', return_value=100.0):
+            for _ in range(20):
+                self.report(downloader, 'downloading')
+            self.report(downloader, 'finished')
+        self.assertEqual(len(statuses), 21)
+        self.assertEqual(coalesced, ['downloading', 'finished'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -377,6 +377,8 @@ def test_ordered_set(self):
         self.assertEqual(orderedSet([1]), [1])
         # keep the list ordered
         self.assertEqual(orderedSet([135, 1, 1, 1]), [135, 1])
+        self.assertEqual(orderedSet([{'a': 1}, 2, {'a': 1}, [3], 2, [3]]), [{'a': 1}, 2, [3]])
+        self.assertEqual(orderedSet([(1, {}), (2, {}), (1, {})], key=lambda x: x[0]), [(1, {}), (2, {})])
 
     def test_unescape_html(self):
         self.assertEqual(unescapeHTML('%20;'), '%20;')
@@ -8,7 +8,15 @@
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 
+import copy
+import tempfile
+import threading
+import time
+from unittest import mock
+
+from yt_dlp import YoutubeDL
 from yt_dlp.extractor import YoutubeIE
+from yt_dlp.utils import ExtractorError
 
 
 class TestYoutubeMisc(unittest.TestCase):
@@ -21,6 +29,78 @@ def test_youtube_extract(self):
         assertExtractId('http://www.youtube.com/watch?v=BaW_jenozKcsharePLED17F32AD9753930', 'BaW_jenozKc')
         assertExtractId('BaW_jenozKc', 'BaW_jenozKc')
 
+    def extract_player_responses(self, clients, concurrency):
+        ydl = YoutubeDL({'quiet': True, 'extractor_args': {'youtube': {
+            'player_skip': ['js'], 'player_concurrency': [str(concurrency)]}}})
+        ie = ydl.get_info_extractor('Youtube')
+        lock = threading.Lock()
+        state = {'active': 0, 'max_active': 0}
+
+        def extract_player_response(client, video_id, *args, **kwargs):
+            with lock:
+                state['active'] += 1
+                state['max_active'] = max(state['max_active'], state['active'])
+            time.sleep(0.1)
+            with lock:
+                state['active'] -= 1
+            if client == 'tv':
+                raise ExtractorError('tv failed', expected=True)
+            reason = 'Sign in to confirm your age' if client == 'web_safari' else None
+            return {'videoDetails': {'videoId': video_id}, 'playabilityStatus': {'status': 'OK', 'reason': reason}}
+
+        with (
+            mock.patch.object(ie, '_download_ytcfg', return_value={}),
+            mock.patch.object(ie, 'fetch_po_token', return_value=None),
+            mock.patch.object(ie, '_extract_player_response', side_effect=extract_player_response),
+            mock.patch.object(ie, 'report_warning') as report_warning,
+        ):
+            prs, _ = ie._extract_player_responses(clients, 'BaW_jenozKc', None, 'web', {}, False)
+        self.assertEqual(report_warning.call_count, 1)
+        return [pr['streamingData']['__yt_dlp_client'] for pr in prs], state['max_active']
+
+    def test_extract_player_responses(self):
+        clients = ['web_safari', 'tv', 'android_vr', 'web']
+        # The age-gated web_safari response appends web_embedded right after it
+        expected = ['web_safari', 'web_embedded', 'android_vr', 'web']
+        self.assertEqual(self.extract_player_responses(clients, 1), (expected, 1))
+        self.assertEqual(self.extract_player_responses(clients, 4), (expected, 4))
+
+    def test_cross_process_cache(self):
+        player_url = 'https://www.youtube.com/s/player/12345678/player_ias.vflset/en_US/base.js'
+        ytcfg = {'INNERTUBE_CLIENT_VERSION': '1.0', 'INNERTUBE_CONTEXT': {'client': {'clientName': 'TVHTML5'}}}
+        session_ytcfg = copy.deepcopy(ytcfg)
+        session_ytcfg['VISITOR_DATA'] = 'visitor'
+        session_ytcfg['INNERTUBE_CONTEXT']['client'].update({
+            'visitorData': 'visitor', 'hl': 'de', 'gl': 'DE', 'remoteHost': '127.0.0.1', 'configInfo': {}})
+        with tempfile.TemporaryDirectory() as cachedir:
+            # Each YoutubeDL stands in for a separate process sharing the cache dir
+            def make_ie():
+                return YoutubeDL({'quiet': True, 'cachedir': cachedir}).get_info_extractor('Youtube')
+
+            for expected_downloads in (1, 0):
+                ie = make_ie()
+                with (
+                    mock.patch.object(ie, '_download_webpage', return_value='var player;') as download_player,
+                    mock.patch.object(ie, '_download_webpage_with_retries', return_value='') as download_ytcfg,
+                    mock.patch.object(ie, 'extract_ytcfg', side_effect=lambda *_: copy.deepcopy(session_ytcfg)),
+                ):
+                    self.assertEqual(ie._load_player('BaW_jenozKc', player_url), 'var player;')
+                    # The fields specific to the session are not shared with other processes
+                    self.assertEqual(ie._download_ytcfg('tv', 'BaW_jenozKc'), session_ytcfg if expected_downloads else ytcfg)
+                    ie._download_ytcfg('web_embedded', 'BaW_jenozKc')
+                self.assertEqual(download_player.call_count, expected_downloads)
+                # The embed page is specific to the video and is never cached
+                self.assertEqual(download_ytcfg.call_count, expected_downloads + 1)
+
+            ie = make_ie()
+            with (
+                mock.patch.object(ie, '_YTCFG_CACHE_TTL', 0),
+                mock.patch.object(ie, '_download_webpage_with_retries', return_value='') as download_ytcfg,
+                mock.patch.object(ie, 'extract_ytcfg', side_effect=lambda *_: copy.deepcopy(ytcfg)),
+            ):
+                ie._download_ytcfg('tv', 'BaW_jenozKc')
+            self.assertEqual(download_ytcfg.call_count, 1)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -1,4 +1,5 @@
 import collections
+import concurrent.futures
 import contextlib
 import copy
 import datetime as dt
@@ -19,11 +20,13 @@
 import subprocess
 import sys
 import tempfile
+import threading
 import time
 import tokenize
 import traceback
 import unicodedata
 
+from .archive import DownloadArchive, open_download_archive
 from .cache import Cache
 from .compat import urllib  # isort: split
 from .compat import urllib_req_to_req
@@ -31,6 +34,7 @@
 from .downloader import FFmpegFD, get_suitable_downloader, shorten_protocol_name
 from .downloader.rtmp import rtmpdump_version
 from .extractor import gen_extractor_classes, get_info_extractor, import_extractors
+from .extractor._dispatch import ExtractorIndex, extractor_hosts
 from .extractor.common import UnsupportedURLIE
 from .extractor.openload import PhantomJSwrapper
 from .globals import (
@@ -66,6 +70,7 @@
     FFmpegFixupStretchedPP,
     FFmpegFixupTimestampPP,
     FFmpegMergerPP,
+    FFmpegPlanPP,
     FFmpegPostProcessor,
     FFmpegVideoConvertorPP,
     MoveFilesAfterDownloadPP,
@@ -136,7 +141,6 @@
     iri_to_uri,
     is_path_like,
     join_nonempty,
-    locked_file,
     make_archive_id,
     make_dir,
     number_of_digits,
@@ -170,6 +174,7 @@
     write_string,
 )
 from .utils._utils import _UnsafeExtensionError, _YDLLogger, _ProgressState
+from .utils.progress import RateLimiter
 from .utils.networking import (
     HTTPHeaderDict,
     clean_headers,
@@ -196,6 +201,16 @@ def wrapper(self, *args, **kwargs):
     return wrapper
 
 
+class _ReplacementFormatter(string.Formatter):
+    def get_field(self, field_name, args, kwargs):
+        if field_name.isdigit():
+            return args[0], -1
+        raise ValueError('Unsupported field')
+
+
+_REPLACEMENT_FORMATTER = _ReplacementFormatter()
+
+
 class YoutubeDL:
     """YoutubeDL class.
 
@@ -293,6 +308,14 @@ class YoutubeDL:
     playlist_items:    Specific indices of playlist to download.
     playlistrandom:    Download playlist items in random order.
     lazy_playlist:     Process playlist entries as they are received.
+    stream_playlist:   With lazy_playlist, do not keep the playlist entries in memory,
+                       so that the playlist result has no entries
+    concurrent_extractions: Number of playlist entries to extract concurrently
+                       (default: 1). The entries are still processed in order
+    concurrent_streams: Number of streams of a video to download concurrently
+                       (default: 1); i.e. the formats that are merged and the
+                       subtitles. The ratelimit is shared between them.
+                       The streams of a live video are downloaded sequentially
     matchtitle:        Download only matching titles.
     rejecttitle:       Reject downloads for matching titles.
     logger:            A class having a `debug`, `warning` and `error` function where
@@ -328,6 +351,13 @@ class YoutubeDL:
     skip_download:     Skip the actual download of the video file
     cachedir:          Location of the cache files in the filesystem.
                        False to disable filesystem cache.
+    cache_backend:     How to store the cache. One of "files" (default)
+                       or "sqlite" (a single database in the cachedir)
+    cache_max_age:     Maximum age of cache entries in seconds.
+                       Either a number, or a dictionary of cache section names
+                       to numbers, with "default" for the other sections
+    cache_max_size:    Maximum size of each cache section in bytes.
+                       Same format as cache_max_age. The oldest entries are removed first
     noplaylist:        Download single video instead of a playlist if in doubt.
     age_limit:         An integer representing the user's age in years.
                        Unsuitable videos for the given age are skipped.
@@ -342,6 +372,9 @@ class YoutubeDL:
                        downloaded. None for no limit.
     download_archive:  A set, or the name of a file where all downloads are recorded.
                        Videos already present in the file are not downloaded again.
+                       If the file is an SQLite database (or a new file with a .db,
+                       .sqlite or .sqlite3 extension), the IDs are looked up in the
+                       database instead of being loaded into memory
     break_on_existing: Stop the download process after attempting to download a
                        file that is in the archive.
     break_per_url:     Whether break_on_reject and break_on_existing
@@ -366,6 +399,9 @@ class YoutubeDL:
     geo_verification_proxy:  URL of the proxy to use for IP address verification
                        on geo-restricted sites.
     socket_timeout:    Time to wait for unresponsive hosts, in seconds
+    keep_alive_pool_size: Maximum number of idle keep-alive connections to keep
+                       per host in the urllib request handler. 0 disables reuse
+    keep_alive_timeout: Time after which idle keep-alive connections are closed, in seconds
     bidi_workaround:   Work around buggy terminals without bidirectional text
                        support, using fridibi
     debug_printtraffic:Print out sent and received HTTP traffic
@@ -414,6 +450,9 @@ class YoutubeDL:
 
                        Progress hooks are guaranteed to be called at least once
                        (with status "finished") if the download is successful.
+    progress_hooks_delta: The minimum time between two calls of a progress hook
+                       with the "downloading" status, in seconds. The hooks are
+                       called for every block that is downloaded by default
     postprocessor_hooks:  A list of functions that get called on postprocessing
                        progress, with a dictionary with the entries
                        * status: One of "started", "processing", or "finished".
@@ -512,8 +551,9 @@ class YoutubeDL:
     the downloader (see yt_dlp/downloader/common.py):
     nopart, updatetime, buffersize, ratelimit, throttledratelimit, min_filesize,
     max_filesize, test, noresizebuffer, retries, file_access_retries, fragment_retries,
-    continuedl, hls_use_mpegts, http_chunk_size, external_downloader_args,
-    concurrent_fragment_downloads, progress_delta.
+    continuedl, hls_use_mpegts, http_chunk_size, http_connections, external_downloader_args,
+    concurrent_fragment_downloads, fragment_buffer_size, fragment_hedge_delay,
+    progress_delta.
 
     The following options are used by the post processors:
     ffmpeg_location:   Location of the ffmpeg binary; either the path
@@ -636,6 +676,12 @@ def __init__(self, params=None, auto_init=True):
         self.params = params
         self._ies = {}
         self._ies_instances = {}
+        self._ies_index = None
+        self._ies_scanned = False
+        self._prefetched_extractions = {}
+        # Params of the downloads of the streams that run at the same time
+        self._stream_params = {}
+        self._stop_streams = threading.Event()
         self._pps = {k: [] for k in POSTPROCESS_WHEN}
         self._printed_messages = set()
         self._first_webpage_request = True
@@ -648,6 +694,8 @@ def __init__(self, params=None, auto_init=True):
         self._num_videos = 0
         self._playlist_level = 0
         self._playlist_urls = set()
+        self._format_selectors = {}
+        self._format_sorters = {}
         self.cache = Cache(self)
         self.__header_cookies = []
 
@@ -832,21 +880,13 @@ def check_deprecated(param, option, suggestion):
 
         def preload_download_archive(fn):
             """Preload the archive, if any is specified"""
-            archive = set()
             if fn is None:
-                return archive
+                return set()
             elif not is_path_like(fn):
                 return fn
 
             self.write_debug(f'Loading archive file {fn!r}')
-            try:
-                with locked_file(fn, 'r', encoding='utf-8') as archive_file:
-                    for line in archive_file:
-                        archive.add(line.strip())
-            except OSError as ioe:
-                if ioe.errno != errno.ENOENT:
-                    raise
-            return archive
+            return open_download_archive(fn)
 
         self.archive = preload_download_archive(self.params.get('download_archive'))
 
@@ -898,6 +938,8 @@ def warn_if_short_id(self, argv):
     def add_info_extractor(self, ie):
         """Add an InfoExtractor object to the end of the list."""
         ie_key = ie.ie_key()
+        if ie_key not in self._ies or extractor_hosts(self._ies[ie_key]) != extractor_hosts(ie):
+            self._ies_index = None
         self._ies[ie_key] = ie
         if not isinstance(ie, type):
             self._ies_instances[ie_key] = ie
@@ -915,6 +957,21 @@ def get_info_extractor(self, ie_key):
             self.add_info_extractor(ie)
         return ie
 
+    def _suitable_ies(self, url):
+        """Yield (ie_key, ie) of the extractors suitable for the URL, in order"""
+        if self._ies_index is None:
+            # Without lazy extractors, the hosts need to be computed from the regexes.
+            # This is only worth it when more than one URL is being matched
+            if not LAZY_EXTRACTORS.value and not self._ies_scanned:
+                self._ies_scanned = True
+                yield from ((key, ie) for key, ie in self._ies.items() if ie.suitable(url))
+                return
+            self._ies_index = ExtractorIndex(self._ies)
+        for key in self._ies_index.candidates(url):
+            ie = self._ies[key]
+            if ie.suitable(url):
+                yield key, ie
+
     def add_default_info_extractors(self):
         """
         Add the InfoExtractors returned by gen_extractors to the end of the list
@@ -1056,6 +1113,10 @@ def close(self):
             self._request_director.close()
             del self._request_director
 
+        if isinstance(self.archive, DownloadArchive):
+            self.archive.close()
+        self.cache.close()
+
         for close_hook in self._close_hooks:
             close_hook()
 
@@ -1227,6 +1288,7 @@ def _outtmpl_expandpath(outtmpl):
         return expand_path(outtmpl).replace(sep, '')
 
     @staticmethod
+    @functools.lru_cache(maxsize=256)
     def escape_outtmpl(outtmpl):
         """ Escape any remaining strings like %s, %abc% etc. """
         return re.sub(
@@ -1248,38 +1310,11 @@ def validate_outtmpl(cls, outtmpl):
             return err
 
     @staticmethod
-    def _copy_infodict(info_dict):
-        info_dict = dict(info_dict)
-        info_dict.pop('__postprocessors', None)
-        info_dict.pop('__pending_error', None)
-        return info_dict
-
-    def prepare_outtmpl(self, outtmpl, info_dict, sanitize=False):
-        """ Make the outtmpl and info_dict suitable for substitution: ydl.escape_outtmpl(outtmpl) % info_dict
-        @param sanitize    Whether to sanitize the output as a filename
+    @functools.lru_cache(maxsize=256)
+    def _compile_outtmpl(outtmpl):
+        """ Parse the fields of outtmpl for prepare_outtmpl, so that it is done only once per template
+        @return    A tuple of the literal strings and the parsed fields of outtmpl
         """
-
-        info_dict.setdefault('epoch', int(time.time()))  # keep epoch consistent once set
-
-        info_dict = self._copy_infodict(info_dict)
-        info_dict['duration_string'] = (  # %(duration>%H-%M-%S)s is wrong if duration > 24hrs
-            formatSeconds(info_dict['duration'], '-' if sanitize else ':')
-            if info_dict.get('duration', None) is not None
-            else None)
-        info_dict['autonumber'] = int(self.params.get('autonumber_start', 1) - 1 + self._num_downloads)
-        info_dict['video_autonumber'] = self._num_videos
-        if info_dict.get('resolution') is None:
-            info_dict['resolution'] = self.format_resolution(info_dict, default=None)
-
-        # For fields playlist_index, playlist_autonumber and autonumber convert all occurrences
-        # of %(field)s to %(field)0Nd for backward compatibility
-        field_size_compat_map = {
-            'playlist_index': number_of_digits(info_dict.get('__last_playlist_index') or 0),
-            'playlist_autonumber': number_of_digits(info_dict.get('n_entries') or 0),
-            'autonumber': self.params.get('autonumber_size') or 5,
-        }
-
-        TMPL_DICT = {}
         EXTERNAL_FORMAT_RE = re.compile(STR_FORMAT_RE_TMPL.format('[^)]*', f'[{STR_FORMAT_TYPES}ljhqBUDS]'))
         MATH_FUNCTIONS = {
             '+': float.__add__,
@@ -1315,7 +1350,7 @@ def _from_user_input(field):
                 return int(field)
             return field
 
-        def _traverse_infodict(fields):
+        def _parse_fields(fields):
             fields = [f for x in re.split(r'\.({.+?})\.?', fields)
                       for f in ([x] if x.startswith('{') else x.split('.'))]
             for i in (0, -1):
@@ -1328,42 +1363,116 @@ def _traverse_infodict(fields):
                     continue
                 assert f.endswith('}'), f'No closing brace for {f} in {fields}'
                 fields[i] = {k: list(map(_from_user_input, k.split('.'))) for k in f[1:-1].split(',')}
+            return fields
+
+        def _parse_maths(maths):
+            steps, operator = [], None
+            while maths:
+                item = re.match(MATH_FIELD_RE if operator else MATH_OPERATORS_RE, maths).group(0)
+                maths = maths[len(item):]
+                if operator is None:
+                    operator = MATH_FUNCTIONS[item]
+                    continue
+                item, multiplier = (item[1:], -1) if item[0] == '-' else (item, 1)
+                offset = float_or_none(item)
+                steps.append((operator, multiplier, offset, _parse_fields(item) if offset is None else None))
+                operator = None
+            return steps
+
+        def _parse_key(key):
+            mobj = re.match(INTERNAL_FORMAT_RE, key)
+            while mobj:
+                yield {
+                    'fields': mobj['fields'],
+                    'path': _parse_fields(mobj['fields']),
+                    'negate': bool(mobj['negate']),
+                    'maths': _parse_maths(mobj['maths']) if mobj['maths'] else None,
+                    'strf_format': mobj['strf_format'] and mobj['strf_format'].replace('\\,', ','),
+                    'alternate': bool(mobj['alternate']),
+                    'replacement': mobj['replacement'],
+                    'default': mobj['default'],
+                }
+                mobj = mobj['alternate'] and re.match(INTERNAL_FORMAT_RE, mobj['remaining'][1:])
+
+        parts, literal, start = [], '', 0
+        for mobj in EXTERNAL_FORMAT_RE.finditer(outtmpl):
+            literal += outtmpl[start:mobj.start()]
+            start = mobj.end()
+            if not mobj.group('has_key'):
+                literal += mobj.group(0)
+                continue
+            parts.append(literal)
+            literal = ''
+            parts.append({
+                'prefix': mobj.group('prefix'),
+                'format': mobj.group('format'),
+                'flags': mobj.group('conversion') or '',
+                'key': '{}\0{}'.format(mobj.group('key').replace('%', '%\0'), mobj.group('format')),
+                'alternatives': tuple(_parse_key(mobj.group('key'))),
+            })
+        parts.append(literal + outtmpl[start:])
+        return tuple(part for part in parts if part)
+
+    @staticmethod
+    def _copy_infodict(info_dict):
+        info_dict = dict(info_dict)
+        info_dict.pop('__postprocessors', None)
+        info_dict.pop('__pending_error', None)
+        return info_dict
+
+    def prepare_outtmpl(self, outtmpl, info_dict, sanitize=False):
+        """ Make the outtmpl and info_dict suitable for substitution: ydl.escape_outtmpl(outtmpl) % info_dict
+        @param sanitize    Whether to sanitize the output as a filename
+        """
+
+        info_dict.setdefault('epoch', int(time.time()))  # keep epoch consistent once set
+
+        info_dict = self._copy_infodict(info_dict)
+        info_dict['duration_string'] = (  # %(duration>%H-%M-%S)s is wrong if duration > 24hrs
+            formatSeconds(info_dict['duration'], '-' if sanitize else ':')
+            if info_dict.get('duration', None) is not None
+            else None)
+        info_dict['autonumber'] = int(self.params.get('autonumber_start', 1) - 1 + self._num_downloads)
+        info_dict['video_autonumber'] = self._num_videos
+        if info_dict.get('resolution') is None:
+            info_dict['resolution'] = self.format_resolution(info_dict, default=None)
+
+        # For fields playlist_index, playlist_autonumber and autonumber convert all occurrences
+        # of %(field)s to %(field)0Nd for backward compatibility
+        field_size_compat_map = {
+            'playlist_index': number_of_digits(info_dict.get('__last_playlist_index') or 0),
+            'playlist_autonumber': number_of_digits(info_dict.get('n_entries') or 0),
+            'autonumber': self.params.get('autonumber_size') or 5,
+        }
 
-            return traverse_obj(info_dict, fields, traverse_string=True)
+        def _traverse_infodict(path):
+            # traverse_obj is comparatively slow, and most fields are top-level keys
+            if len(path) == 1 and isinstance(path[0], str):
+                value = info_dict.get(path[0])
+                return None if value in (None, {}) else value
+            return traverse_obj(info_dict, path, traverse_string=True)
 
         def get_value(mdict):
             # Object traversal
-            value = _traverse_infodict(mdict['fields'])
+            value = _traverse_infodict(mdict['path'])
             # Negative
             if mdict['negate']:
                 value = float_or_none(value)
                 if value is not None:
                     value *= -1
             # Do maths
-            offset_key = mdict['maths']
-            if offset_key:
+            if mdict['maths'] is not None:
                 value = float_or_none(value)
-                operator = None
-                while offset_key:
-                    item = re.match(
-                        MATH_FIELD_RE if operator else MATH_OPERATORS_RE,
-                        offset_key).group(0)
-                    offset_key = offset_key[len(item):]
-                    if operator is None:
-                        operator = MATH_FUNCTIONS[item]
-                        continue
-                    item, multiplier = (item[1:], -1) if item[0] == '-' else (item, 1)
-                    offset = float_or_none(item)
+                for operator, multiplier, offset, path in mdict['maths']:
                     if offset is None:
-                        offset = float_or_none(_traverse_infodict(item))
+                        offset = float_or_none(_traverse_infodict(path))
                     try:
                         value = operator(value, multiplier * offset)
                     except (TypeError, ZeroDivisionError):
                         return None
-                    operator = None
             # Datetime formatting
             if mdict['strf_format']:
-                value = strftime_or_none(value, mdict['strf_format'].replace('\\,', ','))
+                value = strftime_or_none(value, mdict['strf_format'])
 
             # XXX: Workaround for https://github.com/yt-dlp/yt-dlp/issues/4485
             if sanitize and value == '':
@@ -1395,41 +1504,27 @@ def _dumpjson_default(obj):
                 return list(obj)
             return repr(obj)
 
-        class _ReplacementFormatter(string.Formatter):
-            def get_field(self, field_name, args, kwargs):
-                if field_name.isdigit():
-                    return args[0], -1
-                raise ValueError('Unsupported field')
-
-        replacement_formatter = _ReplacementFormatter()
-
-        def create_key(outer_mobj):
-            if not outer_mobj.group('has_key'):
-                return outer_mobj.group(0)
-            key = outer_mobj.group('key')
-            mobj = re.match(INTERNAL_FORMAT_RE, key)
+        def create_key(field):
             value, replacement, default, last_field = None, None, na, ''
-            while mobj:
-                mobj = mobj.groupdict()
-                default = mobj['default'] if mobj['default'] is not None else default
-                value = get_value(mobj)
-                last_field, replacement = mobj['fields'], mobj['replacement']
-                if value is None and mobj['alternate']:
-                    mobj = re.match(INTERNAL_FORMAT_RE, mobj['remaining'][1:])
-                else:
-                    break
+            for mdict in field['alternatives']:
+                default = mdict['default'] if mdict['default'] is not None else default
+                value = get_value(mdict)
+                last_field, replacement = mdict['fields'], mdict['replacement']
+                if value is None and mdict['alternate']:
+                    continue
+                break
 
             if None not in (value, replacement):
                 try:
-                    value = replacement_formatter.format(replacement, value)
+                    value = _REPLACEMENT_FORMATTER.format(replacement, value)
                 except ValueError:
                     value, default = None, na
 
-            fmt = outer_mobj.group('format')
+            fmt = field['format']
             if fmt == 's' and last_field in field_size_compat_map and isinstance(value, int):
                 fmt = f'0{field_size_compat_map[last_field]:d}d'
 
-            flags = outer_mobj.group('conversion') or ''
+            flags = field['flags']
             str_fmt = f'{fmt[:-1]}s'
             if value is None:
                 value, fmt = default, 's'
@@ -1479,11 +1574,12 @@ def create_key(outer_mobj):
                 if fmt[-1] in 'csra':
                     value = sanitize(last_field, value)
 
-            key = '{}\0{}'.format(key.replace('%', '%\0'), outer_mobj.group('format'))
-            TMPL_DICT[key] = value
-            return '{prefix}%({key}){fmt}'.format(key=key, fmt=fmt, prefix=outer_mobj.group('prefix'))
+            TMPL_DICT[field['key']] = value
+            return '{prefix}%({key}){fmt}'.format(key=field['key'], fmt=fmt, prefix=field['prefix'])
 
-        return EXTERNAL_FORMAT_RE.sub(create_key, outtmpl), TMPL_DICT
+        TMPL_DICT = {}
+        outtmpl = ''.join(part if isinstance(part, str) else create_key(part) for part in self._compile_outtmpl(outtmpl))
+        return outtmpl, TMPL_DICT
 
     def evaluate_outtmpl(self, outtmpl, info_dict, *args, **kwargs):
         outtmpl, info_dict = self.prepare_outtmpl(outtmpl, info_dict, *args, **kwargs)
@@ -1665,14 +1761,11 @@ def extract_info(self, url, download=True, ie_key=None, extra_info=None,
             ie_key = 'Generic'
 
         if ie_key:
-            ies = {ie_key: self._ies[ie_key]} if ie_key in self._ies else {}
+            ies = [(ie_key, self._ies[ie_key])] if ie_key in self._ies and self._ies[ie_key].suitable(url) else []
         else:
-            ies = self._ies
-
-        for key, ie in ies.items():
-            if not ie.suitable(url):
-                continue
+            ies = self._suitable_ies(url)
 
+        for key, ie in ies:
             if not ie.working():
                 self.report_warning('The program functionality for this site has been marked as broken, '
                                     'and will probably not work.')
@@ -1830,7 +1923,8 @@ def __extract_info(self, url, ie, download, extra_info, process):
         self._apply_header_cookies(url)
 
         try:
-            ie_result = ie.extract(url)
+            future = self._prefetched_extractions.pop((ie.ie_key(), url), None)
+            ie_result = future.result() if future else ie.extract(url)
         except UserNotLive as e:
             if process:
                 if self.params.get('wait_for_video'):
@@ -2050,10 +2144,12 @@ def __process_playlist(self, ie_result, download):
             return
         self.to_screen(f'[download] Downloading {ie_result["_type"]}: {title}')
 
-        all_entries = PlaylistEntries(self, ie_result)
-        entries = orderedSet(all_entries.get_requested_items(), lazy=True)
-
         lazy = self.params.get('lazy_playlist')
+        # The entries flow from the extractor to the output without being kept
+        stream = lazy and self.params.get('stream_playlist')
+        all_entries = PlaylistEntries(self, ie_result, stream=stream)
+        entries = orderedSet(all_entries.get_requested_items(), lazy=True, key=lambda x: x[0])
+
         if lazy:
             resolved_entries, n_entries = [], 'N/A'
             ie_result['requested_entries'], ie_result['entries'] = None, None
@@ -2094,57 +2190,62 @@ def __process_playlist(self, ie_result, download):
         self.to_screen(f'[{ie_result["extractor"]}] Playlist {title}: Downloading {n_entries} items'
                        f'{format_field(ie_result, "playlist_count", " of %s")}')
 
-        keep_resolved_entries = self.params.get('extract_flat') != 'discard'
+        keep_resolved_entries = self.params.get('extract_flat') != 'discard' and not stream
         if self.params.get('extract_flat') == 'discard_in_playlist':
-            keep_resolved_entries = ie_result['_type'] != 'playlist'
+            keep_resolved_entries = ie_result['_type'] != 'playlist' and not stream
         if keep_resolved_entries:
             self.write_debug('The information of all playlist entries will be held in memory')
 
-        failures = 0
-        max_failures = self.params.get('skip_playlist_after_errors') or float('inf')
-        for i, (playlist_index, entry) in enumerate(entries):
-            if lazy:
-                resolved_entries.append((playlist_index, entry))
-            if not entry:
-                continue
-
-            entry['__x_forwarded_for_ip'] = ie_result.get('__x_forwarded_for_ip')
+        def entry_info(i, playlist_index, entry):
+            """Returns the playlist_index of the entry and the info that it is filtered with"""
             if not lazy and 'playlist-index' in self.params['compat_opts']:
                 playlist_index = ie_result['requested_entries'][i]
-
-            entry_copy = collections.ChainMap(entry, {
+            return playlist_index, collections.ChainMap(entry, {
                 **common_info,
                 'n_entries': int_or_none(n_entries),
                 'playlist_index': playlist_index,
                 'playlist_autonumber': i + 1,
             })
 
-            if self._match_entry(entry_copy, incomplete=True) is not None:
-                # For compatabilty with youtube-dl. See https://github.com/yt-dlp/yt-dlp/issues/4369
-                resolved_entries[i] = (playlist_index, NO_DEFAULT)
-                continue
+        failures = 0
+        max_failures = self.params.get('skip_playlist_after_errors') or float('inf')
+        with self._prefetch_playlist_entries(entries, entry_info) as entries:
+            for i, (playlist_index, entry) in enumerate(entries):
+                if lazy and not stream:
+                    resolved_entries.append((playlist_index, entry))
+                if not entry:
+                    continue
 
-            self.to_screen(
-                f'[download] Downloading item {self._format_screen(i + 1, self.Styles.ID)} '
-                f'of {self._format_screen(n_entries, self.Styles.EMPHASIS)}')
+                entry['__x_forwarded_for_ip'] = ie_result.get('__x_forwarded_for_ip')
+                playlist_index, entry_copy = entry_info(i, playlist_index, entry)
 
-            entry_result = self.__process_iterable_entry(entry, download, collections.ChainMap({
-                'playlist_index': playlist_index,
-                'playlist_autonumber': i + 1,
-            }, extra))
-            if not entry_result:
-                failures += 1
-            if failures >= max_failures:
-                self.report_error(
-                    f'Skipping the remaining entries in playlist "{title}" since {failures} items failed extraction')
-                break
-            if keep_resolved_entries:
-                resolved_entries[i] = (playlist_index, entry_result)
+                if self._match_entry(entry_copy, incomplete=True) is not None:
+                    # For compatabilty with youtube-dl. See https://github.com/yt-dlp/yt-dlp/issues/4369
+                    if not stream:
+                        resolved_entries[i] = (playlist_index, NO_DEFAULT)
+                    continue
+
+                self.to_screen(
+                    f'[download] Downloading item {self._format_screen(i + 1, self.Styles.ID)} '
+                    f'of {self._format_screen(n_entries, self.Styles.EMPHASIS)}')
+
+                entry_result = self.__process_iterable_entry(entry, download, collections.ChainMap({
+                    'playlist_index': playlist_index,
+                    'playlist_autonumber': i + 1,
+                }, extra))
+                if not entry_result:
+                    failures += 1
+                if failures >= max_failures:
+                    self.report_error(
+                        f'Skipping the remaining entries in playlist "{title}" since {failures} items failed extraction')
+                    break
+                if keep_resolved_entries:
+                    resolved_entries[i] = (playlist_index, entry_result)
 
         # Update with processed data
         ie_result['entries'] = [e for _, e in resolved_entries if e is not NO_DEFAULT]
         ie_result['requested_entries'] = [i for i, e in resolved_entries if e is not NO_DEFAULT]
-        if ie_result['requested_entries'] == try_call(lambda: list(range(1, ie_result['playlist_count'] + 1))):
+        if stream or ie_result['requested_entries'] == try_call(lambda: list(range(1, ie_result['playlist_count'] + 1))):
             # Do not set for full playlist
             ie_result.pop('requested_entries')
 
@@ -2158,6 +2259,79 @@ def __process_playlist(self, ie_result, download):
         self.to_screen(f'[download] Finished downloading playlist: {title}')
         return ie_result
 
+    @contextlib.contextmanager
+    def _prefetch_playlist_entries(self, entries, entry_info):
+        """
+        Extract the upcoming playlist entries in the background while the current one is processed
+
+        Only the extraction is done concurrently. The entries are still yielded in order,
+        and everything else (filters, archive, downloads) happens in the calling thread.
+        The entries that the filters skip, or that come after one which ends the playlist
+        or after max_downloads would be reached, are not extracted ahead of their turn
+        """
+        workers = self.params.get('concurrent_extractions') or 1
+        if workers <= 1 or self.params.get('extract_flat') in (True, 'in_playlist'):
+            yield entries
+            return
+
+        keys = []
+        executor = concurrent.futures.ThreadPoolExecutor(workers, thread_name_prefix='yt-dlp-extract')
+        max_downloads = float(self.params.get('max_downloads') or 'inf')
+
+        def prefetch(entries):
+            # (item, whether it passed the filters)
+            upcoming = collections.deque()
+            stopped = False
+            for i, item in enumerate(entries):
+                selected = False
+                # The entries that are yielded have been processed
+                pending = sum(selected for _, selected in upcoming)
+                if not stopped and isinstance(item[1], dict) and self._num_downloads + pending < max_downloads:
+                    try:
+                        selected = self._match_entry(entry_info(i, *item)[1], incomplete=True, silent=True) is None
+                    except DownloadCancelled:
+                        stopped = True
+                    if selected:
+                        self._prefetch_extraction(executor, item[1], keys)
+                upcoming.append((item, selected))
+                if len(upcoming) > workers:
+                    yield upcoming.popleft()[0]
+            for item, _ in upcoming:
+                yield item
+
+        try:
+            yield prefetch(entries)
+        finally:
+            # None of the extractions outlive the playlist
+            executor.shutdown(wait=True, cancel_futures=True)
+            for key in keys:
+                self._prefetched_extractions.pop(key, None)
+
+    def _prefetch_extraction(self, executor, entry, keys):
+        if entry.get('_type') not in ('url', 'url_transparent'):
+            return
+        # Same as process_ie_result and extract_info
+        url = sanitize_url(entry['url'], scheme='http' if self.params.get('prefer_insecure') else 'https')
+        ie_key = entry.get('ie_key')
+        if ie_key:
+            ie_key = ie_key if ie_key in self._ies and self._ies[ie_key].suitable(url) else None
+        else:
+            ie_key = next((key for key, _ in self._suitable_ies(url)), None)
+        if ie_key is None or (ie_key, url) in self._prefetched_extractions:
+            return
+        ie = self.get_info_extractor(ie_key)
+        # Do not log in from several threads at once
+        if not ie._ready:
+            return
+        temp_id = ie.get_temp_id(url)
+        if temp_id is not None and self.in_download_archive({'id': temp_id, 'ie_key': ie_key}):
+            return
+        self._apply_header_cookies(url)
+        keys.append((ie_key, url))
+        # Extractors keep the state of an extraction (e.g. the geo bypass) in the instance,
+        # so every extraction gets its own copy. It shares the login and caches of the original
+        self._prefetched_extractions[ie_key, url] = executor.submit(copy.copy(ie).extract, url)
+
     @_handle_extraction_exceptions
     def __process_iterable_entry(self, entry, download, extra_info):
         return self.process_ie_result(
@@ -2302,6 +2476,13 @@ def can_merge():
                 else 'bestvideo*+bestaudio/best')
 
     def build_format_selector(self, format_spec):
+        # The selectors do not keep any state, so they are reused for every video
+        key = (format_spec, self.params.get('allow_multiple_audio_streams'), self.params.get('allow_multiple_video_streams'))
+        if key not in self._format_selectors:
+            self._format_selectors[key] = self._build_format_selector(format_spec)
+        return self._format_selectors[key]
+
+    def _build_format_selector(self, format_spec):
         def syntax_error(note, start):
             message = (
                 'Invalid format specification: '
@@ -2793,8 +2974,12 @@ def _raise_pending_errors(self, info):
 
     def sort_formats(self, info_dict):
         formats = self._get_formats(info_dict)
-        formats.sort(key=FormatSorter(
-            self, info_dict.get('_format_sort_fields') or []).calculate_preference)
+        sort_fields = tuple(info_dict.get('_format_sort_fields') or ())
+        key = (sort_fields, self.params.get('prefer_free_formats'), self.params.get('format_sort_force'),
+               tuple(self.params.get('format_sort') or ()))
+        if key not in self._format_sorters:
+            self._format_sorters[key] = FormatSorter(self, sort_fields)
+        formats.sort(key=self._format_sorters[key].calculate_preference)
 
     def process_video_result(self, info_dict, download=True):
         assert info_dict.get('_type', 'video') == 'video'
@@ -3182,6 +3367,10 @@ def _forceprint(self, key, info_dict):
         if info_dict is None:
             return
         info_copy = info_dict.copy()
+        if not (self.params['forceprint'].get(key) or self.params['print_to_file'].get(key) or (
+                key == 'video' and any(self.params.get(f'force{field}') for field in self._FORCED_FIELDS))):
+            # Nothing is printed, so do not evaluate the fields
+            return info_copy
         info_copy.setdefault('filename', self.prepare_filename(info_dict))
         if info_dict.get('requested_formats') is not None:
             # For RTMP URLs, also include the playpath
@@ -3218,6 +3407,8 @@ def format_tmpl(tmpl):
 
         return info_copy
 
+    _FORCED_FIELDS = ('title', 'id', 'url', 'thumbnail', 'description', 'filename', 'duration', 'format')
+
     def __forced_printings(self, info_dict, filename=None, incomplete=True):
         if (self.params.get('forcejson')
                 or self.params['forceprint'].get('video')
@@ -3245,7 +3436,7 @@ def print_field(field, actual_field=None, optional=False):
         print_field('format')
 
         if self.params.get('forcejson'):
-            self.to_stdout(json.dumps(self.sanitize_info(info_dict)))
+            self.to_stdout(self._dumps_info(info_dict))
 
     def dl(self, name, info, subtitle=False, test=False):
         if not info.get('url'):
@@ -3265,13 +3456,16 @@ def dl(self, name, info, subtitle=False, test=False):
                 'overwrites': True,
                 '_no_ytdl_file': True,
             }
+        elif self._stream_params:
+            params = {**self.params, **self._stream_params}
         else:
             params = self.params
 
         fd = get_suitable_downloader(info, params, to_stdout=(name == '-'))(self, params)
         if not test:
+            fd.add_progress_hook(self._check_streams_stopped)
             for ph in self._progress_hooks:
-                fd.add_progress_hook(ph)
+                fd.add_progress_hook(ph, delta=self.params.get('progress_hooks_delta'))
             urls = '", "'.join(
                 (f['url'].split(',')[0] + ',<data>' if f['url'].startswith('data:') else f['url'])
                 for f in info.get('requested_formats', []) or [info])
@@ -3284,6 +3478,43 @@ def dl(self, name, info, subtitle=False, test=False):
             new_info['http_headers'] = self._calc_headers(new_info)
         return fd.download(name, new_info, subtitle)
 
+    def _check_streams_stopped(self, status):
+        if self._stop_streams.is_set():
+            raise DownloadCancelled('Another stream of the video could not be downloaded')
+
+    def _run_streams(self, funcs):
+        """
+        Call the functions that download the streams of a video and return their results in order
+
+        With concurrent_streams, up to that many of them run at a time and share the ratelimit.
+        Their progress is printed on separate lines, since they cannot update the same one.
+        The first error is raised as soon as it occurs, once the other downloads have stopped
+        """
+        workers = min(self.params.get('concurrent_streams') or 1, len(funcs))
+        if workers <= 1:
+            return [func() for func in funcs]
+
+        self._stream_params = {'progress_with_newline': True}
+        if self.params.get('ratelimit'):
+            self._stream_params['_rate_limiter'] = RateLimiter(self.params['ratelimit'])
+        executor = concurrent.futures.ThreadPoolExecutor(workers, thread_name_prefix='yt-dlp-stream')
+        futures = not_done = [executor.submit(func) for func in funcs]
+        try:
+            while not_done:
+                # Waiting without a timeout cannot be interrupted on Windows
+                done, not_done = concurrent.futures.wait(not_done, 0.1, concurrent.futures.FIRST_EXCEPTION)
+                for future in done:
+                    future.result()
+            return [future.result() for future in futures]
+        except BaseException:
+            # The other downloads stop at their next progress update
+            self._stop_streams.set()
+            raise
+        finally:
+            executor.shutdown(cancel_futures=True)
+            self._stop_streams.clear()
+            self._stream_params = {}
+
     def existing_file(self, filepaths, *, default_overwrite=True):
         existing_files = list(filter(os.path.exists, orderedSet(filepaths)))
         if existing_files and not self.params.get('overwrites', default_overwrite):
@@ -3350,10 +3581,22 @@ def check_max_downloads():
                                    self.prepare_filename(info_dict, 'description')) is None:
             return
 
-        sub_files = self._write_subtitles(info_dict, temp_filename)
-        if sub_files is None:
-            return
-        files_to_move.update(dict(sub_files))
+        # With concurrent_streams, the subtitles (e.g. the live chat) are downloaded alongside the video,
+        # unless a postprocessor may need them before the download. The info is copied so that the
+        # names of the subtitle files do not depend on the changes made to it for the download.
+        # The formats that are streamed to stdout have to be downloaded one after the other, and so do
+        # the streams of a live video, since only the download that runs in the main thread can be
+        # stopped with Ctrl+C and keep what it has downloaded
+        concurrent_streams = temp_filename != '-' and not info_dict.get('is_live')
+        write_subtitles = functools.partial(self._write_subtitles, dict(info_dict), temp_filename)
+        defer_subtitles = (
+            (self.params.get('concurrent_streams') or 1) > 1 and concurrent_streams
+            and not self.params.get('skip_download') and not self._pps['before_dl'])
+        if not defer_subtitles:
+            sub_files = write_subtitles()
+            if sub_files is None:
+                return
+            files_to_move.update(dict(sub_files))
 
         thumb_files = self._write_thumbnails(
             'video', info_dict, temp_filename, self.prepare_filename(info_dict, 'thumbnail'))
@@ -3434,7 +3677,7 @@ def existing_video_file(*filepaths):
                         info_dict['ext'] = os.path.splitext(file)[1][1:]
                     return file
 
-                fd, success = None, True
+                fd, success, downloads = None, True, []
                 if info_dict.get('protocol') or info_dict.get('url'):
                     fd = get_suitable_downloader(info_dict, self.params, to_stdout=temp_filename == '-')
                     if fd != FFmpegFD and 'no-direct-merge' not in self.params['compat_opts'] and (
@@ -3488,8 +3731,7 @@ def correct_ext(filename, ext=new_ext):
                                     'f{}'.format(f['format_id']), info_dict['ext'])
                                 downloaded.append(fname)
                         info_dict['url'] = '\n'.join(f['url'] for f in info_dict['requested_formats'])
-                        success, real_download = self.dl(temp_filename, info_dict)
-                        info_dict['__real_download'] = real_download
+                        downloads.append(functools.partial(self.dl, temp_filename, info_dict))
                     else:
                         if self.params.get('allow_unplayable_formats'):
                             self.report_warning(
@@ -3523,9 +3765,7 @@ def correct_ext(filename, ext=new_ext):
                                     return
                                 f['filepath'] = fname
                                 downloaded.append(fname)
-                            partial_success, real_download = self.dl(fname, new_info)
-                            info_dict['__real_download'] = info_dict['__real_download'] or real_download
-                            success = success and partial_success
+                            downloads.append(functools.partial(self.dl, fname, new_info))
 
                     if downloaded and merger.available and not self.params.get('allow_unplayable_formats'):
                         info_dict['__postprocessors'].append(merger)
@@ -3541,11 +3781,23 @@ def correct_ext(filename, ext=new_ext):
                     if dl_filename is None or dl_filename == temp_filename:
                         # dl_filename == temp_filename could mean that the file was partially downloaded with --no-part.
                         # So we should try to resume the download
-                        success, real_download = self.dl(temp_filename, info_dict)
-                        info_dict['__real_download'] = real_download
+                        downloads.append(functools.partial(self.dl, temp_filename, info_dict))
                     else:
                         self.report_file_already_downloaded(dl_filename)
 
+                if defer_subtitles:
+                    downloads.append(write_subtitles)
+                results = self._run_streams(downloads) if concurrent_streams else [func() for func in downloads]
+                if defer_subtitles:
+                    sub_files = results.pop()
+                    if sub_files is None:
+                        return
+                    files_to_move.update(dict(sub_files))
+                if results:
+                    success = all(partial_success for partial_success, _ in results)
+                    info_dict['__real_download'] = (
+                        info_dict.get('__real_download') or any(real_download for _, real_download in results))
+
                 dl_filename = dl_filename or temp_filename
                 info_dict['__finaldir'] = os.path.dirname(os.path.abspath(full_filename))
 
@@ -3653,7 +3905,7 @@ def wrapper(*args, **kwargs):
             else:
                 if self.params.get('dump_single_json', False):
                     self.post_extract(res)
-                    self.to_stdout(json.dumps(self.sanitize_info(res)))
+                    self.to_stdout(self._dumps_info(res))
         return wrapper
 
     def download(self, url_list):
@@ -3695,10 +3947,7 @@ def download_with_info_file(self, info_filename):
         return self._download_retcode
 
     @staticmethod
-    def sanitize_info(info_dict, remove_private_keys=False):
-        """ Sanitize the infodict for converting to json """
-        if info_dict is None:
-            return info_dict
+    def _add_json_fields(info_dict):
         info_dict.setdefault('epoch', int(time.time()))
         info_dict.setdefault('_type', 'video')
         info_dict.setdefault('_version', {
@@ -3708,6 +3957,13 @@ def sanitize_info(info_dict, remove_private_keys=False):
             'repository': ORIGIN,
         })
 
+    @staticmethod
+    def sanitize_info(info_dict, remove_private_keys=False):
+        """ Sanitize the infodict for converting to json """
+        if info_dict is None:
+            return info_dict
+        YoutubeDL._add_json_fields(info_dict)
+
         if remove_private_keys:
             reject = lambda k, v: v is None or k.startswith('__') or k in {
                 'requested_downloads', 'requested_formats', 'requested_subtitles', 'requested_entries',
@@ -3731,6 +3987,21 @@ def filter_fn(obj):
 
         return filter_fn(info_dict)
 
+    @classmethod
+    def _dumps_info(cls, info_dict):
+        """ Same as json.dumps(sanitize_info(info_dict)), but without copying the infodict """
+        if info_dict is not None:
+            cls._add_json_fields(info_dict)
+
+        def default(obj):
+            if isinstance(obj, (set, LazyList)):
+                return list(obj)
+            elif isinstance(obj, ImpersonateTarget):
+                return str(obj)
+            return repr(obj)
+
+        return json.dumps(info_dict, default=default)
+
     @staticmethod
     def filter_requested_info(info_dict, actually_filter=True):
         """ Alias of sanitize_info for backward compatibility """
@@ -3786,8 +4057,18 @@ def run_pp(self, pp, infodict):
     def run_all_pps(self, key, info, *, additional_pps=None):
         if key != 'video':
             self._forceprint(key, info)
+        plan = None
         for pp in (additional_pps or []) + self._pps[key]:
+            # Consecutive stream copies of the downloaded file are run as a single ffmpeg invocation
+            if key == 'post_process' and isinstance(pp, FFmpegPostProcessor) and pp._PLANNABLE:
+                info['__ffmpeg_plan'] = plan = plan or FFmpegPlanPP(self)
+            elif plan:
+                info = self.run_pp(plan, info)
+                plan = None
             info = self.run_pp(pp, info)
+            info.pop('__ffmpeg_plan', None)
+        if plan:
+            info = self.run_pp(plan, info)
         return info
 
     def pre_process(self, ie_info, key='pre_process', files_to_move=None):
@@ -3822,11 +4103,8 @@ def _make_archive_id(self, info_dict):
             if not url:
                 return
             # Try to find matching extractor for the URL and take its ie_key
-            for ie_key, ie in self._ies.items():
-                if ie.suitable(url):
-                    extractor = ie_key
-                    break
-            else:
+            extractor = next((ie_key for ie_key, _ in self._suitable_ies(url)), None)
+            if extractor is None:
                 return
         return make_archive_id(extractor, video_id)
 
@@ -3846,9 +4124,6 @@ def record_download_archive(self, info_dict):
         assert vid_id
 
         self.write_debug(f'Adding to archive: {vid_id}')
-        if is_path_like(fn):
-            with locked_file(fn, 'a', encoding='utf-8') as archive_file:
-                archive_file.write(vid_id + '\n')
         self.archive.add(vid_id)
 
     @staticmethod
@@ -4320,6 +4595,8 @@ def build_request_director(self, handlers, preferences=None):
                     'verbose': 'debug_printtraffic',
                     'source_address': 'source_address',
                     'timeout': 'socket_timeout',
+                    'keep_alive_pool_size': 'keep_alive_pool_size',
+                    'keep_alive_timeout': 'keep_alive_timeout',
                     'legacy_ssl_support': 'legacyserverconnect',
                     'enable_file_urls': 'enable_file_urls',
                     'impersonate': 'impersonate',
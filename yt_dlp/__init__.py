@@ -217,6 +217,13 @@ def validate_minmax(min_val, max_val, min_name, max_name=None):
     validate_positive('autonumber start', opts.autonumber_start)
     validate_positive('autonumber size', opts.autonumber_size, True)
     validate_positive('concurrent fragments', opts.concurrent_fragment_downloads, True)
+    validate_positive('concurrent streams', opts.concurrent_streams, True)
+    validate_positive('http connections', opts.http_connections, True)
+    validate_positive('concurrent extractions', opts.concurrent_extractions, True)
+    validate_positive('fragment hedge delay', opts.fragment_hedge_delay)
+    validate_positive('keep-alive pool size', opts.keep_alive_pool_size)
+    validate_positive('keep-alive timeout', opts.keep_alive_timeout)
+    validate_positive('cache max age', opts.cache_max_age)
     validate_positive('playlist start', opts.playliststart, True)
     if opts.playlistend != -1:
         validate_minmax(opts.playliststart, opts.playlistend, 'playlist start', 'playlist end')
@@ -320,6 +327,8 @@ def validate_bytes(name, value, strict_positive=False):
     opts.max_filesize = validate_bytes('max filesize', opts.max_filesize)
     opts.buffersize = validate_bytes('buffer size', opts.buffersize, True)
     opts.http_chunk_size = validate_bytes('http chunk size', opts.http_chunk_size)
+    opts.fragment_buffer_size = validate_bytes('fragment buffer size', opts.fragment_buffer_size)
+    opts.cache_max_size = validate_bytes('cache max size', opts.cache_max_size)
 
     # Output templates
     def validate_outtmpl(tmpl, msg):
@@ -469,6 +478,13 @@ def metadataparser_actions(f):
 
     if opts.download_archive is not None:
         opts.download_archive = expand_path(opts.download_archive)
+    for name in ('import', 'export'):
+        validate(not getattr(opts, f'{name}_archive') or opts.download_archive is not None,
+                 f'--{name}-archive', msg='{name} requires --download-archive')
+    if opts.import_archive is not None:
+        opts.import_archive = expand_path(opts.import_archive)
+    if opts.export_archive is not None:
+        opts.export_archive = expand_path(opts.export_archive)
 
     if opts.ffmpeg_location is not None:
         opts.ffmpeg_location = expand_path(opts.ffmpeg_location)
@@ -762,17 +778,19 @@ def parse_options(argv=None):
     playlist_pps = [pp for pp in postprocessors if pp.get('when') == 'playlist']
     write_playlist_infojson = (opts.writeinfojson and not opts.clean_infojson
                                and opts.allow_playlist_files and opts.outtmpl.get('pl_infojson') != '')
-    if not any((
-        opts.extract_flat,
+    playlist_is_needed = any((
         opts.dump_single_json,
         opts.forceprint.get('playlist'),
         opts.print_to_file.get('playlist'),
         write_playlist_infojson,
-    )):
+    ))
+    if not opts.extract_flat and not playlist_is_needed:
         if not playlist_pps:
             opts.extract_flat = 'discard'
         elif playlist_pps == [{'key': 'FFmpegConcat', 'only_multi_video': True, 'when': 'playlist'}]:
             opts.extract_flat = 'discard_in_playlist'
+    # Lazy playlists whose entries are not needed afterwards are streamed
+    stream_playlist = opts.lazy_playlist and not playlist_is_needed and not playlist_pps
 
     final_ext = (
         opts.recodevideo if opts.recodevideo in FFmpegVideoConvertorPP.SUPPORTED_EXTS
@@ -842,13 +860,18 @@ def parse_options(argv=None):
         'file_access_retries': opts.file_access_retries,
         'fragment_retries': opts.fragment_retries,
         'extractor_retries': opts.extractor_retries,
+        'concurrent_extractions': opts.concurrent_extractions,
         'retry_sleep_functions': opts.retry_sleep,
         'skip_unavailable_fragments': opts.skip_unavailable_fragments,
         'keep_fragments': opts.keep_fragments,
+        'fragment_buffer_size': opts.fragment_buffer_size,
         'concurrent_fragment_downloads': opts.concurrent_fragment_downloads,
+        'concurrent_streams': opts.concurrent_streams,
+        'fragment_hedge_delay': opts.fragment_hedge_delay,
         'buffersize': opts.buffersize,
         'noresizebuffer': opts.noresizebuffer,
         'http_chunk_size': opts.http_chunk_size,
+        'http_connections': opts.http_connections,
         'continuedl': opts.continue_dl,
         'noprogress': opts.quiet if opts.noprogress is None else opts.noprogress,
         'progress_with_newline': opts.progress_with_newline,
@@ -859,6 +882,7 @@ def parse_options(argv=None):
         'playlistreverse': opts.playlist_reverse,
         'playlistrandom': opts.playlist_random,
         'lazy_playlist': opts.lazy_playlist,
+        'stream_playlist': stream_playlist,
         'noplaylist': opts.noplaylist,
         'logtostderr': opts.outtmpl.get('default') == '-',
         'consoletitle': opts.consoletitle,
@@ -898,6 +922,9 @@ def parse_options(argv=None):
         'max_views': opts.max_views,
         'daterange': opts.date,
         'cachedir': opts.cachedir,
+        'cache_backend': opts.cache_backend,
+        'cache_max_age': opts.cache_max_age,
+        'cache_max_size': opts.cache_max_size,
         'age_limit': opts.age_limit,
         'download_archive': opts.download_archive,
         'break_on_existing': opts.break_on_existing,
@@ -913,6 +940,8 @@ def parse_options(argv=None):
         'http_headers': opts.headers,
         'proxy': opts.proxy,
         'socket_timeout': opts.socket_timeout,
+        'keep_alive_pool_size': opts.keep_alive_pool_size,
+        'keep_alive_timeout': opts.keep_alive_timeout,
         'bidi_workaround': opts.bidi_workaround,
         'debug_printtraffic': opts.debug_printtraffic,
         'default_search': opts.default_search,
@@ -979,12 +1008,19 @@ def _real_main(argv=None):
         _load_all_plugins()
 
     with YoutubeDL(ydl_opts) as ydl:
-        pre_process = opts.update_self or opts.rm_cachedir
+        pre_process = opts.update_self or opts.rm_cachedir or opts.import_archive or opts.export_archive
         actual_use = all_urls or opts.load_info_filename
 
         if opts.rm_cachedir:
             ydl.cache.remove()
 
+        if opts.import_archive:
+            count = ydl.archive.import_text(opts.import_archive)
+            ydl.to_screen(f'[download] Imported {count} IDs from {opts.import_archive!r} to the archive')
+        if opts.export_archive:
+            count = ydl.archive.export_text(opts.export_archive)
+            ydl.to_screen(f'[download] Exported {count} IDs from the archive to {opts.export_archive!r}')
+
         try:
             updater = Updater(ydl, opts.update_self)
             if opts.update_self and updater.update() and actual_use and updater.cmd:
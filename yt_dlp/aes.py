@@ -1,4 +1,6 @@
 import base64
+import functools
+import struct
 from math import ceil
 
 from .compat import compat_ord
@@ -9,6 +11,15 @@ def aes_cbc_decrypt_bytes(data, key, iv):
         """ Decrypt bytes with AES-CBC using pycryptodome """
         return Cryptodome.AES.new(key, Cryptodome.AES.MODE_CBC, iv).decrypt(data)
 
+    def aes_cbc_decryptor(key, iv):
+        """
+        Incremental AES-CBC decryption using pycryptodome
+
+        The returned object's decrypt() must be called with consecutive chunks of
+        the data, each of them a multiple of the block size
+        """
+        return Cryptodome.AES.new(key, Cryptodome.AES.MODE_CBC, iv)
+
     def aes_gcm_decrypt_and_verify_bytes(data, key, tag, nonce):
         """ Decrypt bytes with AES-GCM using pycryptodome """
         return Cryptodome.AES.new(key, Cryptodome.AES.MODE_GCM, nonce).decrypt_and_verify(data, tag)
@@ -16,7 +27,17 @@ def aes_gcm_decrypt_and_verify_bytes(data, key, tag, nonce):
 else:
     def aes_cbc_decrypt_bytes(data, key, iv):
         """ Decrypt bytes with AES-CBC using native implementation since pycryptodome is unavailable """
-        return bytes(aes_cbc_decrypt(*map(list, (data, key, iv))))
+        padding = -len(data) % BLOCK_SIZE_BYTES
+        return aes_cbc_decryptor(key, iv).decrypt(bytes(data) + b'\0' * padding)[:len(data)]
+
+    def aes_cbc_decryptor(key, iv):
+        """
+        Incremental AES-CBC decryption using native implementation since pycryptodome is unavailable
+
+        The returned object's decrypt() must be called with consecutive chunks of
+        the data, each of them a multiple of the block size
+        """
+        return _AESCBCDecryptor(key, iv)
 
     def aes_gcm_decrypt_and_verify_bytes(data, key, tag, nonce):
         """ Decrypt bytes with AES-GCM using native implementation since pycryptodome is unavailable """
@@ -284,6 +305,90 @@ def aes_decrypt(data, expanded_key):
     return xor(data, expanded_key[:BLOCK_SIZE_BYTES])
 
 
+class _AESCBCDecryptor:
+    """
+    Table-driven AES-CBC decryption working on 32-bit words
+
+    Uses the equivalent inverse cipher (FIPS-197 section 5.3.5) with precomputed
+    round tables, which is much faster than aes_cbc_decrypt on lists of bytes
+    """
+    _BLOCK = struct.Struct('>4I')
+
+    def __init__(self, key, iv):
+        self._round_keys = _decryption_round_keys(bytes(key))
+        self._previous = self._BLOCK.unpack(bytes(iv))
+
+    def decrypt(self, data):
+        if len(data) % BLOCK_SIZE_BYTES:
+            raise ValueError(f'Data must be a multiple of {BLOCK_SIZE_BYTES} bytes')
+        td0, td1, td2, td3, sbox_inv = _decryption_tables()
+        round_keys = self._round_keys
+        first_key, last_key = round_keys[0], round_keys[-1]
+        middle_keys = round_keys[1:-1]
+        unpack_from, pack_into = self._BLOCK.unpack_from, self._BLOCK.pack_into
+        p0, p1, p2, p3 = self._previous
+        output = bytearray(len(data))
+
+        for offset in range(0, len(data), BLOCK_SIZE_BYTES):
+            c0, c1, c2, c3 = unpack_from(data, offset)
+            k0, k1, k2, k3 = first_key
+            s0, s1, s2, s3 = c0 ^ k0, c1 ^ k1, c2 ^ k2, c3 ^ k3
+            for k0, k1, k2, k3 in middle_keys:
+                s0, s1, s2, s3 = (
+                    td0[s0 >> 24] ^ td1[(s3 >> 16) & 0xFF] ^ td2[(s2 >> 8) & 0xFF] ^ td3[s1 & 0xFF] ^ k0,
+                    td0[s1 >> 24] ^ td1[(s0 >> 16) & 0xFF] ^ td2[(s3 >> 8) & 0xFF] ^ td3[s2 & 0xFF] ^ k1,
+                    td0[s2 >> 24] ^ td1[(s1 >> 16) & 0xFF] ^ td2[(s0 >> 8) & 0xFF] ^ td3[s3 & 0xFF] ^ k2,
+                    td0[s3 >> 24] ^ td1[(s2 >> 16) & 0xFF] ^ td2[(s1 >> 8) & 0xFF] ^ td3[s0 & 0xFF] ^ k3)
+            k0, k1, k2, k3 = last_key
+            pack_into(
+                output, offset,
+                ((sbox_inv[s0 >> 24] << 24) | (sbox_inv[(s3 >> 16) & 0xFF] << 16)
+                 | (sbox_inv[(s2 >> 8) & 0xFF] << 8) | sbox_inv[s1 & 0xFF]) ^ k0 ^ p0,
+                ((sbox_inv[s1 >> 24] << 24) | (sbox_inv[(s0 >> 16) & 0xFF] << 16)
+                 | (sbox_inv[(s3 >> 8) & 0xFF] << 8) | sbox_inv[s2 & 0xFF]) ^ k1 ^ p1,
+                ((sbox_inv[s2 >> 24] << 24) | (sbox_inv[(s1 >> 16) & 0xFF] << 16)
+                 | (sbox_inv[(s0 >> 8) & 0xFF] << 8) | sbox_inv[s3 & 0xFF]) ^ k2 ^ p2,
+                ((sbox_inv[s3 >> 24] << 24) | (sbox_inv[(s2 >> 16) & 0xFF] << 16)
+                 | (sbox_inv[(s1 >> 8) & 0xFF] << 8) | sbox_inv[s0 & 0xFF]) ^ k3 ^ p3)
+            p0, p1, p2, p3 = c0, c1, c2, c3
+
+        self._previous = p0, p1, p2, p3
+        return bytes(output)
+
+
+def _gf_multiply(x, y):
+    if x == 0 or y == 0:
+        return 0
+    return RIJNDAEL_EXP_TABLE[(RIJNDAEL_LOG_TABLE[x] + RIJNDAEL_LOG_TABLE[y]) % 0xFF]
+
+
+@functools.cache
+def _decryption_tables():
+    """Returns the 4 inverse round tables, combining InvSubBytes and InvMixColumns, and the inverse S-box"""
+    td0 = tuple(
+        (_gf_multiply(x, 0xE) << 24) | (_gf_multiply(x, 0x9) << 16) | (_gf_multiply(x, 0xD) << 8) | _gf_multiply(x, 0xB)
+        for x in SBOX_INV)
+    td1 = tuple(((w >> 8) | (w << 24)) & 0xFFFFFFFF for w in td0)
+    td2 = tuple(((w >> 8) | (w << 24)) & 0xFFFFFFFF for w in td1)
+    td3 = tuple(((w >> 8) | (w << 24)) & 0xFFFFFFFF for w in td2)
+    return td0, td1, td2, td3, SBOX_INV
+
+
+@functools.lru_cache(maxsize=16)
+def _decryption_round_keys(key):
+    """Returns the round keys for the equivalent inverse cipher, as tuples of 4 words in the order they are used"""
+    td0, td1, td2, td3, _ = _decryption_tables()
+    expanded_key = bytes(key_expansion(list(key)))
+    words = struct.unpack(f'>{len(expanded_key) // 4}I', expanded_key)
+    round_keys = [words[i:i + 4] for i in range(0, len(words), 4)][::-1]
+    for i in range(1, len(round_keys) - 1):
+        # InvMixColumns, by undoing the InvSubBytes of the tables
+        round_keys[i] = tuple(
+            td0[SBOX[w >> 24]] ^ td1[SBOX[(w >> 16) & 0xFF]] ^ td2[SBOX[(w >> 8) & 0xFF]] ^ td3[SBOX[w & 0xFF]]
+            for w in round_keys[i])
+    return tuple(round_keys)
+
+
 def aes_decrypt_text(data, password, key_size_bytes):
     """
     Decrypt text
@@ -534,6 +639,7 @@ def ghash(subkey, data):
 __all__ = [
     'aes_cbc_decrypt',
     'aes_cbc_decrypt_bytes',
+    'aes_cbc_decryptor',
     'aes_cbc_encrypt',
     'aes_cbc_encrypt_bytes',
     'aes_ctr_decrypt',
@@ -0,0 +1,168 @@
+import contextlib
+import errno
+import os
+import threading
+
+from .dependencies import sqlite3
+from .utils import locked_file
+
+SQLITE_EXTENSIONS = ('.db', '.sqlite', '.sqlite3')
+
+
+class DownloadArchive:
+    """
+    Base class for the file-backed download archives
+
+    The archive is a set of IDs (see make_archive_id) that is
+    shared with other processes using the same file
+    """
+
+    def __init__(self, filename):
+        self.filename = filename
+        self._lock = threading.Lock()
+
+    def __contains__(self, vid_id):
+        raise NotImplementedError
+
+    def __iter__(self):
+        raise NotImplementedError
+
+    def add(self, vid_id):
+        self.update((vid_id,))
+
+    def update(self, vid_ids):
+        """Add all the IDs at once"""
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+    def import_text(self, filename):
+        """Add the IDs from an archive in the text format. Returns the number of IDs read"""
+        with locked_file(filename, 'r', encoding='utf-8') as f:
+            vid_ids = list(filter(None, map(str.strip, f)))
+        self.update(vid_ids)
+        return len(vid_ids)
+
+    def export_text(self, filename):
+        """Write all the IDs in the text format. Returns the number of IDs written"""
+        count = 0
+        with locked_file(filename, 'w', encoding='utf-8') as f:
+            for vid_id in self:
+                f.write(f'{vid_id}\n')
+                count += 1
+        return count
+
+
+class TextDownloadArchive(DownloadArchive):
+    """
+    The archive as a text file with one ID per line
+
+    The IDs are kept in memory. Lines appended to the file by
+    other processes are read when an ID is not found
+    """
+
+    def __init__(self, filename):
+        super().__init__(filename)
+        self._ids, self._offset = set(), 0
+        self._read_new_lines(partial=True)
+
+    def _read_new_lines(self, partial=False):
+        try:
+            if os.path.getsize(self.filename) <= self._offset:
+                return
+            with locked_file(self.filename, 'rb') as f:
+                f.seek(self._offset)
+                data = f.read()
+        except OSError as e:
+            if e.errno != errno.ENOENT:
+                raise
+            return
+        if not partial:
+            # The last line may still be in the process of being written
+            data = data[:data.rfind(b'\n') + 1]
+        self._offset += len(data)
+        self._ids.update(filter(None, map(str.strip, data.decode('utf-8').splitlines())))
+
+    def __contains__(self, vid_id):
+        with self._lock:
+            if vid_id not in self._ids:
+                self._read_new_lines()
+            return vid_id in self._ids
+
+    def __iter__(self):
+        with self._lock:
+            self._read_new_lines()
+            return iter(self._ids.copy())
+
+    def update(self, vid_ids):
+        vid_ids = list(vid_ids)
+        with self._lock:
+            with locked_file(self.filename, 'a', encoding='utf-8') as f:
+                f.writelines(f'{vid_id}\n' for vid_id in vid_ids)
+            self._ids.update(vid_ids)
+
+
+class SQLiteDownloadArchive(DownloadArchive):
+    """
+    The archive as an SQLite database
+
+    IDs are looked up in the database without loading all of them.
+    Each update is committed at once, so that it is immediately visible to other processes
+    """
+
+    def __init__(self, filename):
+        if not sqlite3:
+            raise ImportError('An SQLite download archive requires a Python interpreter compiled with sqlite3 support')
+        super().__init__(filename)
+        self._conn = sqlite3.connect(filename, timeout=60, isolation_level=None, check_same_thread=False)
+        with contextlib.suppress(sqlite3.OperationalError):  # eg: network filesystems
+            self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('CREATE TABLE IF NOT EXISTS archive (id TEXT PRIMARY KEY) WITHOUT ROWID')
+
+    def __contains__(self, vid_id):
+        with self._lock:
+            return self._conn.execute('SELECT 1 FROM archive WHERE id = ?', (vid_id,)).fetchone() is not None
+
+    def __iter__(self):
+        with self._lock:
+            cursor = self._conn.execute('SELECT id FROM archive')
+        while True:
+            with self._lock:
+                rows = cursor.fetchmany(10000)
+            if not rows:
+                break
+            yield from (vid_id for (vid_id,) in rows)
+
+    def update(self, vid_ids):
+        with self._lock:
+            self._conn.execute('BEGIN IMMEDIATE')
+            try:
+                self._conn.executemany('INSERT OR IGNORE INTO archive VALUES (?)', ((vid_id,) for vid_id in vid_ids))
+            except BaseException:
+                self._conn.execute('ROLLBACK')
+                raise
+            self._conn.execute('COMMIT')
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def is_sqlite_archive(filename):
+    try:
+        with open(filename, 'rb') as f:
+            header = f.read(16)
+    except OSError:
+        header = None
+    if header:
+        return header == b'SQLite format 3\0'
+    return os.path.splitext(filename)[1].lower() in SQLITE_EXTENSIONS
+
+
+def open_download_archive(filename):
+    """Open the archive with the backend matching the file's format or, for a new file, its extension"""
+    filename = os.fspath(filename)
+    if is_sqlite_archive(filename):
+        return SQLiteDownloadArchive(filename)
+    return TextDownloadArchive(filename)
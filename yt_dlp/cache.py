@@ -1,18 +1,31 @@
+import collections
 import contextlib
 import json
 import os
 import re
 import shutil
+import threading
+import time
 import traceback
 import urllib.parse
 
+from .dependencies import sqlite3
 from .utils import expand_path, traverse_obj, version_tuple, write_json_file
 from .version import __version__
 
 
 class Cache:
+    # Total size of the serialized entries that are memoized in-process
+    _MEMORY_SIZE = 32 * 1024 * 1024
+    _DB_NAME = 'cache.sqlite3'
+
     def __init__(self, ydl):
         self._ydl = ydl
+        self._lock = threading.RLock()
+        self._memory = collections.OrderedDict()
+        self._memory_size = 0
+        self._evicted_sections = set()
+        self._db = None
 
     def _get_root_dir(self):
         res = self._ydl.params.get('cachedir')
@@ -30,6 +43,57 @@ def _get_cache_fn(self, section, key, dtype):
     def enabled(self):
         return self._ydl.params.get('cachedir') is not False
 
+    def _get_limit(self, name, section):
+        """The param can be a number or a dict of section names to numbers, with 'default' for the others"""
+        limit = self._ydl.params.get(name)
+        if isinstance(limit, dict):
+            limit = limit.get(section, limit.get('default'))
+        return limit
+
+    def _get_db(self, create=True):
+        if self._db is None:
+            fn = os.path.join(self._get_root_dir(), self._DB_NAME)
+            if self._ydl.params.get('cache_backend', 'files') == 'files':
+                self._db = False
+            elif not sqlite3:
+                self._ydl.report_warning(
+                    'Cannot use an SQLite cache without sqlite3 support. Falling back to cache files')
+                self._db = False
+            elif not create and not os.path.exists(fn):
+                return None
+            else:
+                os.makedirs(os.path.dirname(fn), exist_ok=True)
+                self._db = sqlite3.connect(fn, timeout=60, isolation_level=None, check_same_thread=False)
+                with contextlib.suppress(sqlite3.OperationalError):
+                    self._db.execute('PRAGMA journal_mode=WAL')
+                self._db.execute(
+                    'CREATE TABLE IF NOT EXISTS cache (section TEXT, key TEXT, mtime REAL, data TEXT, '
+                    'PRIMARY KEY (section, key)) WITHOUT ROWID')
+        return self._db
+
+    def _remember(self, section, key, mtime, serialized):
+        with self._lock:
+            old = self._memory.pop((section, key), None)
+            if old:
+                self._memory_size -= len(old[1])
+            if serialized is None or len(serialized) > self._MEMORY_SIZE // 4:
+                return
+            self._memory[section, key] = mtime, serialized
+            self._memory_size += len(serialized)
+            while self._memory_size > self._MEMORY_SIZE:
+                self._memory_size -= len(self._memory.popitem(last=False)[1][1])
+
+    def _recall(self, section, key):
+        with self._lock:
+            entry = self._memory.get((section, key))
+            if entry:
+                self._memory.move_to_end((section, key))
+            return entry
+
+    def _is_expired(self, section, mtime):
+        max_age = self._get_limit('cache_max_age', section)
+        return max_age is not None and mtime < time.time() - max_age
+
     def store(self, section, key, data, dtype='json'):
         assert dtype in ('json',)
 
@@ -37,14 +101,60 @@ def store(self, section, key, data, dtype='json'):
             return
 
         fn = self._get_cache_fn(section, key, dtype)
+        obj = {'yt-dlp_version': __version__, 'data': data}
         try:
-            os.makedirs(os.path.dirname(fn), exist_ok=True)
             self._ydl.write_debug(f'Saving {section}.{key} to cache')
-            write_json_file({'yt-dlp_version': __version__, 'data': data}, fn)
+            serialized = json.dumps(obj, ensure_ascii=False)
+            with self._lock:
+                if db := self._get_db():
+                    fn = os.path.join(self._get_root_dir(), self._DB_NAME)
+                    db.execute('INSERT OR REPLACE INTO cache VALUES (?, ?, ?, ?)', (section, key, time.time(), serialized))
+                else:
+                    os.makedirs(os.path.dirname(fn), exist_ok=True)
+                    write_json_file(obj, fn)
+                self._remember(section, key, time.time(), serialized)
+                self._evict(section)
         except Exception:
             tb = traceback.format_exc()
             self._ydl.report_warning(f'Writing cache to {fn!r} failed: {tb}')
 
+    def _evict(self, section):
+        """Remove the expired entries and the oldest entries exceeding the size limit, once per section"""
+        max_age, max_size = self._get_limit('cache_max_age', section), self._get_limit('cache_max_size', section)
+        if (max_age is None and max_size is None) or section in self._evicted_sections:
+            return
+        self._evicted_sections.add(section)
+
+        if db := self._get_db():
+            entries = db.execute(
+                'SELECT key, length(data), mtime FROM cache WHERE section = ? ORDER BY mtime DESC', (section,)).fetchall()
+        else:
+            with os.scandir(os.path.dirname(self._get_cache_fn(section, '', 'json'))) as it:
+                entries = sorted((
+                    (entry.path, stat.st_size, stat.st_mtime) for entry in it
+                    if entry.is_file() and entry.name.endswith('.json') and (stat := entry.stat())
+                ), key=lambda x: x[2], reverse=True)
+
+        total_size, removed = 0, []
+        for name, size, mtime in entries:
+            total_size += size
+            if self._is_expired(section, mtime) or (max_size is not None and total_size > max_size):
+                removed.append(name)
+        if not removed:
+            return
+        self._ydl.write_debug(f'Evicting {len(removed)} entries from cache section {section}')
+        if db:
+            db.executemany('DELETE FROM cache WHERE section = ? AND key = ?', ((section, key) for key in removed))
+            keys = removed
+        else:
+            keys = []
+            for fn in removed:
+                with contextlib.suppress(OSError):
+                    os.remove(fn)
+                keys.append(urllib.parse.unquote(os.path.basename(fn)[:-5].replace(',', '%')))
+        for key in keys:
+            self._remember(section, key, None, None)
+
     def _validate(self, data, min_ver):
         version = traverse_obj(data, 'yt-dlp_version')
         if not version:  # Backward compatibility
@@ -53,25 +163,43 @@ def _validate(self, data, min_ver):
             return data['data']
         self._ydl.write_debug(f'Discarding old cache from version {version} (needs {min_ver})')
 
+    def _load_serialized(self, section, key, dtype):
+        """Returns (mtime, serialized data) or None"""
+        with self._lock:
+            db = self._get_db(create=False)
+            if db is None:
+                return None
+            elif db:
+                return db.execute(
+                    'SELECT mtime, data FROM cache WHERE section = ? AND key = ?', (section, key)).fetchone()
+
+        cache_fn = self._get_cache_fn(section, key, dtype)
+        with contextlib.suppress(OSError), open(cache_fn, encoding='utf-8') as cachef:
+            return os.fstat(cachef.fileno()).st_mtime, cachef.read()
+
     def load(self, section, key, dtype='json', default=None, *, min_ver=None):
         assert dtype in ('json',)
 
         if not self.enabled:
             return default
 
-        cache_fn = self._get_cache_fn(section, key, dtype)
-        with contextlib.suppress(OSError):
-            try:
-                with open(cache_fn, encoding='utf-8') as cachef:
-                    self._ydl.write_debug(f'Loading {section}.{key} from cache')
-                    return self._validate(json.load(cachef), min_ver)
-            except (ValueError, KeyError):
-                try:
-                    file_size = os.path.getsize(cache_fn)
-                except OSError as oe:
-                    file_size = str(oe)
-                self._ydl.report_warning(f'Cache retrieval from {cache_fn} failed ({file_size})')
+        entry = self._recall(section, key)
+        if entry is None:
+            entry = self._load_serialized(section, key, dtype)
+            if entry is None:
+                return default
+            self._remember(section, key, *entry)
+        mtime, serialized = entry
+        if self._is_expired(section, mtime):
+            self._ydl.write_debug(f'Discarding expired cache {section}.{key}')
+            return default
 
+        self._ydl.write_debug(f'Loading {section}.{key} from cache')
+        try:
+            return self._validate(json.loads(serialized), min_ver)
+        except (ValueError, KeyError):
+            self._remember(section, key, None, None)
+            self._ydl.report_warning(f'Cache retrieval of {section}.{key} failed ({len(serialized)} bytes)')
         return default
 
     def remove(self):
@@ -83,9 +211,20 @@ def remove(self):
         if not any((term in cachedir) for term in ('cache', 'tmp')):
             raise Exception(f'Not removing directory {cachedir} - this does not look like a cache dir')
 
+        with self._lock:
+            self.close()
+            self._memory.clear()
+            self._memory_size = 0
+
         self._ydl.to_screen(
             f'Removing cache dir {cachedir} .', skip_eol=True)
         if os.path.exists(cachedir):
             self._ydl.to_screen('.', skip_eol=True)
             shutil.rmtree(cachedir)
         self._ydl.to_screen('.')
+
+    def close(self):
+        with self._lock:
+            if self._db:
+                self._db.close()
+            self._db = None
@@ -72,6 +72,8 @@ class FileDownloader:
     http_chunk_size:    Size of a chunk for chunk-based HTTP downloading. May be
                         useful for bypassing bandwidth throttling imposed by
                         a webserver (experimental)
+    http_connections:   Number of connections to download a single HTTP file over,
+                        each of them fetching a byte range of the file
     progress_template:  See YoutubeDL.py
     retry_sleep_functions: See YoutubeDL.py
 
@@ -79,6 +81,8 @@ class FileDownloader:
     """
 
     _TEST_FILE_SIZE = 10241
+    # Minimum time between two renders of a progress line, in seconds
+    _PROGRESS_FRAME_INTERVAL = 0.1
     params = None
 
     def __init__(self, ydl, params):
@@ -88,6 +92,9 @@ def __init__(self, ydl, params):
         self.params = params
         self._prepare_multiline_status()
         self.add_progress_hook(self.report_progress)
+        self._progress_frame_times = {}
+        # {thread: (start_time, byte_counter)} of the last call to slow_down
+        self._rate_limited_bytes = {}
         if self.params.get('progress_delta'):
             self._progress_delta_lock = threading.Lock()
             self._progress_delta_time = time.monotonic()
@@ -198,11 +205,25 @@ def parse_bytes(bytestr):
                             'may be removed in the future. Use yt_dlp.utils.parse_bytes instead')
         return parse_bytes(bytestr)
 
-    def slow_down(self, start_time, now, byte_counter):
-        """Sleep if the download speed is over the rate limit."""
+    def slow_down(self, start_time, now, byte_counter, *, new_bytes=None):
+        """
+        Sleep if the download speed is over the rate limit.
+        new_bytes is the number of bytes read since the previous call, if byte_counter is shared by several threads
+        """
         rate_limit = self.params.get('ratelimit')
         if rate_limit is None or byte_counter == 0:
             return
+        if rate_limiter := self.params.get('_rate_limiter'):
+            # The limit is shared with the downloads that run at the same time,
+            # so only the bytes read since the previous call are counted
+            if new_bytes is not None:
+                rate_limiter.consume(new_bytes)
+                return
+            thread = threading.get_ident()
+            last_start_time, last_byte_counter = self._rate_limited_bytes.get(thread, (None, 0))
+            self._rate_limited_bytes[thread] = start_time, byte_counter
+            rate_limiter.consume(byte_counter - (last_byte_counter if last_start_time == start_time else 0))
+            return
         if now is None:
             now = time.time()
         elapsed = now - start_time
@@ -369,12 +390,21 @@ def with_fields(*tups, default=''):
 
         if s['status'] != 'downloading':
             return
+        elif self.params.get('noprogress') and not self.ydl.params.get('consoletitle'):
+            return  # Nothing would be displayed
 
         if update_delta := self.params.get('progress_delta'):
             with self._progress_delta_lock:
                 if time.monotonic() < self._progress_delta_time:
                     return
                 self._progress_delta_time += update_delta
+        else:
+            # The hook is called for every block that is read, which is far more often than
+            # the progress can be read. So each progress line is rendered at a fixed frame rate
+            now, progress_idx = time.monotonic(), s.get('progress_idx') or 0
+            if now < self._progress_frame_times.get(progress_idx, 0):
+                return
+            self._progress_frame_times[progress_idx] = now + self._PROGRESS_FRAME_INTERVAL
 
         progress = try_call(
             lambda: 100 * s['downloaded_bytes'] / s['total_bytes'],
@@ -431,12 +461,11 @@ def download(self, filename, info_dict, subtitle=False):
         """Download to a filename using the info from info_dict
         Return True on success and False otherwise
         """
-        nooverwrites_and_exists = (
-            not self.params.get('overwrites', True)
-            and os.path.exists(filename)
-        )
-
         if not hasattr(filename, 'write'):
+            nooverwrites_and_exists = (
+                not self.params.get('overwrites', True)
+                and os.path.exists(filename)
+            )
             continuedl_and_exists = (
                 self.params.get('continuedl', True)
                 and os.path.isfile(filename)
@@ -494,11 +523,29 @@ def _hook_progress(self, status, info_dict):
         for ph in self._progress_hooks:
             ph(status)
 
-    def add_progress_hook(self, ph):
+    def add_progress_hook(self, ph, *, delta=None):
         # See YoutubeDl.py (search for progress_hooks) for a description of
         # this interface
+        if delta:
+            ph = self._coalesce_progress_hook(ph, delta)
         self._progress_hooks.append(ph)
 
+    @staticmethod
+    def _coalesce_progress_hook(ph, delta):
+        """ Call ph with the "downloading" status at most once every delta seconds """
+        next_time = 0
+
+        def hook(status):
+            nonlocal next_time
+            if status['status'] == 'downloading':
+                now = time.monotonic()
+                if now < next_time:
+                    return
+                next_time = now + delta
+            ph(status)
+
+        return hook
+
     def _debug_cmd(self, args, exe=None):
         if not self.params.get('verbose', False):
             return
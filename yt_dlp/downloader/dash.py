@@ -3,7 +3,17 @@
 
 from . import get_suitable_downloader
 from .fragment import FragmentFD
-from ..utils import ReExtractInfo, update_url_query, urljoin
+from ..compat import compat_etree_fromstring
+from ..networking.exceptions import HTTPError, IncompleteRead, TransportError
+from ..utils import (
+    DownloadError,
+    ReExtractInfo,
+    RetryManager,
+    base_url,
+    parse_duration,
+    update_url_query,
+    urljoin,
+)
 
 
 class DashSegmentsFD(FragmentFD):
@@ -13,13 +23,20 @@ class DashSegmentsFD(FragmentFD):
     """
 
     FD_NAME = 'dashsegments'
+    # Used when the live manifest does not have @minimumUpdatePeriod
+    _LIVE_REFRESH_INTERVAL = 10
 
     def real_download(self, filename, info_dict):
+        is_live = False
         if 'http_dash_segments_generator' in info_dict['protocol'].split('+'):
             real_downloader = None  # No external FD can support --live-from-start
+        elif info_dict.get('is_live'):
+            if not all(fmt.get('manifest_url') for fmt in info_dict.get('requested_formats') or [info_dict]):
+                self.report_error('Live DASH videos are not supported without their manifest URL')
+                return False
+            real_downloader = None  # Refreshing the manifest is not supported for external downloaders
+            is_live = True
         else:
-            if info_dict.get('is_live'):
-                self.report_error('Live DASH videos are not supported')
             real_downloader = get_suitable_downloader(
                 info_dict, self.params, None, protocol='dash_frag_urls', to_stdout=(filename == '-'))
 
@@ -34,7 +51,7 @@ def real_download(self, filename, info_dict):
                 raise ReExtractInfo('the stream needs to be re-extracted', expected=True)
 
             try:
-                fragment_count = 1 if self.params.get('test') else len(fmt['fragments'])
+                fragment_count = 1 if self.params.get('test') else None if is_live else len(fmt['fragments'])
             except TypeError:
                 fragment_count = None
             ctx = {
@@ -54,7 +71,8 @@ def real_download(self, filename, info_dict):
             if extra_param_to_segment_url:
                 extra_query = urllib.parse.parse_qs(extra_param_to_segment_url)
 
-            fragments_to_download = self._get_fragments(fmt, ctx, extra_query)
+            fragments = self._live_fragments(fmt) if is_live else fmt['fragments']
+            fragments_to_download = self._get_fragments(fmt, fragments, ctx, extra_query)
 
             if real_downloader:
                 self.to_screen(
@@ -71,9 +89,91 @@ def _resolve_fragments(self, fragments, ctx):
         fragments = fragments(ctx) if callable(fragments) else fragments
         return [next(iter(fragments))] if self.params.get('test') else fragments
 
-    def _get_fragments(self, fmt, ctx, extra_query):
+    def _download_manifest(self, fmt, mpd_url):
+        """Returns (MPD document, URL) or None"""
+        for retry in RetryManager(self.params.get('fragment_retries'), self.report_retry):
+            try:
+                urlh = self.ydl.urlopen(self._prepare_url(fmt, mpd_url))
+                return compat_etree_fromstring(urlh.read()), urlh.url
+            except (HTTPError, IncompleteRead, TransportError) as err:
+                retry.error = err
+        return None
+
+    def _find_live_format(self, fmt, formats):
+        """Find the format of the refreshed manifest that is the same representation as fmt"""
+        def format_key(f):
+            return tuple(f.get(k) for k in ('ext', 'width', 'height', 'tbr', 'vcodec', 'acodec'))
+
+        # The format ID may have been prefixed with the mpd_id by the extractor
+        return (next((f for f in formats if f['format_id'] == fmt['format_id']), None)
+                or next((f for f in formats if fmt['format_id'].endswith(f'-{f["format_id"]}')), None)
+                or next((f for f in formats if format_key(f) == format_key(fmt)), None))
+
+    def _live_fragments(self, fmt):
+        """
+        Yield the fragments of a live (dynamic) DASH manifest as they are added to it
+
+        The manifest is refreshed every @minimumUpdatePeriod and parsed with
+        InfoExtractor._parse_mpd_periods. Segments are identified by their URL, which has
+        the $Number$ or $Time$ of the segment, until the manifest becomes static
+        """
+        from ..extractor.common import InfoExtractor
+
+        ie = InfoExtractor(self.ydl)
+        mpd_url, fragments, fragment_base_url = fmt['manifest_url'], fmt['fragments'], fmt.get('fragment_base_url')
+        # The update period is not known until the manifest is downloaded
+        refresh_interval = 0
+        is_static = False
+        init_url = last_url = None
+        last_refresh = time.monotonic()
+        while True:
+            fragments = [{**fragment, 'url': fragment.get('url') or urljoin(fragment_base_url, fragment['path'])}
+                         for fragment in fragments]
+            fragment_urls = [fragment['url'] for fragment in fragments]
+            if init_url is None and fragments and 'duration' not in fragments[0]:
+                init_url = fragment_urls[0]
+            new_index = fragment_urls.index(last_url) + 1 if last_url in fragment_urls else 0
+            if last_url is not None and not new_index:
+                self.report_warning('Some fragments were removed from the live manifest before they could be downloaded')
+            new_frags = 0
+            for fragment, url in zip(fragments[new_index:], fragment_urls[new_index:], strict=True):
+                if url == init_url and last_url is not None:
+                    continue
+                last_url = url
+                new_frags += 1
+                yield fragment
+
+            if is_static:
+                self.to_screen(f'[{self.FD_NAME}] The live stream has ended')
+                return
+            # Like for HLS, refresh sooner when nothing new was in the manifest
+            interval = refresh_interval if new_frags else refresh_interval / 2
+            try:
+                time.sleep(max(last_refresh + interval - time.monotonic(), 0))
+                res = self._download_manifest(fmt, mpd_url)
+            except KeyboardInterrupt:
+                self.to_screen(f'[{self.FD_NAME}] Interrupted by user')
+                return
+            except DownloadError:
+                res = None
+            if not res:
+                self.report_warning('Unable to refresh the live manifest; assuming the live stream has ended')
+                return
+            mpd_doc, mpd_url = res
+            last_refresh = time.monotonic()
+            is_static = mpd_doc.get('type') != 'dynamic'
+            refresh_interval = parse_duration(mpd_doc.get('minimumUpdatePeriod')) or self._LIVE_REFRESH_INTERVAL
+            formats, _ = ie._merge_mpd_periods(ie._parse_mpd_periods(mpd_doc, mpd_base_url=base_url(mpd_url), mpd_url=mpd_url))
+            live_fmt = self._find_live_format(fmt, formats)
+            if not live_fmt:
+                self.report_warning('The format is no longer in the live manifest; stopping')
+                return
+            self.write_debug(f'Refreshed the live manifest (last segment: {last_url})')
+            fragments, fragment_base_url = live_fmt.get('fragments') or [], live_fmt.get('fragment_base_url')
+
+    def _get_fragments(self, fmt, fragments, ctx, extra_query):
         fragment_base_url = fmt.get('fragment_base_url')
-        fragments = self._resolve_fragments(fmt['fragments'], ctx)
+        fragments = self._resolve_fragments(fragments, ctx)
 
         frag_index = 0
         for i, fragment in enumerate(fragments):
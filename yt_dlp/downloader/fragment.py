@@ -1,14 +1,17 @@
+import collections
 import concurrent.futures
 import contextlib
 import json
 import math
 import os
 import struct
+import tempfile
+import threading
 import time
 
 from .common import FileDownloader
 from .http import HttpFD
-from ..aes import aes_cbc_decrypt_bytes, unpad_pkcs7
+from ..aes import aes_cbc_decryptor, unpad_pkcs7
 from ..networking import Request
 from ..networking.exceptions import HTTPError, IncompleteRead
 from ..utils import DownloadError, RetryManager, traverse_obj
@@ -16,11 +19,54 @@
 from ..utils.progress import ProgressCalculator
 
 
+class FragmentAborted(Exception):
+    pass
+
+
 class HttpQuietDownloader(HttpFD):
     def to_screen(self, *args, **kargs):
         pass
 
-    to_console_title = to_screen
+    to_console_title = report_progress = to_screen
+
+    def _hook_progress(self, status, info_dict):
+        if info_dict.get('fragment_abort') and info_dict['fragment_abort'].is_set():
+            raise FragmentAborted
+        super()._hook_progress(status, info_dict)
+
+
+class FragmentBufferPool:
+    """
+    Hands out spooled buffers for fragments to be downloaded into.
+
+    At most `count` buffers are kept in memory at the same time and each of them
+    spills to a temporary file once it grows larger than `max_size` bytes.
+    Buffers requested while the pool is exhausted are backed by a temporary file right away
+    """
+
+    def __init__(self, max_size, count, directory=None):
+        self._max_size = max_size
+        self._available = count
+        self._directory = directory or None
+        self._in_memory = set()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        buffer = tempfile.SpooledTemporaryFile(self._max_size, dir=self._directory)
+        with self._lock:
+            if self._available > 0:
+                self._available -= 1
+                self._in_memory.add(buffer)
+                return buffer
+        buffer.rollover()
+        return buffer
+
+    def release(self, buffer):
+        buffer.close()
+        with self._lock:
+            if buffer in self._in_memory:
+                self._in_memory.remove(buffer)
+                self._available += 1
 
 
 class FragmentFD(FileDownloader):
@@ -35,7 +81,13 @@ class FragmentFD(FileDownloader):
                         Skip unavailable fragments (DASH and hlsnative only)
     keep_fragments:     Keep downloaded fragments on disk after downloading is
                         finished
+    fragment_buffer_size:  Download fragments into memory instead of "-Frag" files on disk.
+                        Fragments larger than this many bytes, and fragments that do not fit
+                        into a pool of 2 * concurrent_fragment_downloads buffers, are spilled
+                        to anonymous temporary files. Ignored if keep_fragments is set
     concurrent_fragment_downloads:  The number of threads to use for native hls and dash downloads
+    fragment_hedge_delay:  Request a fragment a second time over another connection if it
+                        is holding up the fragments after it for this many seconds
     _no_ytdl_file:      Don't use .ytdl file
 
     For each incomplete fragment download yt-dlp keeps on disk a special
@@ -59,6 +111,9 @@ class FragmentFD(FileDownloader):
     This feature is experimental and file format may change in future.
     """
 
+    # Encrypted fragments are decrypted by the thread that downloaded them, this many bytes at a time
+    _DECRYPT_CHUNK_SIZE = 1024 * 1024
+
     def report_retry_fragment(self, err, frag_index, count, retries):
         self.deprecation_warning('yt_dlp.downloader.FragmentFD.report_retry_fragment is deprecated. '
                                  'Use yt_dlp.downloader.FileDownloader.report_retry instead')
@@ -109,27 +164,74 @@ def _write_ytdl_file(self, ctx):
             frag_index_stream.close()
 
     def _download_fragment(self, ctx, frag_url, info_dict, headers=None, request_data=None):
-        fragment_filename = '%s-Frag%d' % (ctx['tmpfilename'], ctx['fragment_index'])
         fragment_info_dict = {
             'url': frag_url,
             'http_headers': headers or info_dict.get('http_headers'),
             'request_data': request_data,
             'ctx_id': ctx.get('ctx_id'),
+            'fragment_abort': ctx.get('fragment_abort'),
+            'fragment_claim': ctx.get('fragment_claim'),
         }
+        if ctx.get('fragment_buffers'):
+            return self._download_fragment_to_buffer(ctx, fragment_info_dict)
+
+        fragment_filename = '%s-Frag%d%s' % (
+            ctx['tmpfilename'], ctx['fragment_index'], '.hedge' if ctx.get('fragment_hedged') else '')
         frag_resume_len = 0
         if ctx['dl'].params.get('continuedl', True):
             frag_resume_len = self.filesize_or_none(self.temp_name(fragment_filename))
         fragment_info_dict['frag_resume_len'] = ctx['frag_resume_len'] = frag_resume_len
 
-        success, _ = ctx['dl'].download(fragment_filename, fragment_info_dict)
+        try:
+            success, _ = ctx['dl'].download(fragment_filename, fragment_info_dict)
+        except FragmentAborted:
+            self._discard_aborted_progress(ctx)
+            # It is aborted on its 'finished' progress update too, which comes after the file is renamed
+            self.try_remove(self.temp_name(fragment_filename))
+            self.try_remove(fragment_filename)
+            return False
         if not success:
             return False
+        if fragment_info_dict.get('fragment_lost'):
+            self.try_remove(fragment_filename)
+            return False
         if fragment_info_dict.get('filetime'):
             ctx['fragment_filetime'] = fragment_info_dict.get('filetime')
         ctx['fragment_filename_sanitized'] = fragment_filename
         return True
 
+    def _download_fragment_to_buffer(self, ctx, fragment_info_dict):
+        fragment_info_dict['frag_resume_len'] = ctx['frag_resume_len'] = 0
+        fragment_buffer = ctx['fragment_buffers'].acquire()
+        try:
+            success, _ = ctx['dl'].download(fragment_buffer, fragment_info_dict)
+        except FragmentAborted:
+            self._discard_aborted_progress(ctx)
+            success = False
+        except BaseException:
+            ctx['fragment_buffers'].release(fragment_buffer)
+            raise
+        if not success or fragment_info_dict.get('fragment_lost'):
+            ctx['fragment_buffers'].release(fragment_buffer)
+            return False
+        if fragment_info_dict.get('filetime'):
+            ctx['fragment_filetime'] = fragment_info_dict.get('filetime')
+        ctx['fragment_buffer'] = fragment_buffer
+        return True
+
+    @staticmethod
+    def _discard_aborted_progress(ctx):
+        # The duplicate of a hedged fragment that lost the race is not part of the download
+        if ctx.get('progress'):
+            ctx['progress'].thread_discard()
+
     def _read_fragment(self, ctx):
+        if fragment_buffer := ctx.pop('fragment_buffer', None):
+            # Reading the whole in-memory buffer from the start does not copy it
+            fragment_buffer.seek(0)
+            frag_content = fragment_buffer.read()
+            ctx['fragment_buffers'].release(fragment_buffer)
+            return frag_content
         if not ctx.get('fragment_filename_sanitized'):
             return None
         try:
@@ -143,6 +245,12 @@ def _read_fragment(self, ctx):
         down.close()
         return frag_content
 
+    def _discard_fragment(self, ctx, frag_filename, frag_buffer):
+        if frag_buffer:
+            ctx['fragment_buffers'].release(frag_buffer)
+        elif frag_filename:
+            self.try_remove(frag_filename)
+
     def _append_fragment(self, ctx, frag_content):
         try:
             ctx['dest_stream'].write(frag_content)
@@ -150,9 +258,11 @@ def _append_fragment(self, ctx, frag_content):
         finally:
             if self.__do_ytdl_file(ctx):
                 self._write_ytdl_file(ctx)
-            if not self.params.get('keep_fragments', False):
-                self.try_remove(ctx['fragment_filename_sanitized'])
-            del ctx['fragment_filename_sanitized']
+            if 'fragment_buffers' not in ctx:
+                frag_filename = ctx.pop('fragment_filename_sanitized')
+                # Only the fragment as it was downloaded is kept, not its decrypted copy
+                if not self.params.get('keep_fragments', False) or frag_filename.endswith('.decrypted'):
+                    self.try_remove(frag_filename)
 
     def _prepare_frag_download(self, ctx):
         if not ctx.setdefault('live', False):
@@ -168,6 +278,7 @@ def _prepare_frag_download(self, ctx):
             **self.params,
             'noprogress': True,
             'test': False,
+            'http_connections': 1,
             'sleep_interval': 0,
             'max_sleep_interval': 0,
             'sleep_interval_subtitles': 0,
@@ -222,6 +333,12 @@ def _prepare_frag_download(self, ctx):
             'complete_frags_downloaded_bytes': resume_len,
         })
 
+        fragment_buffer_size = self.params.get('fragment_buffer_size')
+        if fragment_buffer_size and not self.params.get('keep_fragments', False):
+            ctx['fragment_buffers'] = FragmentBufferPool(
+                fragment_buffer_size, 2 * self.params.get('concurrent_fragment_downloads', 1),
+                os.path.dirname(tmpfilename) if tmpfilename != '-' else None)
+
     def _start_frag_download(self, ctx, info_dict):
         resume_len = ctx['complete_frags_downloaded_bytes']
         total_frags = ctx['total_frags']
@@ -237,7 +354,7 @@ def _start_frag_download(self, ctx, info_dict):
         }
 
         ctx['started'] = time.time()
-        progress = ProgressCalculator(resume_len)
+        progress = ctx['progress'] = ProgressCalculator(resume_len)
 
         def frag_progress_hook(s):
             if s['status'] not in ('downloading', 'finished'):
@@ -268,8 +385,16 @@ def frag_progress_hook(s):
                 progress.update(s.get('downloaded_bytes'))
 
             if s['status'] == 'finished':
+                claim = s['fragment_info_dict'].get('fragment_claim')
+                if claim is not None and not claim.acquire(blocking=False):
+                    # The other download of a hedged fragment finished first
+                    s['fragment_info_dict']['fragment_lost'] = True
+                    progress.thread_discard()
+                    return
                 state['fragment_index'] += 1
-                ctx['fragment_index'] = state['fragment_index']
+                # With concurrent downloads, ctx has the index of the last appended fragment for the .ytdl file
+                if claim is None:
+                    ctx['fragment_index'] = state['fragment_index']
                 progress.thread_reset()
 
             state['downloaded_bytes'] = ctx['complete_frags_downloaded_bytes'] = progress.downloaded
@@ -338,20 +463,21 @@ def _prepare_external_frag_download(self, ctx):
             'fragment_index': 0,
         })
 
-    def decrypter(self, info_dict):
+    def _fragment_decryptors(self, info_dict):
+        """Returns a function giving a new decryptor for a fragment, or None if it does not need to be decrypted"""
         _key_cache = {}
+        _key_lock = threading.Lock()
 
         def _get_key(url):
-            if url not in _key_cache:
-                _key_cache[url] = self.ydl.urlopen(self._prepare_url(info_dict, url)).read()
-            return _key_cache[url]
+            with _key_lock:
+                if url not in _key_cache:
+                    _key_cache[url] = self.ydl.urlopen(self._prepare_url(info_dict, url)).read()
+                return _key_cache[url]
 
-        def decrypt_fragment(fragment, frag_content):
-            if frag_content is None:
-                return
+        def get_decryptor(fragment):
             decrypt_info = fragment.get('decrypt_info')
             if not decrypt_info or decrypt_info['METHOD'] != 'AES-128':
-                return frag_content
+                return None
             iv = decrypt_info.get('IV') or struct.pack('>8xq', fragment['media_sequence'])
             decrypt_info['KEY'] = (decrypt_info.get('KEY')
                                    or _get_key(traverse_obj(info_dict, ('hls_aes', 'uri')) or decrypt_info['URI']))
@@ -359,11 +485,60 @@ def decrypt_fragment(fragment, frag_content):
             # size (see https://github.com/ytdl-org/youtube-dl/pull/27660). Tests only care that the correct data downloaded,
             # not what it decrypts to.
             if self.params.get('test', False):
+                return None
+            return aes_cbc_decryptor(decrypt_info['KEY'], iv)
+
+        return get_decryptor
+
+    def decrypter(self, info_dict):
+        get_decryptor = self._fragment_decryptors(info_dict)
+
+        def decrypt_fragment(fragment, frag_content):
+            if frag_content is None:
+                return
+            decryptor = get_decryptor(fragment)
+            if not decryptor:
                 return frag_content
-            return unpad_pkcs7(aes_cbc_decrypt_bytes(frag_content, decrypt_info['KEY'], iv))
+            return unpad_pkcs7(decryptor.decrypt(frag_content))
 
         return decrypt_fragment
 
+    def _decrypt_downloaded_fragment(self, ctx, decryptor):
+        """
+        Decrypt the downloaded fragment one chunk at a time
+
+        An in-memory fragment is decrypted in place. A fragment file is decrypted into another file,
+        since a resumed download takes the fragment file as complete and would decrypt it once more
+        """
+        fragment_buffer = ctx.get('fragment_buffer')
+        if fragment_buffer:
+            source = dest = fragment_buffer
+        else:
+            frag_filename = ctx['fragment_filename_sanitized']
+            decrypted_filename = f'{frag_filename}.decrypted'
+            source, dest = open(frag_filename, 'rb'), open(decrypted_filename, 'w+b')
+        try:
+            position = 0
+            while True:
+                source.seek(position)
+                chunk = source.read(self._DECRYPT_CHUNK_SIZE)
+                if not chunk:
+                    break
+                dest.seek(position)
+                dest.write(decryptor.decrypt(chunk))
+                position += len(chunk)
+            if position:
+                dest.seek(position - 1)
+                dest.truncate(position - dest.read(1)[0])
+        finally:
+            if not fragment_buffer:
+                source.close()
+                dest.close()
+        if not fragment_buffer:
+            if not self.params.get('keep_fragments', False):
+                self.try_remove(frag_filename)
+            ctx['fragment_filename_sanitized'] = decrypted_filename
+
     def download_and_append_fragments_multiple(self, *args, **kwargs):
         """
         @params (ctx1, fragments1, info_dict1), (ctx2, fragments2, info_dict2), ...
@@ -428,6 +603,82 @@ def interrupt_trigger_iter(fg):
         # so returning a intermediate result here instead of KeyboardInterrupt on live
         return result
 
+    def _iter_fragment_downloads(self, ctx, pool, download_func, fragments, max_workers, hedge=True):
+        """
+        Download fragments concurrently and yield (fragment, result of download_func) in order
+
+        Up to max_workers downloads run at a time and fragments are collected as they
+        complete, in a reorder buffer holding at most 2 * max_workers fragments.
+        If hedge is set and the next fragment to be yielded is still missing fragment_hedge_delay
+        seconds after being dispatched, it is requested once more; the first successful
+        download of the two is used and the other one is aborted.
+        download_func is called with the fragment, whether it is the second request of it,
+        an Event that is set to abort it and a Lock that the first download to finish acquires
+        """
+        hedge_delay = hedge and self.params.get('fragment_hedge_delay')
+        fragments = iter(fragments)
+        reorder_buffer = collections.deque()
+        running = set()
+
+        def submit(job):
+            abort = threading.Event()
+            future = pool.submit(download_func, job['fragment'], bool(job['futures']), abort, job['claim'])
+            future.abort = abort
+            job['futures'].append(future)
+            running.add(future)
+
+        def is_success(future):
+            return future.done() and not future.exception() and any(future.result())
+
+        def discard(future):
+            if is_success(future):
+                self._discard_fragment(ctx, *future.result())
+
+        def finish(job):
+            futures = job['futures']
+            winner = next(filter(is_success, futures), None)
+            if winner is None:
+                if not all(f.done() for f in futures):
+                    return None
+                winner = futures[0]
+            for future in futures:
+                if future is not winner:
+                    future.abort.set()
+                    future.add_done_callback(discard)
+            return winner
+
+        while True:
+            running.difference_update([f for f in running if f.done()])
+            head = reorder_buffer[0] if reorder_buffer else None
+            hedge_at = (
+                head['started'] + hedge_delay
+                if hedge_delay and head and len(head['futures']) == 1 and not head['futures'][0].done()
+                else None)
+            if hedge_at is not None and len(running) < max_workers and time.monotonic() >= hedge_at:
+                self.write_debug(f'Requesting fragment {head["fragment"]["frag_index"]} again')
+                submit(head)
+                hedge_at = None
+
+            while len(running) < max_workers and len(reorder_buffer) < 2 * max_workers:
+                fragment = next(fragments, None)
+                if fragment is None:
+                    break
+                job = {'fragment': fragment, 'futures': [], 'started': time.monotonic(), 'claim': threading.Lock()}
+                submit(job)
+                reorder_buffer.append(job)
+
+            if not reorder_buffer:
+                return
+            winner = finish(reorder_buffer[0])
+            if winner is not None:
+                yield reorder_buffer.popleft()['fragment'], winner.result()
+                continue
+
+            timeout = None
+            if hedge_at is not None and len(running) < max_workers:
+                timeout = max(hedge_at - time.monotonic(), 0)
+            concurrent.futures.wait(running, timeout, concurrent.futures.FIRST_COMPLETED)
+
     def download_and_append_fragments(
             self, ctx, fragments, info_dict, *, is_fatal=(lambda idx: False),
             pack_func=(lambda content, idx: content), finish_func=None,
@@ -469,6 +720,11 @@ def error_callback(err, count, retries):
                     if fatal:
                         raise
 
+            if ctx.get('fragment_buffer') or ctx.get('fragment_filename_sanitized'):
+                decryptor = get_decryptor(fragment)
+                if decryptor:
+                    self._decrypt_downloaded_fragment(ctx, decryptor)
+
         def append_fragment(frag_content, frag_index, ctx):
             if frag_content:
                 self._append_fragment(ctx, pack_func(frag_content, frag_index))
@@ -480,41 +736,56 @@ def append_fragment(frag_content, frag_index, ctx):
                 return False
             return True
 
-        decrypt_fragment = self.decrypter(info_dict)
+        get_decryptor = self._fragment_decryptors(info_dict)
+        is_live = info_dict.get('is_live') or ctx.get('live')
 
         max_workers = math.ceil(
             self.params.get('concurrent_fragment_downloads', 1) / ctx.get('max_progress', 1))
         if max_workers > 1:
-            def _download_fragment(fragment):
+            def _download_fragment(fragment, hedged, abort, claim):
                 ctx_copy = ctx.copy()
+                # Do not pick up the result of another fragment if this one fails
+                ctx_copy.pop('fragment_filename_sanitized', None)
+                ctx_copy.pop('fragment_buffer', None)
+                ctx_copy.update({
+                    'fragment_hedged': hedged,
+                    'fragment_abort': abort,
+                    'fragment_claim': claim,
+                })
                 download_fragment(fragment, ctx_copy)
-                return fragment, fragment['frag_index'], ctx_copy.get('fragment_filename_sanitized')
+                return ctx_copy.get('fragment_filename_sanitized'), ctx_copy.get('fragment_buffer')
 
             with tpe or concurrent.futures.ThreadPoolExecutor(max_workers) as pool:
                 try:
-                    for fragment, frag_index, frag_filename in pool.map(_download_fragment, fragments):
+                    for fragment, (frag_filename, frag_buffer) in self._iter_fragment_downloads(
+                            ctx, pool, _download_fragment, fragments, max_workers):
+                        frag_index = fragment['frag_index']
                         ctx.update({
                             'fragment_filename_sanitized': frag_filename,
+                            'fragment_buffer': frag_buffer,
                             'fragment_index': frag_index,
                         })
-                        if not append_fragment(decrypt_fragment(fragment, self._read_fragment(ctx)), frag_index, ctx):
+                        if not append_fragment(self._read_fragment(ctx), frag_index, ctx):
                             return False
                 except KeyboardInterrupt:
                     self._finish_multiline_status()
-                    self.report_error(
-                        'Interrupted by user. Waiting for all threads to shutdown...', is_error=False, tb=False)
-                    pool.shutdown(wait=False)
-                    raise
+                    if is_live:
+                        # Keep what has been downloaded of the live stream
+                        pool.shutdown(wait=False, cancel_futures=True)
+                    else:
+                        self.report_error(
+                            'Interrupted by user. Waiting for all threads to shutdown...', is_error=False, tb=False)
+                        pool.shutdown(wait=False)
+                        raise
         else:
             for fragment in fragments:
                 if not interrupt_trigger[0]:
                     break
                 try:
                     download_fragment(fragment, ctx)
-                    result = append_fragment(
-                        decrypt_fragment(fragment, self._read_fragment(ctx)), fragment['frag_index'], ctx)
+                    result = append_fragment(self._read_fragment(ctx), fragment['frag_index'], ctx)
                 except KeyboardInterrupt:
-                    if info_dict.get('is_live'):
+                    if is_live:
                         break
                     raise
                 if not result:
@@ -1,6 +1,7 @@
 import binascii
 import io
 import re
+import time
 import urllib.parse
 
 from . import get_suitable_downloader
@@ -8,7 +9,10 @@
 from .fragment import FragmentFD
 from .. import webvtt
 from ..dependencies import Cryptodome
+from ..networking.exceptions import HTTPError, IncompleteRead, TransportError
 from ..utils import (
+    DownloadError,
+    RetryManager,
     bug_reports_message,
     parse_m3u8_attributes,
     remove_start,
@@ -27,6 +31,8 @@ class HlsFD(FragmentFD):
     """
 
     FD_NAME = 'hlsnative'
+    # Used when the live playlist does not have #EXT-X-TARGETDURATION
+    _LIVE_REFRESH_INTERVAL = 10
 
     @staticmethod
     def _has_drm(manifest):  # TODO: https://github.com/yt-dlp/yt-dlp/pull/5039
@@ -64,90 +70,37 @@ def can_download(cls, manifest, info_dict, allow_unplayable_formats=False):
             ]
 
         def check_results():
-            yield not info_dict.get('is_live')
             for feature in UNSUPPORTED_FEATURES:
                 yield not re.search(feature, manifest)
             if not allow_unplayable_formats:
                 yield not cls._has_drm(manifest)
         return all(check_results())
 
-    def real_download(self, filename, info_dict):
-        man_url = info_dict['url']
-
-        s = info_dict.get('hls_media_playlist_data')
-        if s:
-            self.to_screen(f'[{self.FD_NAME}] Using m3u8 manifest from extracted info')
-        else:
-            self.to_screen(f'[{self.FD_NAME}] Downloading m3u8 manifest')
-            urlh = self.ydl.urlopen(self._prepare_url(info_dict, man_url))
-            man_url = urlh.url
-            s_bytes = urlh.read()
-            if self.params.get('write_pages'):
-                dump_filename = _request_dump_filename(
-                    man_url, info_dict['id'], None,
-                    trim_length=self.params.get('trim_file_name'))
-                self.to_screen(f'[{self.FD_NAME}] Saving request to {dump_filename}')
-                with open(dump_filename, 'wb') as outf:
-                    outf.write(s_bytes)
-            s = s_bytes.decode('utf-8', 'ignore')
-
-        can_download, message = self.can_download(s, info_dict, self.params.get('allow_unplayable_formats')), None
-        if can_download:
-            has_ffmpeg = FFmpegFD.available()
-            if not Cryptodome.AES and '#EXT-X-KEY:METHOD=AES-128' in s:
-                # Even if pycryptodomex isn't available, force HlsFD for m3u8s that won't work with ffmpeg
-                ffmpeg_can_dl = not traverse_obj(info_dict, ((
-                    'extra_param_to_segment_url', 'extra_param_to_key_url',
-                    'hls_media_playlist_data', ('hls_aes', ('uri', 'key', 'iv')),
-                ), any))
-                message = 'The stream has AES-128 encryption and {} available'.format(
-                    'neither ffmpeg nor pycryptodomex are' if ffmpeg_can_dl and not has_ffmpeg else
-                    'pycryptodomex is not')
-                if has_ffmpeg and ffmpeg_can_dl:
-                    can_download = False
-                else:
-                    message += '; decryption will be performed natively, but will be extremely slow'
-            elif info_dict.get('extractor_key') == 'Generic' and re.search(r'(?m)#EXT-X-MEDIA-SEQUENCE:(?!0$)', s):
-                install_ffmpeg = '' if has_ffmpeg else 'install ffmpeg and '
-                message = ('Live HLS streams are not supported by the native downloader. If this is a livestream, '
-                           f'please {install_ffmpeg}add "--downloader ffmpeg --hls-use-mpegts" to your command')
-        if not can_download:
-            if self._has_drm(s) and not self.params.get('allow_unplayable_formats'):
-                if info_dict.get('has_drm') and self.params.get('test'):
-                    self.to_screen(f'[{self.FD_NAME}] This format is DRM protected', skip_eol=True)
-                else:
-                    self.report_error(
-                        'This format is DRM protected; Try selecting another format with --format or '
-                        'add --check-formats to automatically fallback to the next best format', tb=False)
-                return False
-            message = message or 'Unsupported features have been detected'
-            fd = FFmpegFD(self.ydl, self.params)
-            self.report_warning(f'{message}; extraction will be delegated to {fd.get_basename()}')
-            return fd.real_download(filename, info_dict)
-        elif message:
-            self.report_warning(message)
+    def _download_manifest(self, info_dict, man_url):
+        urlh = self.ydl.urlopen(self._prepare_url(info_dict, man_url))
+        man_url = urlh.url
+        s_bytes = urlh.read()
+        if self.params.get('write_pages'):
+            dump_filename = _request_dump_filename(
+                man_url, info_dict['id'], None,
+                trim_length=self.params.get('trim_file_name'))
+            self.to_screen(f'[{self.FD_NAME}] Saving request to {dump_filename}')
+            with open(dump_filename, 'wb') as outf:
+                outf.write(s_bytes)
+        return s_bytes.decode('utf-8', 'ignore'), man_url
 
-        is_webvtt = info_dict['ext'] == 'vtt'
-        if is_webvtt:
-            real_downloader = None  # Packing the fragments is not currently supported for external downloader
-        else:
-            real_downloader = get_suitable_downloader(
-                info_dict, self.params, None, protocol='m3u8_frag_urls', to_stdout=(filename == '-'))
-        if real_downloader and not real_downloader.supports_manifest(s):
-            real_downloader = None
-        if real_downloader:
-            self.to_screen(f'[{self.FD_NAME}] Fragment downloads will be delegated to {real_downloader.get_basename()}')
-
-        def is_ad_fragment_start(s):
-            return ((s.startswith('#ANVATO-SEGMENT-INFO') and 'type=ad' in s)
-                    or (s.startswith('#UPLYNK-SEGMENT') and s.endswith(',ad')))
-
-        def is_ad_fragment_end(s):
-            return ((s.startswith('#ANVATO-SEGMENT-INFO') and 'type=master' in s)
-                    or (s.startswith('#UPLYNK-SEGMENT') and s.endswith(',segment')))
+    @staticmethod
+    def _is_ad_fragment_start(s):
+        return ((s.startswith('#ANVATO-SEGMENT-INFO') and 'type=ad' in s)
+                or (s.startswith('#UPLYNK-SEGMENT') and s.endswith(',ad')))
 
-        fragments = []
+    @staticmethod
+    def _is_ad_fragment_end(s):
+        return ((s.startswith('#ANVATO-SEGMENT-INFO') and 'type=master' in s)
+                or (s.startswith('#UPLYNK-SEGMENT') and s.endswith(',segment')))
 
+    def _count_fragments(self, s):
+        """Returns the number of media and ad fragments"""
         media_frags = 0
         ad_frags = 0
         ad_frag_next = False
@@ -156,38 +109,34 @@ def is_ad_fragment_end(s):
             if not line:
                 continue
             if line.startswith('#'):
-                if is_ad_fragment_start(line):
+                if self._is_ad_fragment_start(line):
                     ad_frag_next = True
-                elif is_ad_fragment_end(line):
+                elif self._is_ad_fragment_end(line):
                     ad_frag_next = False
                 continue
             if ad_frag_next:
                 ad_frags += 1
                 continue
             media_frags += 1
+        return media_frags, ad_frags
 
-        ctx = {
-            'filename': filename,
-            'total_frags': media_frags,
-            'ad_frags': ad_frags,
-        }
+    def _parse_fragments(self, s, man_url, info_dict, live=False):
+        """
+        Returns the fragments of the media playlist, or None on error
 
-        if real_downloader:
-            self._prepare_external_frag_download(ctx)
-        else:
-            self._prepare_and_start_frag_download(ctx, info_dict)
-
-        extra_state = ctx.setdefault('extra_state', {})
-
-        format_index = info_dict.get('format_index')
+        For live streams, the media fragments also have the 'sequence' number of the segment
+        """
+        # Discontinuities are counted from the start of the playlist, which moves in live streams
+        format_index = None if live else info_dict.get('format_index')
         extra_segment_query = None
         if extra_param_to_segment_url := info_dict.get('extra_param_to_segment_url'):
             extra_segment_query = urllib.parse.parse_qs(extra_param_to_segment_url)
         extra_key_query = None
         if extra_param_to_key_url := info_dict.get('extra_param_to_key_url'):
             extra_key_query = urllib.parse.parse_qs(extra_param_to_key_url)
-        i = 0
+        fragments = []
         media_sequence = 0
+        sequence = 0
         decrypt_info = {'METHOD': 'NONE'}
         external_aes_key = traverse_obj(info_dict, ('hls_aes', 'key'))
         if external_aes_key:
@@ -205,13 +154,12 @@ def is_ad_fragment_end(s):
             line = line.strip()
             if line:
                 if not line.startswith('#'):
+                    sequence += 1
                     if format_index is not None and discontinuity_count != format_index:
                         continue
                     if ad_frag_next:
                         continue
                     frag_index += 1
-                    if frag_index <= ctx['fragment_index']:
-                        continue
                     frag_url = urljoin(man_url, line)
                     if extra_segment_query:
                         frag_url = update_url_query(frag_url, extra_segment_query)
@@ -222,6 +170,7 @@ def is_ad_fragment_end(s):
                         'decrypt_info': decrypt_info,
                         'byte_range': byte_range,
                         'media_sequence': media_sequence,
+                        **({'sequence': sequence - 1} if live else {}),
                     })
                     media_sequence += 1
 
@@ -233,10 +182,10 @@ def is_ad_fragment_end(s):
                 elif line.startswith('#EXT-X-MAP'):
                     if format_index is not None and discontinuity_count != format_index:
                         continue
-                    if frag_index > 0:
+                    if frag_index > 0 and not live:
                         self.report_error(
                             'Initialization fragment found after media fragments, unable to download')
-                        return False
+                        return None
                     frag_index += 1
                     map_info = parse_m3u8_attributes(line[11:])
                     frag_url = urljoin(man_url, map_info.get('URI'))
@@ -282,7 +231,7 @@ def is_ad_fragment_end(s):
                                 decrypt_info['KEY'] = None
 
                 elif line.startswith('#EXT-X-MEDIA-SEQUENCE'):
-                    media_sequence = int(line[22:])
+                    media_sequence = sequence = int(line[22:])
                 elif line.startswith('#EXT-X-BYTERANGE'):
                     splitted_byte_range = line[17:].split('@')
                     sub_range_start = int(splitted_byte_range[1]) if len(splitted_byte_range) == 2 else byte_range_offset
@@ -290,17 +239,172 @@ def is_ad_fragment_end(s):
                         'start': sub_range_start,
                         'end': sub_range_start + int(splitted_byte_range[0]),
                     }
-                elif is_ad_fragment_start(line):
+                elif self._is_ad_fragment_start(line):
                     ad_frag_next = True
-                elif is_ad_fragment_end(line):
+                elif self._is_ad_fragment_end(line):
                     ad_frag_next = False
                 elif line.startswith('#EXT-X-DISCONTINUITY'):
                     discontinuity_count += 1
-                i += 1
+        return fragments
+
+    def _live_fragments(self, ctx, info_dict, man_url, s, fragments):
+        """
+        Yield the fragments of a live media playlist as they are added to it
+
+        The playlist is refreshed every target duration (or half of it if it has not changed)
+        until it has #EXT-X-ENDLIST. Segments are identified by their media sequence number
+        """
+        frag_index = ctx['fragment_index']
+        last_sequence = init_fragment = None
+        last_refresh = time.monotonic()
+        while True:
+            new_frags = 0
+            for fragment in fragments:
+                sequence = fragment.get('sequence')
+                if sequence is None:
+                    init = (fragment['url'], fragment['byte_range'])
+                    if init_fragment is None:
+                        init_fragment = init
+                    elif init != init_fragment:
+                        self.report_warning('The initialization fragment of the live stream has changed; stopping')
+                        return
+                    else:
+                        continue
+                elif last_sequence is not None and sequence <= last_sequence:
+                    continue
+                else:
+                    if last_sequence is not None and sequence > last_sequence + 1:
+                        self.report_warning(
+                            f'{sequence - last_sequence - 1} fragments were removed from the live playlist '
+                            'before they could be downloaded')
+                    last_sequence = sequence
+                    new_frags += 1
+                frag_index += 1
+                yield {**fragment, 'frag_index': frag_index}
+
+            if '#EXT-X-ENDLIST' in s:
+                self.to_screen(f'[{self.FD_NAME}] The live stream has ended')
+                return
+            # https://datatracker.ietf.org/doc/html/rfc8216#section-6.3.4
+            mobj = re.search(r'#EXT-X-TARGETDURATION:(\d+(?:\.\d+)?)', s)
+            target_duration = float(mobj.group(1)) if mobj else self._LIVE_REFRESH_INTERVAL
+            interval = target_duration if new_frags else target_duration / 2
+            res = None
+            try:
+                time.sleep(max(last_refresh + interval - time.monotonic(), 0))
+                for retry in RetryManager(self.params.get('fragment_retries'), self.report_retry):
+                    try:
+                        res = self._download_manifest(info_dict, man_url)
+                    except (HTTPError, IncompleteRead, TransportError) as err:
+                        retry.error = err
+                        continue
+            except KeyboardInterrupt:
+                self.to_screen(f'[{self.FD_NAME}] Interrupted by user')
+                return
+            except DownloadError:
+                # Only raised by report_retry when the errors are not ignored
+                res = None
+            if not res:
+                self.report_warning('Unable to refresh the live playlist; assuming the live stream has ended')
+                return
+            s, man_url = res
+            last_refresh = time.monotonic()
+            self.write_debug(f'Refreshed the live playlist (last segment: {last_sequence})')
+            fragments = self._parse_fragments(s, man_url, info_dict, live=True)
+            if fragments is None:
+                return
+
+    def real_download(self, filename, info_dict):
+        man_url = info_dict['url']
+
+        s = info_dict.get('hls_media_playlist_data')
+        if s:
+            self.to_screen(f'[{self.FD_NAME}] Using m3u8 manifest from extracted info')
+        else:
+            self.to_screen(f'[{self.FD_NAME}] Downloading m3u8 manifest')
+            s, man_url = self._download_manifest(info_dict, man_url)
+
+        # Generic live streams are not marked as such
+        is_live = bool(info_dict.get('is_live') or (
+            info_dict.get('extractor_key') == 'Generic'
+            and re.search(r'(?m)#EXT-X-MEDIA-SEQUENCE:(?!0$)', s) and '#EXT-X-ENDLIST' not in s))
+
+        can_download, message = self.can_download(s, info_dict, self.params.get('allow_unplayable_formats')), None
+        if can_download:
+            has_ffmpeg = FFmpegFD.available()
+            if not Cryptodome.AES and '#EXT-X-KEY:METHOD=AES-128' in s:
+                # Even if pycryptodomex isn't available, force HlsFD for m3u8s that won't work with ffmpeg
+                ffmpeg_can_dl = not traverse_obj(info_dict, ((
+                    'extra_param_to_segment_url', 'extra_param_to_key_url',
+                    'hls_media_playlist_data', ('hls_aes', ('uri', 'key', 'iv')),
+                ), any))
+                message = 'The stream has AES-128 encryption and {} available'.format(
+                    'neither ffmpeg nor pycryptodomex are' if ffmpeg_can_dl and not has_ffmpeg else
+                    'pycryptodomex is not')
+                if has_ffmpeg and ffmpeg_can_dl:
+                    can_download = False
+                else:
+                    message += '; decryption will be performed natively, but will be slower'
+        if not can_download:
+            if self._has_drm(s) and not self.params.get('allow_unplayable_formats'):
+                if info_dict.get('has_drm') and self.params.get('test'):
+                    self.to_screen(f'[{self.FD_NAME}] This format is DRM protected', skip_eol=True)
+                else:
+                    self.report_error(
+                        'This format is DRM protected; Try selecting another format with --format or '
+                        'add --check-formats to automatically fallback to the next best format', tb=False)
+                return False
+            message = message or 'Unsupported features have been detected'
+            fd = FFmpegFD(self.ydl, self.params)
+            self.report_warning(f'{message}; extraction will be delegated to {fd.get_basename()}')
+            return fd.real_download(filename, info_dict)
+        elif message:
+            self.report_warning(message)
+
+        is_webvtt = info_dict['ext'] == 'vtt'
+        if is_webvtt or is_live:
+            # Packing the fragments and refreshing the playlist are not currently supported for external downloader
+            real_downloader = None
+        else:
+            real_downloader = get_suitable_downloader(
+                info_dict, self.params, None, protocol='m3u8_frag_urls', to_stdout=(filename == '-'))
+        if real_downloader and not real_downloader.supports_manifest(s):
+            real_downloader = None
+        if real_downloader:
+            self.to_screen(f'[{self.FD_NAME}] Fragment downloads will be delegated to {real_downloader.get_basename()}')
+
+        if is_live:
+            ctx = {
+                'filename': filename,
+                'live': True,
+                'total_frags': None,
+            }
+            self._prepare_and_start_frag_download(ctx, info_dict)
+            fragments = self._parse_fragments(s, man_url, info_dict, live=True)
+            if fragments is None:
+                return False
+            fragments = self._live_fragments(ctx, info_dict, man_url, s, fragments)
+        else:
+            fragments = self._parse_fragments(s, man_url, info_dict)
+            if fragments is None:
+                return False
+            media_frags, ad_frags = self._count_fragments(s)
+            ctx = {
+                'filename': filename,
+                'total_frags': media_frags,
+                'ad_frags': ad_frags,
+            }
+            if real_downloader:
+                self._prepare_external_frag_download(ctx)
+            else:
+                self._prepare_and_start_frag_download(ctx, info_dict)
+            fragments = [fragment for fragment in fragments if fragment['frag_index'] > ctx['fragment_index']]
+
+        extra_state = ctx.setdefault('extra_state', {})
 
         # We only download the first fragment during the test
         if self.params.get('test', False):
-            fragments = [fragments[0] if fragments else None]
+            fragments = [next(iter(fragments), None)]
 
         if real_downloader:
             info_dict['fragments'] = fragments
@@ -1,5 +1,9 @@
+import concurrent.futures
+import itertools
+import json
 import os
 import random
+import threading
 import time
 
 from .common import FileDownloader
@@ -11,16 +15,23 @@
 )
 from ..utils import (
     ContentTooShortError,
+    DownloadError,
     RetryManager,
     ThrottledDownload,
     int_or_none,
     parse_http_range,
+    timeconvert,
     try_call,
 )
 from ..utils.networking import HTTPHeaderDict
 
 
 class HttpFD(FileDownloader):
+    # Ranges of segmented downloads are at least this large
+    _MIN_SEGMENT_SIZE = 1024 * 1024
+    # Minimum time between updates of the .ytdl file of segmented downloads, in seconds
+    _SEGMENTED_STATE_INTERVAL = 1
+
     def real_download(self, filename, info_dict):
         url = info_dict['url']
         request_data = info_dict.get('request_data', None)
@@ -36,7 +47,9 @@ class DownloadContext(dict):
 
         ctx = DownloadContext()
         ctx.filename = filename
-        ctx.tmpfilename = self.temp_name(filename)
+        # A file-like object can be given instead of a filename, e.g. for in-memory fragments
+        ctx.to_stream = hasattr(filename, 'write')
+        ctx.tmpfilename = filename if ctx.to_stream else self.temp_name(filename)
         ctx.stream = None
 
         # Disable compression
@@ -56,7 +69,14 @@ class DownloadContext(dict):
         # parse given Range
         req_start, req_end, _ = parse_http_range(headers.get('Range'))
 
-        if self.params.get('continuedl', True):
+        connections = self.params.get('http_connections') or 1
+        if (connections > 1 and not self.params.get('_no_ytdl_file') and not ctx.to_stream and filename != '-' and not is_test and not chunk_size
+                and req_start is None and req_end is None and request_data is None):
+            success = self._download_segmented(filename, info_dict, headers, request_extensions, connections)
+            if success is not None:
+                return success
+
+        if self.params.get('continuedl', True) and not ctx.to_stream:
             # Establish possible resume length
             if os.path.isfile(ctx.tmpfilename):
                 ctx.resume_len = os.path.getsize(ctx.tmpfilename)
@@ -193,7 +213,7 @@ def establish_connection():
 
         def close_stream():
             if ctx.stream is not None:
-                if ctx.tmpfilename != '-':
+                if ctx.tmpfilename != '-' and not ctx.to_stream:
                     ctx.stream.close()
                 ctx.stream = None
 
@@ -228,6 +248,8 @@ def download():
 
             byte_counter = 0 + ctx.resume_len
             block_size = ctx.block_size
+            # The blocks are read into a single buffer, which only grows with the block size
+            buffer = memoryview(bytearray(block_size))
             start = time.time()
 
             # measure time over whole while-loop, so slow_down() and best_block_size() work together properly
@@ -236,7 +258,7 @@ def download():
 
             def retry(e):
                 close_stream()
-                if ctx.tmpfilename == '-':
+                if ctx.tmpfilename == '-' or ctx.to_stream:
                     ctx.resume_len = byte_counter
                 else:
                     try:
@@ -248,18 +270,26 @@ def retry(e):
             while True:
                 try:
                     # Download and write
-                    data_block = ctx.data.read(block_size if not is_test else min(block_size, data_len - byte_counter))
+                    if len(buffer) < block_size:
+                        buffer = memoryview(bytearray(block_size))
+                    read_size = block_size if not is_test else min(block_size, data_len - byte_counter)
+                    block_len = ctx.data.readinto(buffer[:read_size])
                 except TransportError as err:
                     retry(err)
 
-                byte_counter += len(data_block)
+                byte_counter += block_len
 
                 # exit loop when download is finished
-                if len(data_block) == 0:
+                if block_len == 0:
                     break
 
                 # Open destination file just in time
-                if ctx.stream is None:
+                if ctx.stream is None and ctx.to_stream:
+                    ctx.stream = ctx.tmpfilename
+                    if ctx.open_mode == 'wb':
+                        ctx.stream.seek(0)
+                        ctx.stream.truncate()
+                elif ctx.stream is None:
                     try:
                         ctx.stream, ctx.tmpfilename = self.sanitize_open(
                             ctx.tmpfilename, ctx.open_mode)
@@ -271,7 +301,7 @@ def retry(e):
                         return False
 
                 try:
-                    ctx.stream.write(data_block)
+                    ctx.stream.write(buffer[:block_len])
                 except OSError as err:
                     self.to_stderr('\n')
                     self.report_error(f'unable to write data: {err}')
@@ -286,7 +316,7 @@ def retry(e):
 
                 # Adjust block size
                 if not self.params.get('noresizebuffer', False):
-                    block_size = self.best_block_size(after - before, len(data_block))
+                    block_size = self.best_block_size(after - before, block_len)
 
                 before = after
 
@@ -318,8 +348,7 @@ def retry(e):
                     if ctx.throttle_start is None:
                         ctx.throttle_start = now
                     elif now - ctx.throttle_start > 3:
-                        if ctx.stream is not None and ctx.tmpfilename != '-':
-                            ctx.stream.close()
+                        close_stream()
                         raise ThrottledDownload
                 elif speed:
                     ctx.throttle_start = None
@@ -333,7 +362,7 @@ def retry(e):
                 ctx.resume_len = byte_counter
                 raise NextFragment
 
-            if ctx.tmpfilename != '-':
+            if ctx.tmpfilename != '-' and not ctx.to_stream:
                 ctx.stream.close()
 
             if data_len is not None and byte_counter != data_len:
@@ -344,7 +373,10 @@ def retry(e):
 
             # Update file modification time
             if self.params.get('updatetime'):
-                info_dict['filetime'] = self.try_utime(ctx.filename, ctx.data.headers.get('last-modified', None))
+                last_modified = ctx.data.headers.get('last-modified', None)
+                info_dict['filetime'] = (
+                    last_modified and timeconvert(last_modified) if ctx.to_stream
+                    else self.try_utime(ctx.filename, last_modified))
 
             self._hook_progress({
                 'downloaded_bytes': byte_counter,
@@ -374,3 +406,191 @@ def retry(e):
                 close_stream()
                 raise
         return False
+
+    def _download_segmented(self, filename, info_dict, headers, request_extensions, connections):
+        """
+        Download the file over several connections, each of them fetching a byte range
+        into its offset of the file. The progress of the ranges is kept in the .ytdl file
+
+        Returns None if the download cannot be split, e.g. if the server does not support ranges
+        """
+        url = info_dict['url']
+
+        def open_range(start, end):
+            return self.ydl.urlopen(Request(
+                url, None, HTTPHeaderDict(headers, {'Range': f'bytes={start}-{end}'}), extensions=request_extensions))
+
+        try:
+            probe = open_range(0, 0)
+            probe.close()
+        except (HTTPError, TransportError):
+            return None
+        _, _, content_len = parse_http_range(probe.headers.get('Content-Range'))
+        if not content_len or probe.headers.get('Content-encoding'):
+            return None
+        min_data_len, max_data_len = self.params.get('min_filesize'), self.params.get('max_filesize')
+        if ((min_data_len is not None and content_len < min_data_len)
+                or (max_data_len is not None and content_len > max_data_len)):
+            return None  # Reported by the single connection download
+
+        tmpfilename = self.temp_name(filename)
+        ytdl_filename = self.ytdl_filename(filename)
+        resume_len, ranges = 0, None
+        if not self.params.get('continuedl', True) or not os.path.isfile(tmpfilename):
+            self.try_remove(ytdl_filename)
+        elif os.path.isfile(ytdl_filename):
+            ranges = self._load_segmented_state(ytdl_filename, content_len)
+            if ranges is None:
+                self.report_unable_to_resume()
+                self.try_remove(tmpfilename)
+        else:
+            # Left over by a single connection download
+            resume_len = min(os.path.getsize(tmpfilename), content_len)
+
+        if ranges is None:
+            connections = min(connections, -(-(content_len - resume_len) // self._MIN_SEGMENT_SIZE))
+            if connections < 2:
+                return None
+            bounds = [resume_len + (content_len - resume_len) * i // connections for i in range(connections + 1)]
+            ranges = [
+                {'start': start, 'end': end, 'downloaded': 0} for start, end in itertools.pairwise(bounds)]
+            if resume_len:
+                ranges.insert(0, {'start': 0, 'end': resume_len, 'downloaded': resume_len})
+                self.report_resuming_byte(resume_len)
+        else:
+            self.report_resuming_byte(sum(r['downloaded'] for r in ranges))
+
+        remaining = [r for r in ranges if r['start'] + r['downloaded'] < r['end']]
+        self.to_screen(f'[download] Downloading {len(remaining)} ranges over parallel connections')
+        self.report_destination(filename)
+        try:
+            # Preallocate the file, so that the ranges can be written at their offsets
+            with open(tmpfilename, 'ab') as f:
+                f.truncate(content_len)
+            self._write_segmented_state(ytdl_filename, content_len, ranges)
+        except OSError as err:
+            self.report_error(f'unable to open for writing: {err}')
+            return False
+
+        lock = threading.Lock()
+        abort = threading.Event()
+        start_time = time.time()
+        start_len = sum(r['downloaded'] for r in ranges)
+        progress = {'downloaded': start_len, 'state_time': time.monotonic()}
+
+        def save_state():
+            self._write_segmented_state(ytdl_filename, content_len, ranges)
+
+        def report_progress(block_len):
+            with lock:
+                progress['downloaded'] += block_len
+                downloaded = progress['downloaded']
+                now = time.time()
+                speed = self.calc_speed(start_time, now, downloaded - start_len)
+                self._hook_progress({
+                    'status': 'downloading',
+                    'downloaded_bytes': downloaded,
+                    'total_bytes': content_len,
+                    'tmpfilename': tmpfilename,
+                    'filename': filename,
+                    'eta': self.calc_eta(start_time, now, content_len - start_len, downloaded - start_len),
+                    'speed': speed,
+                    'elapsed': now - start_time,
+                    'ctx_id': info_dict.get('ctx_id'),
+                }, info_dict)
+                if time.monotonic() - progress['state_time'] >= self._SEGMENTED_STATE_INTERVAL:
+                    progress['state_time'] = time.monotonic()
+                    save_state()
+            # The rate limit applies to all the connections together
+            self.slow_down(start_time, None, downloaded - start_len, new_bytes=block_len)
+
+        def fetch_range(rng):
+            position = rng['start'] + rng['downloaded']
+            data = open_range(position, rng['end'] - 1)
+            if parse_http_range(data.headers.get('Content-Range'))[0] != position:
+                data.close()
+                raise DownloadError(f'Server did not honor the range starting at byte {position}')
+            buffer = memoryview(bytearray(self.params.get('buffersize', 1024)))
+            # Unbuffered, so that the progress saved in the .ytdl file only counts bytes that were written
+            with data, open(tmpfilename, 'r+b', buffering=0) as stream:
+                stream.seek(position)
+                while position < rng['end'] and not abort.is_set():
+                    block_len = data.readinto(buffer[:rng['end'] - position])
+                    if not block_len:
+                        break
+                    written = 0
+                    while written < block_len:
+                        written += stream.write(buffer[written:block_len])
+                    position += block_len
+                    rng['downloaded'] += block_len
+                    report_progress(block_len)
+            if position < rng['end'] and not abort.is_set():
+                raise ContentTooShortError(rng['downloaded'], rng['end'] - rng['start'])
+
+        def download_range(rng):
+            for retry in RetryManager(self.params.get('retries'), self.report_retry):
+                try:
+                    fetch_range(rng)
+                except HTTPError as err:
+                    if err.status < 500 or err.status >= 600:
+                        raise
+                    retry.error = err
+                except (TransportError, ContentTooShortError) as err:
+                    retry.error = err
+
+        with concurrent.futures.ThreadPoolExecutor(len(remaining)) as pool:
+            futures = [pool.submit(download_range, rng) for rng in remaining]
+            try:
+                for future in concurrent.futures.as_completed(futures):
+                    future.result()
+            except BaseException:
+                abort.set()
+                raise
+            finally:
+                with lock:
+                    save_state()
+
+        if any(r['start'] + r['downloaded'] < r['end'] for r in ranges):
+            return False
+        self.try_remove(ytdl_filename)
+        self.try_rename(tmpfilename, filename)
+        if self.params.get('updatetime'):
+            info_dict['filetime'] = self.try_utime(filename, probe.headers.get('last-modified', None))
+        self._hook_progress({
+            'downloaded_bytes': content_len,
+            'total_bytes': content_len,
+            'filename': filename,
+            'status': 'finished',
+            'elapsed': time.time() - start_time,
+            'ctx_id': info_dict.get('ctx_id'),
+        }, info_dict)
+        return True
+
+    def _load_segmented_state(self, ytdl_filename, content_len):
+        """Returns the ranges of an interrupted segmented download, or None if they do not match the file"""
+        try:
+            stream, _ = self.sanitize_open(ytdl_filename, 'r')
+        except OSError:
+            return None
+        try:
+            state = json.loads(stream.read())['downloader']
+            ranges = [{'start': start, 'end': end, 'downloaded': downloaded}
+                      for start, end, downloaded in state['http_ranges']]
+            if (state['content_length'] != content_len or ranges[-1]['end'] != content_len
+                    or not all(0 <= r['downloaded'] <= r['end'] - r['start'] for r in ranges)):
+                return None
+        except (ValueError, KeyError, TypeError, IndexError):
+            return None
+        finally:
+            stream.close()
+        return ranges
+
+    def _write_segmented_state(self, ytdl_filename, content_len, ranges):
+        stream, _ = self.sanitize_open(ytdl_filename, 'w')
+        try:
+            stream.write(json.dumps({'downloader': {
+                'content_length': content_len,
+                'http_ranges': [[r['start'], r['end'], r['downloaded']] for r in ranges],
+            }}))
+        finally:
+            stream.close()
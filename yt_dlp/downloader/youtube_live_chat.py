@@ -1,34 +1,64 @@
+import concurrent.futures
 import json
+import math
+import threading
 import time
 
 from .fragment import FragmentFD
-from ..networking.exceptions import HTTPError
+from ..networking import Request
+from ..networking.exceptions import HTTPError, TransportError
 from ..utils import (
     RegexNotFoundError,
     RetryManager,
     dict_get,
     int_or_none,
+    join_nonempty,
     try_get,
 )
 from ..utils.networking import HTTPHeaderDict
+from ..utils.progress import ProgressCalculator
 
 
 class YoutubeLiveChatFD(FragmentFD):
     """ Downloads YouTube live chats fragment by fragment """
 
+    # The shortest part of a live chat replay that is downloaded on its own (seconds)
+    _REPLAY_PARTITION_DURATION = 300
+
+    def _replay_partitions(self, info_dict):
+        """
+        Split a live chat replay into parts that are downloaded concurrently
+
+        @returns [(start, end), ...] in milliseconds, or None to download it sequentially
+        """
+        duration = info_dict.get('duration')
+        if (info_dict['protocol'] != 'youtube_live_chat_replay' or not duration
+                or self.params.get('concurrent_fragment_downloads', 1) <= 1 or self.params.get('test')):
+            return None
+        count = math.ceil(duration / self._REPLAY_PARTITION_DURATION)
+        if count <= 1:
+            return None
+        step = math.ceil(duration * 1000 / count)
+        # The chat can continue after the end of the video
+        return [(i * step, (i + 1) * step if i < count - 1 else None) for i in range(count)]
+
     def real_download(self, filename, info_dict):
         video_id = info_dict['video_id']
         self.to_screen(f'[{self.FD_NAME}] Downloading live chat')
         if not self.params.get('skip_download') and info_dict['protocol'] == 'youtube_live_chat':
-            self.report_warning('Live chat download runs until the livestream ends. '
-                                'If you wish to download the video simultaneously, run a separate yt-dlp instance')
+            self.report_warning(join_nonempty(
+                'Live chat download runs until the livestream ends.',
+                (self.params.get('concurrent_streams') or 1) <= 1
+                and 'If you wish to download the video simultaneously, use --concurrent-streams', delim=' '))
 
         test = self.params.get('test', False)
+        partitions = self._replay_partitions(info_dict)
 
         ctx = {
             'filename': filename,
-            'live': True,
-            'total_frags': None,
+            # The parts of a partitioned replay are the fragments, which makes it resumable
+            'live': not partitions,
+            'total_frags': len(partitions) if partitions else None,
         }
 
         from ..extractor.youtube import YoutubeBaseInfoExtractor
@@ -60,11 +90,14 @@ def parse_actions_replay(live_chat_continuation):
             self._append_fragment(ctx, processed_fragment)
             return continuation_id, offset, click_tracking_params
 
-        def try_refresh_replay_beginning(live_chat_continuation):
+        def get_refresh_continuation(live_chat_continuation):
             # choose the second option that contains the unfiltered live chat replay
-            refresh_continuation = try_get(
+            return try_get(
                 live_chat_continuation,
                 lambda x: x['header']['liveChatHeaderRenderer']['viewSelector']['sortFilterSubMenuRenderer']['subMenuItems'][1]['continuation']['reloadContinuationData'], dict)
+
+        def try_refresh_replay_beginning(live_chat_continuation):
+            refresh_continuation = get_refresh_continuation(live_chat_continuation)
             if refresh_continuation:
                 # no data yet but required to call _append_fragment
                 self._append_fragment(ctx, b'')
@@ -106,22 +139,24 @@ def parse_actions_live(live_chat_continuation):
             self._append_fragment(ctx, processed_fragment)
             return continuation_id, live_offset, click_tracking_params
 
+        def parse_live_chat_continuation(raw_fragment):
+            try:
+                data = ie.extract_yt_initial_data(video_id, raw_fragment.decode('utf-8', 'replace'))
+            except RegexNotFoundError:
+                data = None
+            if not data:
+                data = json.loads(raw_fragment)
+            return try_get(
+                data,
+                lambda x: x['continuationContents']['liveChatContinuation'], dict) or {}
+
         def download_and_parse_fragment(url, frag_index, request_data=None, headers=None):
             for retry in RetryManager(self.params.get('fragment_retries'), self.report_retry, frag_index=frag_index):
                 try:
                     success = dl_fragment(url, request_data, headers)
                     if not success:
                         return False, None, None, None
-                    raw_fragment = self._read_fragment(ctx)
-                    try:
-                        data = ie.extract_yt_initial_data(video_id, raw_fragment.decode('utf-8', 'replace'))
-                    except RegexNotFoundError:
-                        data = None
-                    if not data:
-                        data = json.loads(raw_fragment)
-                    live_chat_continuation = try_get(
-                        data,
-                        lambda x: x['continuationContents']['liveChatContinuation'], dict) or {}
+                    live_chat_continuation = parse_live_chat_continuation(self._read_fragment(ctx))
 
                     func = ((info_dict['protocol'] == 'youtube_live_chat' and parse_actions_live)
                             or (frag_index == 1 and try_refresh_replay_beginning)
@@ -132,7 +167,122 @@ def download_and_parse_fragment(url, frag_index, request_data=None, headers=None
                     continue
             return False, None, None, None
 
+        def download_replay_partitions():
+            """ Download the parts of the replay concurrently, each from its own continuation """
+            success = dl_fragment(chat_page_url)
+            if not success:
+                return False
+            live_chat_continuation = parse_live_chat_continuation(self._read_fragment(ctx))
+            ctx['fragment_index'] = resume_index
+            self._append_fragment(ctx, b'')
+            seed = get_refresh_continuation(live_chat_continuation) or {'continuation': continuation_id}
+
+            progress = ProgressCalculator(ctx['complete_frags_downloaded_bytes'])
+            state = {
+                'status': 'downloading',
+                'fragment_index': resume_index,
+                'fragment_count': len(partitions),
+                'filename': ctx['filename'],
+                'tmpfilename': ctx['tmpfilename'],
+            }
+
+            def fetch_replay(frag_index, continuation_id, click_tracking_params, player_offset):
+                request_data = {
+                    'context': innertube_context,
+                    'continuation': continuation_id,
+                    'currentPlayerState': {'playerOffsetMs': str(player_offset)},
+                }
+                if click_tracking_params:
+                    request_data['context'] = {
+                        **innertube_context, 'clickTracking': {'clickTrackingParams': click_tracking_params}}
+                headers = HTTPHeaderDict(
+                    info_dict.get('http_headers'), ie.generate_api_headers(ytcfg=ytcfg, visitor_data=visitor_data),
+                    {'content-type': 'application/json'})
+                for retry in RetryManager(self.params.get('fragment_retries'), self.report_retry, frag_index=frag_index):
+                    try:
+                        raw_fragment = self.ydl.urlopen(Request(
+                            url, json.dumps(request_data, ensure_ascii=False).encode() + b'\n', headers)).read()
+                    except (HTTPError, TransportError) as err:
+                        retry.error = err
+                        continue
+                    progress.update(len(raw_fragment))
+                    progress.thread_reset()
+                    self._hook_progress({
+                        **state,
+                        'downloaded_bytes': progress.downloaded,
+                        'elapsed': progress.elapsed,
+                        'speed': progress.speed.smooth,
+                    }, info_dict)
+                    return parse_live_chat_continuation(raw_fragment)
+                return None
+
+            def download_partition(fragment, hedged, abort, claim):
+                frag_index, start, end = fragment['frag_index'], fragment['start'], fragment['end']
+                frag_filename = frag_buffer = None
+                if ctx.get('fragment_buffers'):
+                    stream = frag_buffer = ctx['fragment_buffers'].acquire()
+                else:
+                    stream, frag_filename = self.sanitize_open('%s-Frag%d%s' % (
+                        ctx['tmpfilename'], frag_index, '.hedge' if hedged else ''), 'wb')
+                continuation_id, click_tracking_params = seed.get('continuation'), seed.get('trackingParams')
+                player_offset = offset = start
+                try:
+                    while continuation_id is not None:
+                        live_chat_continuation = None if abort.is_set() or stop.is_set() else fetch_replay(
+                            frag_index, continuation_id, click_tracking_params, player_offset)
+                        if live_chat_continuation is None:
+                            self._discard_fragment(ctx, frag_filename, frag_buffer)
+                            return None, None
+                        continuation_id = None
+                        has_offset = False
+                        for action in live_chat_continuation.get('actions', []):
+                            if 'replayChatItemAction' in action:
+                                offset = int(action['replayChatItemAction']['videoOffsetTimeMsec'])
+                                has_offset = True
+                            # Drop the actions that belong to the neighbouring parts
+                            if offset >= start and (end is None or offset < end):
+                                stream.write(json.dumps(action, ensure_ascii=False).encode() + b'\n')
+                        if has_offset and (end is None or offset < end):
+                            continuation = try_get(
+                                live_chat_continuation,
+                                lambda x: x['continuations'][0]['liveChatReplayContinuationData'], dict)
+                            if continuation:
+                                continuation_id = continuation.get('continuation')
+                                click_tracking_params = continuation.get('clickTrackingParams')
+                            player_offset = max(offset - 5000, 0)
+                finally:
+                    if frag_filename:
+                        stream.close()
+                return frag_filename, frag_buffer
+
+            fragments = [
+                {'frag_index': frag_index, 'start': start, 'end': end}
+                for frag_index, (start, end) in enumerate(partitions, 1) if frag_index > resume_index]
+            max_workers = self.params.get('concurrent_fragment_downloads', 1)
+            # Stops the downloads of the other parts if one of them fails or on interrupt
+            stop = threading.Event()
+            with concurrent.futures.ThreadPoolExecutor(max_workers) as pool:
+                try:
+                    # Parts take many requests each, so a slow one is not worth requesting twice
+                    for fragment, (frag_filename, frag_buffer) in self._iter_fragment_downloads(
+                            ctx, pool, download_partition, fragments, max_workers, hedge=False):
+                        if not frag_filename and not frag_buffer:
+                            return False
+                        ctx.update({
+                            'fragment_filename_sanitized': frag_filename,
+                            'fragment_buffer': frag_buffer,
+                            'fragment_index': fragment['frag_index'],
+                        })
+                        self._append_fragment(ctx, self._read_fragment(ctx))
+                        state['fragment_index'] = fragment['frag_index']
+                finally:
+                    stop.set()
+            ctx['complete_frags_downloaded_bytes'] = progress.downloaded
+            return self._finish_frag_download(ctx, info_dict)
+
         self._prepare_and_start_frag_download(ctx, info_dict)
+        # The number of parts of a partitioned replay that were appended before resuming
+        resume_index = ctx['fragment_index']
 
         success = dl_fragment(info_dict['url'])
         if not success:
@@ -145,6 +295,8 @@ def download_and_parse_fragment(url, frag_index, request_data=None, headers=None
         continuation_id = try_get(
             data,
             lambda x: x['contents']['twoColumnWatchNextResults']['conversationBar']['liveChatRenderer']['continuations'][0]['reloadContinuationData']['continuation'])
+        if partitions:
+            ctx['fragment_index'] = resume_index
         # no data yet but required to call _append_fragment
         self._append_fragment(ctx, b'')
 
@@ -164,6 +316,9 @@ def download_and_parse_fragment(url, frag_index, request_data=None, headers=None
             url = 'https://www.youtube.com/youtubei/v1/live_chat/get_live_chat?key=' + api_key
             chat_page_url = 'https://www.youtube.com/live_chat?continuation=' + continuation_id
 
+        if partitions:
+            return download_replay_partitions()
+
         frag_index = offset = 0
         click_tracking_params = None
         while continuation_id is not None:
@@ -0,0 +1,315 @@
+"""Indexes used to narrow down the extractors that may be suitable for a URL or webpage
+
+The hosts are derived from each extractor's _VALID_URL, and the literals that embeds
+must contain from its _EMBED_REGEX. This is conservative: an extractor whose hosts
+or literals cannot be determined is always a candidate, and the candidates are
+still checked with `suitable`/`extract_from_webpage` in the original order
+"""
+import functools
+import re
+import sys
+
+if sys.version_info >= (3, 11):
+    sre_constants, sre_parse = re._constants, re._parser
+else:
+    import sre_constants
+    import sre_parse
+
+from ..utils import variadic
+
+# Placeholders for a run of unknown characters that may/may not contain a '/'
+_ANY = '\0'
+_NO_SLASH = '\1'
+_MAX_ALTERNATIVES = 5000
+
+_NOT_SLASH_CATEGORIES = {
+    sre_constants.CATEGORY_DIGIT, sre_constants.CATEGORY_WORD, sre_constants.CATEGORY_SPACE,
+    sre_constants.CATEGORY_UNI_DIGIT, sre_constants.CATEGORY_UNI_WORD, sre_constants.CATEGORY_UNI_SPACE,
+    sre_constants.CATEGORY_LOC_WORD,
+}
+_END_ANCHORS = {sre_constants.AT_END, sre_constants.AT_END_STRING}
+_REPEATS = {
+    sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT,
+    getattr(sre_constants, 'POSSESSIVE_REPEAT', sre_constants.MAX_REPEAT),
+}
+_ZERO_WIDTH = {sre_constants.AT, sre_constants.ASSERT, sre_constants.ASSERT_NOT}
+
+
+class _Unindexable(Exception):
+    pass
+
+
+def _may_match_slash(items):
+    for op, av in items:
+        if op is sre_constants.LITERAL:
+            if av == ord('/'):
+                return True
+        elif op is sre_constants.NOT_LITERAL:
+            if av != ord('/'):
+                return True
+        elif op is sre_constants.IN:
+            negate = av[:1] == [(sre_constants.NEGATE, None)]
+            if _class_has_slash(av[negate:]) != negate:
+                return True
+        elif op is sre_constants.CATEGORY:
+            if av not in _NOT_SLASH_CATEGORIES:
+                return True
+        elif op is sre_constants.SUBPATTERN:
+            if _may_match_slash(av[-1]):
+                return True
+        elif op is sre_constants.BRANCH:
+            if any(map(_may_match_slash, av[1])):
+                return True
+        elif op in _REPEATS:
+            if _may_match_slash(av[2]):
+                return True
+        elif op is getattr(sre_constants, 'ATOMIC_GROUP', None):
+            if _may_match_slash(av):
+                return True
+        elif op not in _ZERO_WIDTH:
+            return True
+    return False
+
+
+def _class_has_slash(items):
+    for op, av in items:
+        if op is sre_constants.LITERAL:
+            if av == ord('/'):
+                return True
+        elif op is sre_constants.RANGE:
+            if av[0] <= ord('/') <= av[1]:
+                return True
+        elif op is sre_constants.CATEGORY:
+            if av not in _NOT_SLASH_CATEGORIES:
+                return True
+        else:
+            return True
+    return False
+
+
+def _has_scheme(state):
+    scheme, sep, _ = state.partition('://')
+    return sep and not any(char in scheme for char in (_ANY, _NO_SLASH, ':', '/'))
+
+
+class _URLExpander:
+    """Expand a parsed regex into the set of possible URL prefixes
+
+    Prefixes that contain the whole host are collected in `hosts`.
+    For the others, the literal part is collected in `prefixes`
+    """
+
+    def __init__(self):
+        self.hosts, self.prefixes = set(), set()
+
+    def _append(self, states, text):
+        result = set()
+        for state in states:
+            state += text
+            if not _has_scheme(state):
+                if _ANY not in state and _NO_SLASH not in state:
+                    result.add(state)
+                    continue
+            else:
+                host, slash, _ = state.partition('://')[2].partition('/')
+                if _ANY not in host:
+                    (self.hosts if slash else result).add(state)
+                    continue
+            self._add_prefix(state)
+        return result
+
+    def _add_prefix(self, state):
+        prefix = re.match(f'[^{_ANY}{_NO_SLASH}]*', state).group(0)
+        if not prefix:
+            raise _Unindexable
+        self.prefixes.add(prefix.lower())
+
+    def expand(self, items, states):
+        for op, av in items:
+            if not states:
+                break
+            if op is sre_constants.LITERAL:
+                states = self._append(states, chr(av))
+            elif op is sre_constants.AT:
+                if av in _END_ANCHORS:
+                    # Nothing can follow; the host ends here
+                    for state in states:
+                        if not _has_scheme(state):
+                            self._add_prefix(state)
+                    states = self._append(set(filter(_has_scheme, states)), '/')
+            elif op in _ZERO_WIDTH:
+                pass
+            elif op is sre_constants.SUBPATTERN:
+                states = self.expand(av[-1], states)
+            elif op is getattr(sre_constants, 'ATOMIC_GROUP', None):
+                states = self.expand(av, states)
+            elif op is sre_constants.BRANCH:
+                states = set().union(*(self.expand(branch, states) for branch in av[1]))
+            elif op is sre_constants.IN and len(av) == 1 and av[0][0] is sre_constants.LITERAL:
+                states = self._append(states, chr(av[0][1]))
+            elif op in _REPEATS and av[1] == 1:
+                states = self.expand(av[2], states) | (states if av[0] == 0 else set())
+            else:
+                states = self._append(states, _ANY if _may_match_slash([(op, av)]) else _NO_SLASH)
+            if len(states) + len(self.hosts) > _MAX_ALTERNATIVES:
+                raise _Unindexable
+        return states
+
+    def finish(self, states):
+        # re.match does not need to match until the end of the URL
+        self._append(states, _ANY)
+        hosts = set()
+        for state in self.hosts:
+            host = state.partition('://')[2].partition('/')[0].lower()
+            if _NO_SLASH in host:
+                # Only the labels after the last unknown part are certain
+                host = host.rpartition(_NO_SLASH)[2]
+                host = host[1:] if host.startswith('.') else host.partition('.')[2]
+            if host:
+                hosts.add(host)
+            else:
+                self._add_prefix(state)
+        return hosts, self.prefixes
+
+
+def hosts_from_regex(regex):
+    """
+    Return the hosts and literal prefixes that URLs matched by the regex can have, or None if unknown
+
+    Every matched URL either has one of the hosts (or a subdomain of it), or starts with one of the prefixes
+    """
+    if not isinstance(regex, str):
+        return None
+    expander = _URLExpander()
+    try:
+        return expander.finish(expander.expand(sre_parse.parse(regex), {''}))
+    except (_Unindexable, RecursionError):
+        return None
+
+
+@functools.cache
+def _hosts_for_class(ie):
+    from .common import InfoExtractor
+
+    # Extractors that override `suitable` may accept URLs that _VALID_URL does not match
+    if getattr(ie.suitable, '__func__', None) is not InfoExtractor.suitable.__func__:
+        return None
+    elif ie._VALID_URL is False:
+        return (), ()
+    hosts, prefixes = set(), set()
+    for regex in variadic(ie._VALID_URL):
+        result = hosts_from_regex(regex)
+        if result is None:
+            return None
+        hosts.update(result[0])
+        prefixes.update(result[1])
+    return tuple(sorted(hosts)), tuple(sorted(prefixes))
+
+
+def extractor_hosts(ie):
+    """Return the result of `hosts_from_regex` for all URLs suitable for the extractor"""
+    if not isinstance(ie, type):
+        ie = type(ie)
+    # Precomputed by devscripts/make_lazy_extractors.py
+    from .extractors import _CLASS_LOOKUP, _HOST_LOOKUP
+
+    lazy_ie = _CLASS_LOOKUP.get(ie.__name__)
+    if ie.__name__ in _HOST_LOOKUP and lazy_ie is not None and ie in (lazy_ie, lazy_ie.__dict__.get('_real_class')):
+        return _HOST_LOOKUP[ie.__name__]
+    return _hosts_for_class(ie)
+
+
+class ExtractorIndex:
+    """Find the candidate extractors for a URL, preserving their order"""
+
+    def __init__(self, ies):
+        self._keys = list(ies)
+        self._always, self._prefixes, self._trie = [], {}, {}
+        for idx, ie in enumerate(ies.values()):
+            result = extractor_hosts(ie)
+            if result is None:
+                self._always.append(idx)
+                continue
+            hosts, prefixes = result
+            for host in hosts:
+                node = self._trie
+                for label in reversed(host.split('.')):
+                    node = node.setdefault(label, {})
+                node.setdefault(None, []).append(idx)
+            for prefix in prefixes:
+                self._prefixes.setdefault(prefix, []).append(idx)
+        self._prefix_lengths = sorted({len(prefix) for prefix in self._prefixes})
+
+    def candidates(self, url):
+        """Yield the keys of the extractors that may be suitable for the URL, in order"""
+        url, found = url.lower(), []
+        for length in self._prefix_lengths:
+            if length > len(url):
+                break
+            found.extend(self._prefixes.get(url[:length], ()))
+        _, sep, rest = url.partition('://')
+        if sep:
+            node = self._trie
+            for label in reversed(rest.partition('/')[0].split('.')):
+                node = node.get(label)
+                if node is None:
+                    break
+                found.extend(node.get(None, ()))
+        found.extend(self._always)
+        yield from map(self._keys.__getitem__, sorted(set(found)))
+
+
+# Shorter literals are too common for the scan to rule out any extractor
+_MIN_EMBED_LITERAL = 4
+# With re.IGNORECASE, these also match non-ASCII characters which do not casefold to them
+_UNSAFE_IGNORECASE = set('iksIKS')
+
+
+def _literal_runs(items, ignorecase):
+    """Yield the runs of ASCII characters that every match of the parsed regex contains"""
+    run = []
+    for op, av in items:
+        if op is sre_constants.IN and len(av) == 1 and av[0][0] is sre_constants.LITERAL:
+            op, av = av[0]
+        if op is sre_constants.LITERAL and av < 128 and not (ignorecase and chr(av) in _UNSAFE_IGNORECASE):
+            run.append(chr(av))
+            continue
+        if run:
+            yield ''.join(run)
+            run = []
+        if op is sre_constants.SUBPATTERN:
+            _, add_flags, del_flags, sub_items = av
+            yield from _literal_runs(
+                sub_items, bool(add_flags & re.IGNORECASE) or (ignorecase and not del_flags & re.IGNORECASE))
+        elif op is getattr(sre_constants, 'ATOMIC_GROUP', None):
+            yield from _literal_runs(av, ignorecase)
+        elif op in _REPEATS and av[0] >= 1:
+            yield from _literal_runs(av[2], ignorecase)
+    if run:
+        yield ''.join(run)
+
+
+def embed_literal(regex):
+    """
+    Return a casefolded literal that the casefolded webpage contains wherever the regex matches,
+    or None if there is no such literal that is long enough
+    """
+    try:
+        parsed = sre_parse.parse(regex)
+    except (re.error, RecursionError):
+        return None
+    literal = max(_literal_runs(parsed, bool(parsed.state.flags & re.IGNORECASE)), key=len, default='')
+    return literal.casefold() if len(literal) >= _MIN_EMBED_LITERAL else None
+
+
+_last_casefolded = (None, None)
+
+
+def casefold_webpage(webpage):
+    """Return webpage.casefold(), reusing it while each extractor looks for embeds in the same webpage"""
+    global _last_casefolded
+    last_webpage, casefolded = _last_casefolded
+    if last_webpage is not webpage:
+        casefolded = webpage.casefold()
+        _last_casefolded = webpage, casefolded
+    return casefolded
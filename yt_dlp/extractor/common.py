@@ -22,6 +22,7 @@
 import urllib.request
 import xml.etree.ElementTree
 
+from ._dispatch import casefold_webpage, embed_literal
 from ..compat import (
     compat_etree_fromstring,
     compat_expanduser,
@@ -3104,6 +3105,17 @@ def location_key(location):
                             if 'total_number' not in representation_ms_info and 'segment_duration' in representation_ms_info:
                                 segment_duration = float_or_none(representation_ms_info['segment_duration'], representation_ms_info['timescale'])
                                 representation_ms_info['total_number'] = math.ceil(float_or_none(period_duration, segment_duration, default=0))
+                                availability_start = unified_timestamp(mpd_doc.get('availabilityStartTime'))
+                                if mpd_doc.get('type') == 'dynamic' and not period_duration and availability_start is not None and segment_duration:
+                                    # Live segments are numbered from the availability start of the stream,
+                                    # and only those within the time shift buffer can still be downloaded
+                                    # (or the last 3, like for HLS, when the buffer depth is not given)
+                                    live_edge = time.time() - availability_start - (parse_duration(period.get('start')) or 0)
+                                    complete_segments = max(int(live_edge // segment_duration), 0)
+                                    buffer_depth = parse_duration(mpd_doc.get('timeShiftBufferDepth'))
+                                    representation_ms_info['total_number'] = min(
+                                        complete_segments, math.ceil(buffer_depth / segment_duration) if buffer_depth else 3)
+                                    representation_ms_info['start_number'] += complete_segments - representation_ms_info['total_number']
                             representation_ms_info['fragments'] = [{
                                 media_location_key: media_template % {
                                     'Number': segment_number,
@@ -4102,8 +4114,12 @@ def _extract_embed_urls(cls, url, webpage):
                 assert regex.count('(?P<url>') == 1, \
                     f'{cls.__name__}._EMBED_REGEX[{idx}] must have exactly 1 url group\n\t{regex}'
             cls._EMBED_URL_RE = tuple(map(re.compile, cls._EMBED_REGEX))
+            # Regexes are only run on webpages that contain their literal
+            cls._EMBED_URL_LITERALS = tuple(map(embed_literal, cls._EMBED_REGEX))
 
-        for regex in cls._EMBED_URL_RE:
+        for regex, literal in zip(cls._EMBED_URL_RE, cls._EMBED_URL_LITERALS, strict=True):
+            if literal is not None and literal not in casefold_webpage(webpage):
+                continue
             for mobj in regex.finditer(webpage):
                 embed_url = urllib.parse.urljoin(url, unescapeHTML(mobj.group('url')))
                 if cls._VALID_URL is False or cls.suitable(embed_url):
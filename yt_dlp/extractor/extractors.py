@@ -1,3 +1,4 @@
+import contextlib
 import itertools
 import os
 
@@ -5,6 +6,7 @@
 from ..globals import extractors as _extractors_context
 
 _CLASS_LOOKUP = None
+_HOST_LOOKUP = {}
 if os.environ.get('YTDLP_NO_LAZY_EXTRACTORS'):
     LAZY_EXTRACTORS.value = False
 else:
@@ -13,6 +15,9 @@
         LAZY_EXTRACTORS.value = True
     except ImportError:
         LAZY_EXTRACTORS.value = None
+    else:
+        with contextlib.suppress(ImportError):  # Generated by an older version
+            from .lazy_extractors import _HOST_LOOKUP  # noqa: F401 - Re-exported for _dispatch
 
 if not _CLASS_LOOKUP:
     from . import _extractors
@@ -17,6 +17,7 @@
     bug_reports_message,
     datetime_from_str,
     filter_dict,
+    float_or_none,
     get_first,
     int_or_none,
     is_html,
@@ -373,6 +374,16 @@ def _fix_embedded_ytcfg(ytcfg):
     })
 
 
+def _shareable_ytcfg(ytcfg):
+    """Copy of the ytcfg without the fields that are specific to the session (visitor, IP, locale)"""
+    ytcfg = copy.deepcopy(ytcfg)
+    ytcfg.pop('VISITOR_DATA', None)
+    client = traverse_obj(ytcfg, ('INNERTUBE_CONTEXT', 'client', {dict})) or {}
+    for key in ('visitorData', 'hl', 'gl', 'remoteHost', 'configInfo'):
+        client.pop(key, None)
+    return ytcfg
+
+
 def build_innertube_clients():
     # From highest to lowest priority
     BASE_CLIENTS = ('tv', 'web', 'mweb', 'android', 'ios')
@@ -431,6 +442,9 @@ class YoutubeBaseInfoExtractor(InfoExtractor):
     # If True it will raise an error if no login info is provided
     _LOGIN_REQUIRED = False
 
+    # Seconds for which the client configs are reused from the cache
+    _YTCFG_CACHE_TTL = 3600
+
     _INVIDIOUS_SITES = (
         # invidious-redirect websites
         r'(?:www\.)?redirect\.invidious\.io',
@@ -964,13 +978,23 @@ def _download_ytcfg(self, client, video_id):
         }.get(client)
         if not url:
             return {}
-        webpage = self._download_webpage_with_retries(
-            url, video_id, note=f'Downloading {client.replace("_", " ").strip()} client config',
-            headers=traverse_obj(self._get_default_ytcfg(client), {
-                'User-Agent': ('INNERTUBE_CONTEXT', 'client', 'userAgent', {str}),
-            }))
 
-        ytcfg = self.extract_ytcfg(video_id, webpage) or {}
+        # The embed page is specific to the video and the configs of logged-in users to their account.
+        # The fields specific to the session are not cached, since the cache may be used from another one
+        use_cache = _split_innertube_client(client)[2] != 'embedded' and not self.is_authenticated
+        cached = use_cache and self.cache.load('youtube-ytcfg', client)
+        if traverse_obj(cached, ('timestamp', {float_or_none}), default=0) > time.time() - self._YTCFG_CACHE_TTL:
+            self.write_debug(f'Using cached {client} client config')
+            ytcfg = cached['ytcfg']
+        else:
+            webpage = self._download_webpage_with_retries(
+                url, video_id, note=f'Downloading {client.replace("_", " ").strip()} client config',
+                headers=traverse_obj(self._get_default_ytcfg(client), {
+                    'User-Agent': ('INNERTUBE_CONTEXT', 'client', 'userAgent', {str}),
+                }))
+            ytcfg = self.extract_ytcfg(video_id, webpage) or {}
+            if use_cache and ytcfg:
+                self.cache.store('youtube-ytcfg', client, {'ytcfg': _shareable_ytcfg(ytcfg), 'timestamp': time.time()})
 
         # See https://github.com/yt-dlp/yt-dlp/issues/14826
         if _split_innertube_client(client)[2] == 'embedded':
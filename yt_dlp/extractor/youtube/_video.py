@@ -1,6 +1,7 @@
 import base64
 import binascii
 import collections
+import concurrent.futures
 import datetime as dt
 import functools
 import itertools
@@ -145,6 +146,8 @@ class YoutubeIE(YoutubeBaseInfoExtractor):
     _DEFAULT_AUTHED_CLIENTS = ('tv_downgraded', 'web', 'web_safari')
     # Premium does not require POT (except for subtitles)
     _DEFAULT_PREMIUM_CLIENTS = ('tv_downgraded', 'web_creator', 'web')
+    # Number of clients whose configs and player responses are requested concurrently
+    _PLAYER_CONCURRENCY = 4
 
     _GEO_BYPASS = False
 
@@ -1903,6 +1906,8 @@ def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self._code_cache = {}
         self._player_cache = {}
+        # Player responses of several clients may need the player at the same time
+        self._player_lock = threading.Lock()
         self._pot_director = None
 
     def _real_initialize(self):
@@ -2182,13 +2187,19 @@ def _extract_player_info(cls, player_url):
 
     def _load_player(self, video_id, player_url, fatal=True):
         player_js_key = self._player_js_cache_key(player_url)
-        if player_js_key not in self._code_cache:
-            code = self._download_webpage(
-                player_url, video_id, fatal=fatal,
-                note=f'Downloading player {player_js_key}',
-                errnote=f'Download of {player_js_key} failed')
-            if code:
-                self._code_cache[player_js_key] = code
+        with self._player_lock:
+            if player_js_key not in self._code_cache:
+                # The player ID changes with the code, so the cached player never needs to be revalidated
+                code = self.cache.load('youtube-player', player_js_key)
+                if not isinstance(code, str):
+                    code = self._download_webpage(
+                        player_url, video_id, fatal=fatal,
+                        note=f'Downloading player {player_js_key}',
+                        errnote=f'Download of {player_js_key} failed')
+                    if code:
+                        self.cache.store('youtube-player', player_js_key, code)
+                if code:
+                    self._code_cache[player_js_key] = code
         return self._code_cache.get(player_js_key)
 
     def _load_player_data_from_cache(self, name, player_url, *cache_keys, use_disk_cache=False):
@@ -3001,7 +3012,6 @@ def _extract_player_responses(self, clients, video_id, webpage, webpage_client,
                 f'{webpage_client} client initial player response', video_id, fatal=False)
 
         prs = []
-        deprioritized_prs = []
 
         if initial_pr and not self._invalid_player_response(initial_pr, video_id):
             # Android player_response does not have microFormats which are needed for
@@ -3012,8 +3022,11 @@ def _extract_player_responses(self, clients, video_id, webpage, webpage_client,
 
         all_clients = set(clients)
         clients = clients[::-1]
+        # Keys that sort the player responses as if the clients were requested one after another,
+        # with the clients appended for a player response right after it
+        client_keys = {}
 
-        def append_client(*client_names):
+        def append_client(*client_names, parent_key):
             """ Append the first client name that exists but not already used """
             for client_name in client_names:
                 actual_client = _split_innertube_client(client_name)[0]
@@ -3021,128 +3034,168 @@ def append_client(*client_names):
                     if actual_client not in all_clients:
                         clients.append(client_name)
                         all_clients.add(actual_client)
+                        client_keys[client_name] = (*parent_key, -len(clients))
                         return
 
+        concurrency = int_or_none(self._configuration_arg('player_concurrency', [None])[0]) or self._PLAYER_CONCURRENCY
+
+        def run_concurrently(func, items):
+            if concurrency <= 1 or len(items) <= 1:
+                return list(map(func, items))
+            with concurrent.futures.ThreadPoolExecutor(min(concurrency, len(items))) as executor:
+                return list(executor.map(func, items))
+
+        def download_ytcfg(client):
+            if 'configs' in self._configuration_arg('player_skip') or client == webpage_client:
+                return None
+            return self._download_ytcfg(client, video_id)
+
         tried_iframe_fallback = False
         player_url = visitor_data = data_sync_id = None
         skipped_clients = {}
+        keyed_prs = []
         while clients:
-            deprioritize_pr = False
-            client, base_client, variant = _split_innertube_client(clients.pop())
-            player_ytcfg = webpage_ytcfg if client == webpage_client else {}
-            if 'configs' not in self._configuration_arg('player_skip') and client != webpage_client:
-                player_ytcfg = self._download_ytcfg(client, video_id) or player_ytcfg
-
-            player_url = player_url or self._extract_player_url(webpage_ytcfg, player_ytcfg, webpage=webpage)
-            require_js_player = self._get_default_ytcfg(client).get('REQUIRE_JS_PLAYER')
-            if 'js' in self._configuration_arg('player_skip'):
-                require_js_player = False
-                player_url = None
-
-            if not player_url and not tried_iframe_fallback and require_js_player:
-                player_url = self._download_player_url(video_id)
-                tried_iframe_fallback = True
-
-            pr = None
-            if client == webpage_client and 'player_response' not in self._configuration_arg('webpage_skip'):
-                pr = initial_pr
-
-            visitor_data = visitor_data or self._extract_visitor_data(webpage_ytcfg, initial_pr, player_ytcfg)
-            data_sync_id = data_sync_id or self._extract_data_sync_id(webpage_ytcfg, initial_pr, player_ytcfg)
-
-            fetch_po_token_args = {
-                'client': client,
-                'visitor_data': visitor_data,
-                'video_id': video_id,
-                'data_sync_id': data_sync_id if self.is_authenticated else None,
-                'player_url': player_url if require_js_player else None,
-                'webpage': webpage,
-                'session_index': self._extract_session_index(webpage_ytcfg, player_ytcfg),
-                'ytcfg': player_ytcfg or self._get_default_ytcfg(client),
-            }
-
-            # Don't need a player PO token for WEB if using player response from webpage
-            player_pot_policy: PlayerPoTokenPolicy = self._get_default_ytcfg(client)['PLAYER_PO_TOKEN_POLICY']
-            player_po_token = None if pr else self.fetch_po_token(
-                context=_PoTokenContext.PLAYER, **fetch_po_token_args,
-                required=player_pot_policy.required or player_pot_policy.recommended)
-
-            fetch_gvs_po_token_func = functools.partial(
-                self.fetch_po_token, context=_PoTokenContext.GVS, **fetch_po_token_args)
-
-            fetch_subs_po_token_func = functools.partial(
-                self.fetch_po_token, context=_PoTokenContext.SUBS, **fetch_po_token_args)
-
-            try:
-                pr = pr or self._extract_player_response(
-                    client, video_id,
-                    webpage_ytcfg=player_ytcfg or webpage_ytcfg,
-                    player_ytcfg=player_ytcfg,
-                    player_url=player_url,
-                    initial_pr=initial_pr,
-                    visitor_data=visitor_data,
-                    data_sync_id=data_sync_id,
-                    po_token=player_po_token)
-            except ExtractorError as e:
-                self.report_warning(e)
-                continue
-
-            if pr_id := self._invalid_player_response(pr, video_id):
-                skipped_clients[client] = pr_id
-            elif pr:
-                # Save client details for introspection later
-                innertube_context = traverse_obj(player_ytcfg or self._get_default_ytcfg(client), 'INNERTUBE_CONTEXT')
-                sd = pr.setdefault('streamingData', {})
-                sd[STREAMING_DATA_CLIENT_NAME] = client
-                sd[STREAMING_DATA_FETCH_GVS_PO_TOKEN] = fetch_gvs_po_token_func
-                sd[STREAMING_DATA_PLAYER_TOKEN_PROVIDED] = bool(player_po_token)
-                sd[STREAMING_DATA_INNERTUBE_CONTEXT] = innertube_context
-                sd[STREAMING_DATA_FETCH_SUBS_PO_TOKEN] = fetch_subs_po_token_func
-                sd[STREAMING_DATA_IS_PREMIUM_SUBSCRIBER] = is_premium_subscriber
-                sd[STREAMING_DATA_AVAILABLE_AT_TIMESTAMP] = self._get_available_at_timestamp(pr, video_id, client)
-                for f in traverse_obj(sd, (('formats', 'adaptiveFormats'), ..., {dict})):
-                    f[STREAMING_DATA_CLIENT_NAME] = client
-                    f[STREAMING_DATA_FETCH_GVS_PO_TOKEN] = fetch_gvs_po_token_func
-                    f[STREAMING_DATA_IS_PREMIUM_SUBSCRIBER] = is_premium_subscriber
-                    f[STREAMING_DATA_PLAYER_TOKEN_PROVIDED] = bool(player_po_token)
-                if deprioritize_pr:
-                    deprioritized_prs.append(pr)
-                else:
-                    prs.append(pr)
-
-            if (
-                # Is this a "made for kids" video that can't be downloaded with android_vr?
-                client == 'android_vr' and self._is_unplayable(pr)
-                and webpage and 'made for kids' in webpage
-                # ...and is a JS runtime is available?
-                and any(p.is_available() for p in self._jsc_director.providers.values())
-            ):
-                append_client('web_embedded')
-
-            # web_embedded can work around age-gate and age-verification for some embeddable videos
-            if self._is_agegated(pr) and variant != 'web_embedded':
-                append_client(f'web_embedded.{base_client}')
-            # Unauthenticated users will only get web_embedded client formats if age-gated
-            if self._is_agegated(pr) and not self.is_authenticated:
-                self.to_screen(
-                    f'{video_id}: This video is age-restricted; some formats may be missing '
-                    f'without authentication. {self._youtube_login_hint}', only_once=True)
-
-            # EU countries require age-verification for accounts to access age-restricted videos
-            # If account is not age-verified, _is_agegated() will be truthy for non-embedded clients
-            embedding_is_disabled = variant == 'web_embedded' and self._is_unplayable(pr)
-            if self.is_authenticated and (self._is_agegated(pr) or embedding_is_disabled):
-                self.to_screen(
-                    f'{video_id}: This video is age-restricted and YouTube is requiring '
-                    'account age-verification; some formats may be missing', only_once=True)
-                # web_creator may work around age-verification for all videos but requires PO token
-                append_client('web_creator')
+            # The independent requests of the pending clients are made concurrently
+            batch = []
+            for client_name in reversed(clients):
+                batch.append((client_name, client_keys.get(client_name) or (len(client_keys),)))
+                client_keys.setdefault(client_name, batch[-1][1])
+            clients.clear()
+            downloaded_ytcfgs = run_concurrently(download_ytcfg, [_split_innertube_client(name)[0] for name, _ in batch])
+
+            requests = []
+            for (client_name, key), downloaded_ytcfg in zip(batch, downloaded_ytcfgs, strict=True):
+                client, base_client, variant = _split_innertube_client(client_name)
+                player_ytcfg = downloaded_ytcfg or (webpage_ytcfg if client == webpage_client else {})
+
+                player_url = player_url or self._extract_player_url(webpage_ytcfg, player_ytcfg, webpage=webpage)
+                require_js_player = self._get_default_ytcfg(client).get('REQUIRE_JS_PLAYER')
+                if 'js' in self._configuration_arg('player_skip'):
+                    require_js_player = False
+                    player_url = None
+
+                if not player_url and not tried_iframe_fallback and require_js_player:
+                    player_url = self._download_player_url(video_id)
+                    tried_iframe_fallback = True
+
+                pr = None
+                if client == webpage_client and 'player_response' not in self._configuration_arg('webpage_skip'):
+                    pr = initial_pr
+
+                visitor_data = visitor_data or self._extract_visitor_data(webpage_ytcfg, initial_pr, player_ytcfg)
+                data_sync_id = data_sync_id or self._extract_data_sync_id(webpage_ytcfg, initial_pr, player_ytcfg)
+
+                fetch_po_token_args = {
+                    'client': client,
+                    'visitor_data': visitor_data,
+                    'video_id': video_id,
+                    'data_sync_id': data_sync_id if self.is_authenticated else None,
+                    'player_url': player_url if require_js_player else None,
+                    'webpage': webpage,
+                    'session_index': self._extract_session_index(webpage_ytcfg, player_ytcfg),
+                    'ytcfg': player_ytcfg or self._get_default_ytcfg(client),
+                }
+                requests.append({
+                    'key': key,
+                    'client': client,
+                    'base_client': base_client,
+                    'variant': variant,
+                    'pr': pr,
+                    'player_ytcfg': player_ytcfg,
+                    'player_url': player_url,
+                    'visitor_data': visitor_data,
+                    'data_sync_id': data_sync_id,
+                    'fetch_po_token_args': fetch_po_token_args,
+                })
 
-            status = traverse_obj(pr, ('playabilityStatus', 'status', {str}))
-            if status not in ('OK', 'LIVE_STREAM_OFFLINE', 'AGE_CHECK_REQUIRED', 'AGE_VERIFICATION_REQUIRED'):
-                self.write_debug(f'{video_id}: {client} player response playability status: {status}')
+            def fetch_player_response(request):
+                client, pr, player_ytcfg = request['client'], request['pr'], request['player_ytcfg']
+                # Don't need a player PO token for WEB if using player response from webpage
+                player_pot_policy: PlayerPoTokenPolicy = self._get_default_ytcfg(client)['PLAYER_PO_TOKEN_POLICY']
+                player_po_token = None if pr else self.fetch_po_token(
+                    context=_PoTokenContext.PLAYER, **request['fetch_po_token_args'],
+                    required=player_pot_policy.required or player_pot_policy.recommended)
+                try:
+                    pr = pr or self._extract_player_response(
+                        client, video_id,
+                        webpage_ytcfg=player_ytcfg or webpage_ytcfg,
+                        player_ytcfg=player_ytcfg,
+                        player_url=request['player_url'],
+                        initial_pr=initial_pr,
+                        visitor_data=request['visitor_data'],
+                        data_sync_id=request['data_sync_id'],
+                        po_token=player_po_token)
+                except ExtractorError as e:
+                    return e, player_po_token
+                return pr, player_po_token
+
+            for request, (pr, player_po_token) in zip(
+                    requests, run_concurrently(fetch_player_response, requests), strict=True):
+                client, base_client, variant = request['client'], request['base_client'], request['variant']
+                if isinstance(pr, ExtractorError):
+                    self.report_warning(pr)
+                    continue
 
-        prs.extend(deprioritized_prs)
+                fetch_gvs_po_token_func = functools.partial(
+                    self.fetch_po_token, context=_PoTokenContext.GVS, **request['fetch_po_token_args'])
+
+                fetch_subs_po_token_func = functools.partial(
+                    self.fetch_po_token, context=_PoTokenContext.SUBS, **request['fetch_po_token_args'])
+
+                if pr_id := self._invalid_player_response(pr, video_id):
+                    skipped_clients[client] = pr_id
+                elif pr:
+                    # Save client details for introspection later
+                    innertube_context = traverse_obj(
+                        request['player_ytcfg'] or self._get_default_ytcfg(client), 'INNERTUBE_CONTEXT')
+                    sd = pr.setdefault('streamingData', {})
+                    sd[STREAMING_DATA_CLIENT_NAME] = client
+                    sd[STREAMING_DATA_FETCH_GVS_PO_TOKEN] = fetch_gvs_po_token_func
+                    sd[STREAMING_DATA_PLAYER_TOKEN_PROVIDED] = bool(player_po_token)
+                    sd[STREAMING_DATA_INNERTUBE_CONTEXT] = innertube_context
+                    sd[STREAMING_DATA_FETCH_SUBS_PO_TOKEN] = fetch_subs_po_token_func
+                    sd[STREAMING_DATA_IS_PREMIUM_SUBSCRIBER] = is_premium_subscriber
+                    sd[STREAMING_DATA_AVAILABLE_AT_TIMESTAMP] = self._get_available_at_timestamp(pr, video_id, client)
+                    for f in traverse_obj(sd, (('formats', 'adaptiveFormats'), ..., {dict})):
+                        f[STREAMING_DATA_CLIENT_NAME] = client
+                        f[STREAMING_DATA_FETCH_GVS_PO_TOKEN] = fetch_gvs_po_token_func
+                        f[STREAMING_DATA_IS_PREMIUM_SUBSCRIBER] = is_premium_subscriber
+                        f[STREAMING_DATA_PLAYER_TOKEN_PROVIDED] = bool(player_po_token)
+                    keyed_prs.append((request['key'], pr))
+
+                if (
+                    # Is this a "made for kids" video that can't be downloaded with android_vr?
+                    client == 'android_vr' and self._is_unplayable(pr)
+                    and webpage and 'made for kids' in webpage
+                    # ...and is a JS runtime is available?
+                    and any(p.is_available() for p in self._jsc_director.providers.values())
+                ):
+                    append_client('web_embedded', parent_key=request['key'])
+
+                # web_embedded can work around age-gate and age-verification for some embeddable videos
+                if self._is_agegated(pr) and variant != 'web_embedded':
+                    append_client(f'web_embedded.{base_client}', parent_key=request['key'])
+                # Unauthenticated users will only get web_embedded client formats if age-gated
+                if self._is_agegated(pr) and not self.is_authenticated:
+                    self.to_screen(
+                        f'{video_id}: This video is age-restricted; some formats may be missing '
+                        f'without authentication. {self._youtube_login_hint}', only_once=True)
+
+                # EU countries require age-verification for accounts to access age-restricted videos
+                # If account is not age-verified, _is_agegated() will be truthy for non-embedded clients
+                embedding_is_disabled = variant == 'web_embedded' and self._is_unplayable(pr)
+                if self.is_authenticated and (self._is_agegated(pr) or embedding_is_disabled):
+                    self.to_screen(
+                        f'{video_id}: This video is age-restricted and YouTube is requiring '
+                        'account age-verification; some formats may be missing', only_once=True)
+                    # web_creator may work around age-verification for all videos but requires PO token
+                    append_client('web_creator', parent_key=request['key'])
+
+                status = traverse_obj(pr, ('playabilityStatus', 'status', {str}))
+                if status not in ('OK', 'LIVE_STREAM_OFFLINE', 'AGE_CHECK_REQUIRED', 'AGE_VERIFICATION_REQUIRED'):
+                    self.write_debug(f'{video_id}: {client} player response playability status: {status}')
+
+        prs.extend(pr for _, pr in sorted(keyed_prs, key=lambda x: x[0]))
 
         if skipped_clients:
             self.report_warning(
@@ -4352,6 +4405,8 @@ def set_audio_lang_from_orig_subs_lang(lang_code):
                 'ext': 'json',
                 'protocol': ('youtube_live_chat' if live_status in ('is_live', 'is_upcoming')
                              else 'youtube_live_chat_replay'),
+                # Lets the replay be downloaded in parts
+                'duration': duration,
             }]
 
         if initial_data:
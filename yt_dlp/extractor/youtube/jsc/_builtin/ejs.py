@@ -6,9 +6,12 @@
 import functools
 import hashlib
 import json
+import threading
+import time
 
 from yt_dlp.dependencies import yt_dlp_ejs as _has_ejs
 from yt_dlp.extractor.youtube.jsc._builtin import vendor
+from yt_dlp.extractor.youtube.jsc._builtin.worker import JsRuntimeWorker, JsRuntimeWorkerError, worker_script
 from yt_dlp.extractor.youtube.jsc.provider import (
     JsChallengeProvider,
     JsChallengeProviderError,
@@ -106,10 +109,19 @@ class EJSBaseJCP(JsChallengeProvider):
     # currently disabled as files are large and we do not support rotation
     _ENABLE_PREPROCESSED_PLAYER_CACHE = False
 
+    # Whether the provider implements _worker_command
+    _SUPPORTS_WORKER = False
+    # Number of players for which a worker process is kept running
+    _MAX_WORKERS = 2
+    # Workers that have not been used for this many seconds are checked before being reused
+    _WORKER_HEALTH_CHECK_INTERVAL = 60
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self._available = True
         self.ejs_settings = self.ie.get_param('extractor_args', {}).get('youtube-ejs', {})
+        self._workers: collections.OrderedDict[str, JsRuntimeWorker] = collections.OrderedDict()
+        self._workers_lock = threading.RLock()
 
         # Note: The following 3 args are for developer use only & intentionally not documented.
         # - dev: bypasses verification of script hashes and versions.
@@ -145,35 +157,33 @@ def _run_js_runtime(self, stdin: str, /) -> str:
         """To be implemented by subclasses"""
         raise NotImplementedError
 
+    def _worker_command(self, script_path: str, /) -> list[str]:
+        """Command that runs the script at script_path. To be implemented by subclasses that support workers"""
+        raise NotImplementedError
+
+    def _get_env_options(self) -> dict[str, str] | None:
+        return None
+
+    def _clean_stderr(self, stderr: str) -> str:
+        return stderr
+
+    @functools.cached_property
+    def _use_worker(self, /) -> bool:
+        return self._SUPPORTS_WORKER and self.ejs_setting('worker', ['true'])[0] != 'false'
+
     def _real_bulk_solve(self, /, requests: list[JsChallengeRequest]):
         grouped: dict[str, list[JsChallengeRequest]] = collections.defaultdict(list)
         for request in requests:
             grouped[request.input.player_url].append(request)
 
         for player_url, grouped_requests in grouped.items():
-            player = None
-            if self._ENABLE_PREPROCESSED_PLAYER_CACHE:
-                player = self.ie.cache.load(self._CACHE_SECTION, f'player:{player_url}')
-
-            if player:
-                cached = True
+            if self._use_worker:
+                output = self._solve_with_worker(player_url, grouped_requests)
             else:
-                cached = False
-                video_id = next((request.video_id for request in grouped_requests), None)
-                player = self._get_player(video_id, player_url)
-
-            # NB: This output belongs after the player request
-            self.logger.info(f'Solving JS challenges using {self.JS_RUNTIME_NAME}')
-
-            stdin = self._construct_stdin(player, cached, grouped_requests)
-            stdout = self._run_js_runtime(stdin)
-            output = json.loads(stdout)
+                output = self._solve_with_process(player_url, grouped_requests)
             if output['type'] == 'error':
                 raise JsChallengeProviderError(output['error'])
 
-            if self._ENABLE_PREPROCESSED_PLAYER_CACHE and (preprocessed := output.get('preprocessed_player')):
-                self.ie.cache.store(self._CACHE_SECTION, f'player:{player_url}', preprocessed)
-
             for request, response_data in zip(grouped_requests, output['responses'], strict=True):
                 if response_data['type'] == 'error':
                     yield JsChallengeProviderResponse(request, None, response_data['error'])
@@ -182,11 +192,40 @@ def _real_bulk_solve(self, /, requests: list[JsChallengeRequest]):
                         NChallengeOutput(response_data['data']) if request.type is JsChallengeType.N
                         else SigChallengeOutput(response_data['data']))))
 
-    def _construct_stdin(self, player: str, preprocessed: bool, requests: list[JsChallengeRequest], /) -> str:
-        json_requests = [{
+    def _load_player(self, player_url: str, requests: list[JsChallengeRequest], /) -> tuple[str, bool]:
+        """Returns the player and whether it is the cached preprocessed player"""
+        if self._ENABLE_PREPROCESSED_PLAYER_CACHE:
+            player = self.ie.cache.load(self._CACHE_SECTION, f'player:{player_url}')
+            if player:
+                return player, True
+        video_id = next((request.video_id for request in requests), None)
+        return self._get_player(video_id, player_url), False
+
+    def _store_preprocessed_player(self, player_url: str, output: dict, /):
+        if self._ENABLE_PREPROCESSED_PLAYER_CACHE and (preprocessed := output.get('preprocessed_player')):
+            self.ie.cache.store(self._CACHE_SECTION, f'player:{player_url}', preprocessed)
+
+    def _solve_with_process(self, player_url: str, requests: list[JsChallengeRequest], /) -> dict:
+        player, cached = self._load_player(player_url, requests)
+
+        # NB: This output belongs after the player request
+        self.logger.info(f'Solving JS challenges using {self.JS_RUNTIME_NAME}')
+
+        stdin = self._construct_stdin(player, cached, requests)
+        stdout = self._run_js_runtime(stdin)
+        output = json.loads(stdout)
+        if output['type'] != 'error':
+            self._store_preprocessed_player(player_url, output)
+        return output
+
+    def _json_requests(self, requests: list[JsChallengeRequest], /) -> list[dict]:
+        return [{
             'type': request.type.value,
             'challenges': request.input.challenges,
         } for request in requests]
+
+    def _construct_stdin(self, player: str, preprocessed: bool, requests: list[JsChallengeRequest], /) -> str:
+        json_requests = self._json_requests(requests)
         data = {
             'type': 'preprocessed',
             'preprocessed_player': player,
@@ -204,6 +243,78 @@ def _construct_stdin(self, player: str, preprocessed: bool, requests: list[JsCha
         console.log(JSON.stringify(jsc({json.dumps(data)})));
         '''
 
+    # region: worker
+
+    def _solve_with_worker(self, player_url: str, requests: list[JsChallengeRequest], /) -> dict:
+        message = {'type': 'solve', 'requests': self._json_requests(requests)}
+        for retry in (False, True):
+            worker = self._get_worker(player_url, requests)
+            self.logger.info(f'Solving JS challenges using {self.JS_RUNTIME_NAME}')
+            try:
+                return worker.request(message)
+            except JsRuntimeWorkerError as e:
+                self._close_worker(player_url, worker)
+                if retry:
+                    raise JsChallengeProviderError(str(e)) from e
+                self.logger.warning(f'{e}. Restarting {self.JS_RUNTIME_NAME} process')
+
+    def _get_worker(self, player_url: str, requests: list[JsChallengeRequest], /) -> JsRuntimeWorker:
+        with self._workers_lock:
+            worker = self._workers.get(player_url)
+            if worker:
+                try:
+                    if not worker.alive or time.monotonic() - worker.last_used > self._WORKER_HEALTH_CHECK_INTERVAL:
+                        worker.check_health()
+                except JsRuntimeWorkerError as e:
+                    self.logger.warning(f'{e}. Restarting {self.JS_RUNTIME_NAME} process')
+                    self._close_worker(player_url, worker)
+                else:
+                    self._workers.move_to_end(player_url)
+                    return worker
+
+            player, cached = self._load_player(player_url, requests)
+            self.logger.debug(f'Starting {self.JS_RUNTIME_NAME} process for player {player_url}')
+            worker = None
+            try:
+                worker = JsRuntimeWorker(
+                    self.JS_RUNTIME_NAME, self._worker_command,
+                    worker_script(self._lib_script.code, self._core_script.code),
+                    env=self._get_env_options(), clean_stderr=self._clean_stderr)
+                output = worker.request({
+                    'type': 'load',
+                    'preprocessed_player' if cached else 'player': player,
+                    'output_preprocessed': self._ENABLE_PREPROCESSED_PLAYER_CACHE and not cached,
+                })
+            except JsRuntimeWorkerError as e:
+                if worker:
+                    worker.close()
+                raise JsChallengeProviderError(str(e)) from e
+            if output['type'] == 'error':
+                worker.close()
+                raise JsChallengeProviderError(output['error'])
+            self._store_preprocessed_player(player_url, output)
+
+            self._workers[player_url] = worker
+            while len(self._workers) > self._MAX_WORKERS:
+                self._workers.popitem(last=False)[1].close()
+            return worker
+
+    def _close_worker(self, player_url: str, worker: JsRuntimeWorker, /):
+        with self._workers_lock:
+            if self._workers.get(player_url) is worker:
+                del self._workers[player_url]
+        worker.close()
+
+    def close(self):
+        with self._workers_lock:
+            workers = list(self._workers.values())
+            self._workers.clear()
+        for worker in workers:
+            worker.close()
+        super().close()
+
+    # endregion: worker
+
     # region: challenge solver script
 
     @functools.cached_property
@@ -22,8 +22,9 @@ class NodeJCP(EJSBaseJCP, BuiltinIEContentProvider):
     JS_RUNTIME_NAME = 'node'
 
     _ARGS = ['-']
+    _SUPPORTS_WORKER = True
 
-    def _run_js_runtime(self, stdin: str, /) -> str:
+    def _runtime_args(self):
         args = []
 
         if self.ejs_setting('jitless', ['false']) != ['false']:
@@ -35,8 +36,14 @@ def _run_js_runtime(self, stdin: str, /) -> str:
             args.append('--no-warnings=ExperimentalWarning')
         else:
             args.append('--permission')
+        return args
+
+    def _worker_command(self, script_path: str, /) -> list[str]:
+        # The permission model also applies to the script file
+        return [self.runtime_info.path, *self._runtime_args(), f'--allow-fs-read={script_path}', script_path]
 
-        cmd = [self.runtime_info.path, *args, *self._ARGS]
+    def _run_js_runtime(self, stdin: str, /) -> str:
+        cmd = [self.runtime_info.path, *self._runtime_args(), *self._ARGS]
         self.logger.debug(f'Running node: {shlex.join(cmd)}')
         with Popen(
             cmd,
@@ -0,0 +1,227 @@
+from __future__ import annotations
+
+import collections
+import contextlib
+import json
+import os
+import queue
+import subprocess
+import tempfile
+import threading
+import time
+
+from yt_dlp.utils import Popen
+
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+# Runs after the lib and core scripts. One JSON message is read per line of stdin,
+# and one JSON response is written per line of stdout.
+# The preprocessed player is evaluated once when it is loaded and its solvers are kept between
+# messages, whereas every call of jsc() evaluates the preprocessed player that it is given
+_WORKER_LOOP = r'''
+(() => {
+  let solvers = null;
+  const formatError = (error) => (error instanceof Error ? `${error.message}\n${error.stack}` : `${error}`);
+  // Same as getFromPrepared() of the core script
+  const prepare = (preprocessedPlayer) => {
+    const result = { n: null, sig: null };
+    Function('_result', preprocessedPlayer)(result);
+    return result;
+  };
+  // Same as the handling of the requests by the core script
+  const solve = (request) => {
+    if (request.type !== 'n' && request.type !== 'sig') {
+      return { type: 'error', error: `Unknown request type: ${request.type}` };
+    }
+    const solver = solvers[request.type];
+    if (!solver) {
+      return { type: 'error', error: `Failed to extract ${request.type} function` };
+    }
+    try {
+      return {
+        type: 'result',
+        data: Object.fromEntries(request.challenges.map((challenge) => [challenge, solver(challenge)])),
+      };
+    } catch (error) {
+      return { type: 'error', error: formatError(error) };
+    }
+  };
+  const handle = (message) => {
+    switch (message.type) {
+      case 'ping':
+        return { type: 'pong' };
+      case 'load': {
+        let output = { type: 'result', responses: [] };
+        let preprocessedPlayer = message.preprocessed_player;
+        if (message.player) {
+          output = jsc({ type: 'player', player: message.player, requests: [], output_preprocessed: true });
+          if (output.type === 'error') {
+            return output;
+          }
+          preprocessedPlayer = output.preprocessed_player;
+          if (!message.output_preprocessed) {
+            delete output.preprocessed_player;
+          }
+        }
+        solvers = prepare(preprocessedPlayer);
+        return output;
+      }
+      case 'solve':
+        if (solvers === null) {
+          return { type: 'error', error: 'No player has been loaded' };
+        }
+        return { type: 'result', responses: message.requests.map(solve) };
+      default:
+        return { type: 'error', error: `Unknown message type: ${message.type}` };
+    }
+  };
+  const respond = (line) => {
+    let output;
+    try {
+      output = handle(JSON.parse(line));
+    } catch (error) {
+      output = { type: 'error', error: formatError(error) };
+    }
+    console.log(JSON.stringify(output));
+  };
+  const chunks = typeof Deno !== 'undefined'
+    ? Deno.stdin.readable.pipeThrough(new TextDecoderStream())
+    : process.stdin.setEncoding('utf8');
+  (async () => {
+    let parts = [];
+    for await (const chunk of chunks) {
+      let start = 0;
+      let end;
+      while ((end = chunk.indexOf('\n', start)) !== -1) {
+        parts.push(chunk.slice(start, end));
+        respond(parts.join(''));
+        parts = [];
+        start = end + 1;
+      }
+      parts.push(chunk.slice(start));
+    }
+  })();
+})();
+'''
+
+
+class JsRuntimeWorkerError(Exception):
+    pass
+
+
+def worker_script(lib_code: str, core_code: str, /) -> str:
+    return f'''\
+{lib_code}
+Object.assign(globalThis, lib);
+{core_code}
+{_WORKER_LOOP}'''
+
+
+class JsRuntimeWorker:
+    """
+    A long-lived JS runtime process that keeps the challenge solver and a player loaded
+
+    Messages are exchanged as one JSON object per line on stdin/stdout.
+    The process exits when its stdin is closed
+    """
+    HEALTH_CHECK_TIMEOUT = 10
+
+    def __init__(
+        self, name: str, make_cmd: Callable[[str], list[str]], code: str, /, *,
+        env: dict[str, str] | None = None, clean_stderr: Callable[[str], str] | None = None,
+    ):
+        self.name = name
+        self._clean_stderr = clean_stderr or (lambda stderr: stderr)
+        self._lock = threading.Lock()
+        self._stdout = queue.Queue()
+        self._stderr = collections.deque(maxlen=50)
+        self.last_used = time.monotonic()
+
+        fd, script_path = tempfile.mkstemp(prefix='yt-dlp-jsc-', suffix='.js')
+        try:
+            with open(fd, 'w', encoding='utf-8') as f:
+                f.write(code)
+            try:
+                self._proc = Popen(
+                    make_cmd(script_path),
+                    text=True,
+                    stdin=subprocess.PIPE,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.PIPE,
+                    env=env,
+                )
+            except OSError as e:
+                raise JsRuntimeWorkerError(f'Error starting {self.name} process: {e}') from e
+            for pipe, callback in ((self._proc.stdout, self._stdout.put), (self._proc.stderr, self._stderr.append)):
+                threading.Thread(target=self._read_lines, args=(pipe, callback), daemon=True).start()
+            # The script has been read once the process responds
+            self.check_health()
+        except BaseException:
+            self.close()
+            raise
+        finally:
+            with contextlib.suppress(OSError):
+                os.remove(script_path)
+
+    @staticmethod
+    def _read_lines(pipe, callback):
+        with contextlib.suppress(OSError, ValueError):
+            for line in pipe:
+                callback(line.rstrip('\n'))
+        callback(None)
+
+    @property
+    def alive(self) -> bool:
+        return self._proc.poll() is None
+
+    def _error(self, message):
+        with contextlib.suppress(subprocess.TimeoutExpired):
+            self._proc.wait(timeout=1)
+        if self._proc.returncode is not None:
+            message = f'{message} (returncode: {self._proc.returncode})'
+        if stderr := self._clean_stderr('\n'.join(filter(None, self._stderr))).strip():
+            message = f'{message}: {stderr}'
+        return JsRuntimeWorkerError(message)
+
+    def request(self, message: dict, /, timeout: float | None = None) -> dict:
+        """Send a message and wait for its response"""
+        with self._lock:
+            self.last_used = time.monotonic()
+            try:
+                self._proc.stdin.write(json.dumps(message) + '\n')
+                self._proc.stdin.flush()
+            except (OSError, ValueError) as e:
+                raise self._error(f'Error writing to {self.name} process: {e}')
+            try:
+                line = self._stdout.get(timeout=timeout)
+            except queue.Empty:
+                self._proc.kill()
+                raise JsRuntimeWorkerError(f'{self.name} process did not respond within {timeout} seconds')
+            if line is None:
+                raise self._error(f'{self.name} process exited unexpectedly')
+            try:
+                return json.loads(line)
+            except ValueError:
+                self._proc.kill()
+                raise JsRuntimeWorkerError(f'Unexpected output from {self.name} process: {line[:200]!r}')
+
+    def check_health(self):
+        if not self.alive:
+            raise self._error(f'{self.name} process has exited')
+        response = self.request({'type': 'ping'}, timeout=self.HEALTH_CHECK_TIMEOUT)
+        if response.get('type') != 'pong':
+            raise JsRuntimeWorkerError(f'Unexpected response from {self.name} process: {response!r}')
+
+    def close(self):
+        proc = getattr(self, '_proc', None)
+        if not proc:
+            return
+        with contextlib.suppress(OSError, ValueError):
+            proc.stdin.close()
+        try:
+            proc.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            proc.wait()
@@ -1,5 +1,6 @@
 import collections
 import contextlib
+import functools
 import itertools
 import json
 import math
@@ -198,6 +199,36 @@ def js_number_to_string(val: float, radix: int = 10):
 _QUOTES = '\'"/'
 _NESTED_BRACKETS = r'[^[\]]+(?:\[[^[\]]+(?:\[[^\]]+\])?\])?'
 
+# The patterns used by JSInterpreter.interpret_statement for every statement
+_STATEMENT_RE = re.compile(r'(?P<var>(?:var|const|let)\s)|return(?:\s+|(?=["\'])|$)|(?P<throw>throw\s+)')
+_CONTROL_FLOW_RE = re.compile(r'''(?x)
+    (?P<try>try)\s*\{|
+    (?P<if>if)\s*\(|
+    (?P<switch>switch)\s*\(|
+    (?P<for>for)\s*\(
+    ''')
+_ASSIGNMENT_RE = re.compile(fr'''(?x)
+    (?P<out>{_NAME_RE})(?:\[(?P<index>{_NESTED_BRACKETS})\])?\s*
+    (?P<op>{"|".join(map(re.escape, set(_OPERATORS) - _COMP_OPERATORS))})?
+    =(?!=)(?P<expr>.*)$
+    ''')
+_INCREMENT_RE = re.compile(rf'''(?x)
+    (?P<pre_sign>\+\+|--)(?P<var1>{_NAME_RE})|
+    (?P<var2>{_NAME_RE})(?P<post_sign>\+\+|--)''')
+_EXPRESSION_RE = re.compile(fr'''(?x)
+    (?P<return>
+        (?!if|return|true|false|null|undefined|NaN)(?P<name>{_NAME_RE})$
+    )|(?P<attribute>
+        (?P<var>{_NAME_RE})(?:
+            (?P<nullish>\?)?\.(?P<member>[^(]+)|
+            \[(?P<member2>{_NESTED_BRACKETS})\]
+        )\s*
+    )|(?P<indexing>
+        (?P<in>{_NAME_RE})\[(?P<idx>.+)\]$
+    )|(?P<function>
+        (?P<fname>{_NAME_RE})\((?P<args>.*)\)$
+    )''')
+
 
 class JS_Undefined:
     pass
@@ -315,7 +346,12 @@ def _regex_flags(cls, expr):
         return flags, expr[idx + 1:]
 
     @staticmethod
+    @functools.lru_cache(maxsize=4096)
     def _separate(expr, delim=',', max_split=None):
+        return tuple(JSInterpreter._iter_separate(expr, delim, max_split))
+
+    @staticmethod
+    def _iter_separate(expr, delim, max_split):
         OP_CHARS = '+-*/%&|^=<>!,;{}:['
         if not expr:
             return
@@ -357,11 +393,30 @@ def _separate(expr, delim=',', max_split=None):
     def _separate_at_paren(cls, expr, delim=None):
         if delim is None:
             delim = expr and _MATCHING_PARENS[expr[0]]
-        separated = list(cls._separate(expr, delim, 1))
+        separated = cls._separate(expr, delim, 1)
         if len(separated) < 2:
             raise cls.Exception(f'No terminating paren {delim}', expr)
         return separated[0][1:].strip(), separated[1].strip()
 
+    @classmethod
+    @functools.lru_cache(maxsize=1024)
+    def _separate_at_operator(cls, expr):
+        """ @returns op, left_expr, right_expr of the operator with the lowest precedence, or None """
+        for op in _OPERATORS:
+            separated = list(cls._separate(expr, op))
+            right_expr = separated.pop()
+            while True:
+                if op in '?<>*-' and len(separated) > 1 and not separated[-1].strip():
+                    separated.pop()
+                elif not (separated and op == '?' and right_expr.startswith('.')):
+                    break
+                right_expr = f'{op}{right_expr}'
+                if op != '-':
+                    right_expr = f'{separated.pop()}{op}{right_expr}'
+            if separated:
+                return op, op.join(separated), right_expr
+        return None
+
     def _operator(self, op, left_val, right_expr, expr, local_vars, allow_recursion):
         if op in ('||', '&&'):
             if (op == '&&') ^ _js_ternary(left_val):
@@ -385,6 +440,15 @@ def _operator(self, op, left_val, right_expr, expr, local_vars, allow_recursion)
         except Exception as e:
             raise self.Exception(f'Failed to evaluate {left_val!r} {op} {right_val!r}', expr, cause=e)
 
+    @staticmethod
+    @functools.lru_cache(maxsize=1024)
+    def _js_to_json(expr):
+        """ @returns the JSON of the literal expr, or None if it is not a literal """
+        try:
+            return js_to_json(expr, strict=True)
+        except ValueError:
+            return None
+
     def _index(self, obj, idx, allow_undefined=False):
         if idx == 'length':
             return len(obj)
@@ -416,7 +480,7 @@ def interpret_statement(self, stmt, local_vars, allow_recursion=100, _is_var_dec
             if should_return:
                 return ret, should_return
 
-        m = re.match(r'(?P<var>(?:var|const|let)\s)|return(?:\s+|(?=["\'])|$)|(?P<throw>throw\s+)', stmt)
+        m = _STATEMENT_RE.match(stmt)
         if m:
             expr = stmt[len(m.group(0)):].strip()
             if m.group('throw'):
@@ -490,12 +554,7 @@ def dict_item(key, val):
                 for item in self._separate(inner)])
             expr = name + outer
 
-        m = re.match(r'''(?x)
-                (?P<try>try)\s*\{|
-                (?P<if>if)\s*\(|
-                (?P<switch>switch)\s*\(|
-                (?P<for>for)\s*\(
-                ''', expr)
+        m = _CONTROL_FLOW_RE.match(expr)
         md = m.groupdict() if m else {}
         if md.get('if'):
             cndn, expr = self._separate_at_paren(expr[m.end() - 1:])
@@ -613,11 +672,7 @@ def dict_item(key, val):
                     return ret, True
             return ret, False
 
-        m = re.match(fr'''(?x)
-                (?P<out>{_NAME_RE})(?:\[(?P<index>{_NESTED_BRACKETS})\])?\s*
-                (?P<op>{"|".join(map(re.escape, set(_OPERATORS) - _COMP_OPERATORS))})?
-                =(?!=)(?P<expr>.*)$
-            ''', expr)
+        m = _ASSIGNMENT_RE.match(expr)
         if m:  # We are assigning a value to a variable
             left_val = local_vars.get(m.group('out'))
 
@@ -640,9 +695,7 @@ def dict_item(key, val):
                 m.group('op'), self._index(left_val, idx), m.group('expr'), expr, local_vars, allow_recursion)
             return left_val[idx], should_return
 
-        for m in re.finditer(rf'''(?x)
-                (?P<pre_sign>\+\+|--)(?P<var1>{_NAME_RE})|
-                (?P<var2>{_NAME_RE})(?P<post_sign>\+\+|--)''', expr):
+        for m in _INCREMENT_RE.finditer(expr):
             var = m.group('var1') or m.group('var2')
             start, end = m.span()
             sign = m.group('pre_sign') or m.group('post_sign')
@@ -655,19 +708,7 @@ def dict_item(key, val):
         if not expr:
             return None, should_return
 
-        m = re.match(fr'''(?x)
-            (?P<return>
-                (?!if|return|true|false|null|undefined|NaN)(?P<name>{_NAME_RE})$
-            )|(?P<attribute>
-                (?P<var>{_NAME_RE})(?:
-                    (?P<nullish>\?)?\.(?P<member>[^(]+)|
-                    \[(?P<member2>{_NESTED_BRACKETS})\]
-                )\s*
-            )|(?P<indexing>
-                (?P<in>{_NAME_RE})\[(?P<idx>.+)\]$
-            )|(?P<function>
-                (?P<fname>{_NAME_RE})\((?P<args>.*)\)$
-            )''', expr)
+        m = _EXPRESSION_RE.match(expr)
         if expr.isdigit():
             return int(expr), should_return
 
@@ -695,28 +736,20 @@ def dict_item(key, val):
                     self._undefined_varnames.add(var)
             return ret, should_return
 
-        with contextlib.suppress(ValueError):
-            return json.loads(js_to_json(expr, strict=True)), should_return
+        json_expr = self._js_to_json(expr)
+        if json_expr is not None:
+            with contextlib.suppress(ValueError):
+                return json.loads(json_expr), should_return
 
         if m and m.group('indexing'):
             val = local_vars[m.group('in')]
             idx = self.interpret_expression(m.group('idx'), local_vars, allow_recursion)
             return self._index(val, idx), should_return
 
-        for op in _OPERATORS:
-            separated = list(self._separate(expr, op))
-            right_expr = separated.pop()
-            while True:
-                if op in '?<>*-' and len(separated) > 1 and not separated[-1].strip():
-                    separated.pop()
-                elif not (separated and op == '?' and right_expr.startswith('.')):
-                    break
-                right_expr = f'{op}{right_expr}'
-                if op != '-':
-                    right_expr = f'{separated.pop()}{op}{right_expr}'
-            if not separated:
-                continue
-            left_val = self.interpret_expression(op.join(separated), local_vars, allow_recursion)
+        separated = self._separate_at_operator(expr)
+        if separated:
+            op, left_expr, right_expr = separated
+            left_val = self.interpret_expression(left_expr, local_vars, allow_recursion)
             return self._operator(op, left_val, right_expr, expr, local_vars, allow_recursion), should_return
 
         if m and m.group('attribute'):
@@ -960,12 +993,13 @@ def call_function(self, funcname, *args):
     def build_function(self, argnames, code, *global_stack):
         global_stack = list(global_stack) or [{}]
         argnames = tuple(argnames)
+        code = code.replace('\n', ' ')
 
         def resf(args, kwargs={}, allow_recursion=100):
             global_stack[0].update(itertools.zip_longest(argnames, args, fillvalue=None))
             global_stack[0].update(kwargs)
             var_stack = LocalNameSpace(*global_stack)
-            ret, should_abort = self.interpret_statement(code.replace('\n', ' '), var_stack, allow_recursion - 1)
+            ret, should_abort = self.interpret_statement(code, var_stack, allow_recursion - 1)
             if should_abort:
                 return ret
         return resf
@@ -1,9 +1,14 @@
 from __future__ import annotations
 
+import collections
 import functools
 import http.client
 import io
+import select
+import socket
 import ssl
+import threading
+import time
 import urllib.error
 import urllib.parse
 import urllib.request
@@ -62,6 +67,76 @@ def _create_http_connection(http_class, source_address, *args, **kwargs):
     return hc
 
 
+class HTTPConnectionPool:
+    """Idle keep-alive connections, kept per host for reuse by HTTPHandler
+
+    At most `maxsize` idle connections are kept per host and connections
+    that have been idle for longer than `idle_timeout` seconds are discarded.
+    """
+
+    def __init__(self, maxsize=10, idle_timeout=30):
+        self.maxsize = maxsize
+        self.idle_timeout = idle_timeout
+        self.hits = self.misses = 0
+        self._idle = collections.defaultdict(collections.deque)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _is_dropped(conn):
+        if conn.sock is None:
+            return True
+        # An idle connection should have nothing to read; if it does, the server has closed it
+        try:
+            return bool(select.select([conn.sock], [], [], 0)[0])
+        except (OSError, ValueError):
+            return True
+
+    def get(self, key):
+        with self._lock:
+            idle = self._idle.get(key)
+            while idle:
+                conn, released = idle.pop()
+                if time.monotonic() - released <= self.idle_timeout and not self._is_dropped(conn):
+                    self.hits += 1
+                    return conn
+                conn.close()
+            self.misses += 1
+        return None
+
+    def put(self, key, conn):
+        with self._lock:
+            idle = self._idle[key]
+            if len(idle) < self.maxsize:
+                idle.append((conn, time.monotonic()))
+                return
+        conn.close()
+
+    def close(self):
+        with self._lock:
+            for idle in self._idle.values():
+                for conn, _ in idle:
+                    conn.close()
+            self._idle.clear()
+
+
+class KeepAliveHTTPResponse(http.client.HTTPResponse):
+    """HTTPResponse that hands its connection back for reuse once the body has been fully read"""
+
+    _release = None
+
+    def close(self):
+        # A connection with unread data left cannot be reused
+        if self.fp is not None and self.length != 0:
+            self._release = None
+        super().close()
+
+    def _close_conn(self):
+        super()._close_conn()
+        release, self._release = self._release, None
+        if release and not self.will_close:
+            release()
+
+
 class HTTPHandler(urllib.request.AbstractHTTPHandler):
     """Handler for HTTP requests and responses.
 
@@ -77,10 +152,14 @@ class HTTPHandler(urllib.request.AbstractHTTPHandler):
     public domain.
     """
 
-    def __init__(self, context=None, source_address=None, *args, **kwargs):
+    # Like urllib3, which retries the requests with these methods by default
+    _IDEMPOTENT_METHODS = frozenset(('GET', 'HEAD', 'OPTIONS'))
+
+    def __init__(self, context=None, source_address=None, *args, connection_pool=None, **kwargs):
         super().__init__(*args, **kwargs)
         self._source_address = source_address
         self._context = context
+        self._connection_pool = connection_pool
 
     @staticmethod
     def _make_conn_class(base, req):
@@ -91,16 +170,83 @@ def _make_conn_class(base, req):
         return conn_class
 
     def http_open(self, req):
+        pool_key = ('http', req.headers.get('Ytdl-socks-proxy'), req.host, req._tunnel_host)
         conn_class = self._make_conn_class(http.client.HTTPConnection, req)
         return self.do_open(functools.partial(
-            _create_http_connection, conn_class, self._source_address), req)
+            _create_http_connection, conn_class, self._source_address), req, pool_key=pool_key)
 
     def https_open(self, req):
+        pool_key = ('https', req.headers.get('Ytdl-socks-proxy'), req.host, req._tunnel_host, self._context)
         conn_class = self._make_conn_class(http.client.HTTPSConnection, req)
         return self.do_open(
             functools.partial(
                 _create_http_connection, conn_class, self._source_address),
-            req, context=self._context)
+            req, pool_key=pool_key, context=self._context)
+
+    def do_open(self, http_class, req, pool_key=None, **http_conn_args):
+        if not self._connection_pool or not self._connection_pool.maxsize:
+            return super().do_open(http_class, req, **http_conn_args)
+
+        # Adapted from urllib.request.AbstractHTTPHandler.do_open, but without "Connection: close"
+        host = req.host
+        if not host:
+            raise urllib.error.URLError('no host given')
+
+        headers = dict(req.unredirected_hdrs)
+        headers.update({k: v for k, v in req.headers.items() if k not in headers})
+        headers = {name.title(): val for name, val in headers.items()}
+        tunnel_headers = {}
+        if req._tunnel_host and 'Proxy-Authorization' in headers:
+            tunnel_headers['Proxy-Authorization'] = headers.pop('Proxy-Authorization')
+
+        # A file-like body has been consumed once the request has been sent
+        replayable = req.data is None or isinstance(req.data, bytes)
+        conn = self._connection_pool.get(pool_key)
+        while True:
+            is_reused = conn is not None
+            retry = False
+            if not is_reused:
+                conn = http_class(host, timeout=req.timeout, **http_conn_args)
+                conn.set_debuglevel(self._debuglevel)
+                if req._tunnel_host:
+                    conn.set_tunnel(req._tunnel_host, headers=tunnel_headers)
+            elif req.timeout is not socket._GLOBAL_DEFAULT_TIMEOUT:
+                conn.timeout = req.timeout
+                conn.sock.settimeout(req.timeout)
+            conn.response_class = KeepAliveHTTPResponse
+            try:
+                try:
+                    conn.request(
+                        req.get_method(), req.selector, req.data, headers,
+                        encode_chunked=req.has_header('Transfer-encoding'))
+                except OSError as err:
+                    # The server has closed the idle connection; retry once over a new one
+                    retry = is_reused and replayable and isinstance(err, (ConnectionError, ssl.SSLEOFError))
+                    if retry:
+                        raise
+                    raise urllib.error.URLError(err)
+                try:
+                    res = conn.getresponse()
+                except (ConnectionError, ssl.SSLEOFError):
+                    # The request may have been processed, so it is only sent again if that has no further effect
+                    retry = is_reused and replayable and req.get_method() in self._IDEMPOTENT_METHODS
+                    raise
+            except BaseException:
+                conn.close()
+                if retry:
+                    conn = None
+                    continue
+                raise
+            break
+
+        res._release = functools.partial(self._connection_pool.put, pool_key, conn)
+        res.url = req.get_full_url()
+        res.msg = res.reason
+        return res
+
+    def close(self):
+        if self._connection_pool:
+            self._connection_pool.close()
 
     @staticmethod
     def deflate(data):
@@ -309,28 +455,44 @@ def read(self, amt=None):
             return b''
         try:
             data = self.fp.read(amt)
-            underlying = getattr(self.fp, 'fp', None)
-            if isinstance(self.fp, http.client.HTTPResponse) and underlying is None:
-                # http.client.HTTPResponse automatically closes itself when fully read
-                self.close()
-            elif isinstance(self.fp, urllib.response.addinfourl) and underlying is not None:
-                # urllib's addinfourl does not close the underlying fp automatically when fully read
-                if isinstance(underlying, io.BytesIO):
-                    # data URLs or in-memory responses (e.g. gzip/deflate/brotli decoded)
-                    if underlying.tell() >= len(underlying.getbuffer()):
-                        self.close()
-                elif isinstance(underlying, io.BufferedReader) and amt is None:
-                    # file URLs.
-                    # XXX: this will not mark the response as closed if it was fully read with amt.
-                    self.close()
-            elif underlying is not None and underlying.closed:
-                # Catch-all for any cases where underlying file is closed
-                self.close()
+            self._close_if_read(amt)
             return data
         except Exception as e:
             handle_response_read_exceptions(e)
             raise e
 
+    def readinto(self, b):
+        if self.closed:
+            return 0
+        elif not hasattr(self.fp, 'readinto'):
+            return super().readinto(b)
+        try:
+            size = self.fp.readinto(b)
+            self._close_if_read(len(b))
+            return size
+        except Exception as e:
+            handle_response_read_exceptions(e)
+            raise e
+
+    def _close_if_read(self, amt):
+        underlying = getattr(self.fp, 'fp', None)
+        if isinstance(self.fp, http.client.HTTPResponse) and underlying is None:
+            # http.client.HTTPResponse automatically closes itself when fully read
+            self.close()
+        elif isinstance(self.fp, urllib.response.addinfourl) and underlying is not None:
+            # urllib's addinfourl does not close the underlying fp automatically when fully read
+            if isinstance(underlying, io.BytesIO):
+                # data URLs or in-memory responses (e.g. gzip/deflate/brotli decoded)
+                if underlying.tell() >= len(underlying.getbuffer()):
+                    self.close()
+            elif isinstance(underlying, io.BufferedReader) and amt is None:
+                # file URLs.
+                # XXX: this will not mark the response as closed if it was fully read with amt.
+                self.close()
+        elif underlying is not None and underlying.closed:
+            # Catch-all for any cases where underlying file is closed
+            self.close()
+
 
 def handle_sslerror(e: ssl.SSLError):
     if not isinstance(e, ssl.SSLError):
@@ -357,11 +519,23 @@ class UrllibRH(RequestHandler, InstanceStoreMixin):
     _SUPPORTED_FEATURES = (Features.NO_PROXY, Features.ALL_PROXY)
     RH_NAME = 'urllib'
 
-    def __init__(self, *, enable_file_urls: bool = False, **kwargs):
+    def __init__(
+        self, *, enable_file_urls: bool = False,
+        keep_alive_pool_size: int = 10, keep_alive_timeout: float = 30, **kwargs,
+    ):
         super().__init__(**kwargs)
         self.enable_file_urls = enable_file_urls
         if self.enable_file_urls:
             self._SUPPORTED_URL_SCHEMES = (*self._SUPPORTED_URL_SCHEMES, 'file')
+        self._connection_pool = HTTPConnectionPool(keep_alive_pool_size, keep_alive_timeout)
+
+    def close(self):
+        pool = self._connection_pool
+        if pool.hits or pool.misses:
+            self._logger.debug(
+                f'{self.RH_NAME}: Keep-alive connection pool: {pool.hits} hits, {pool.misses} misses')
+        self._clear_instances()
+        pool.close()
 
     def _check_extensions(self, extensions):
         super()._check_extensions(extensions)
@@ -376,7 +550,8 @@ def _create_instance(self, proxies, cookiejar, legacy_ssl_support=None):
             HTTPHandler(
                 debuglevel=int(bool(self.verbose)),
                 context=self._make_sslcontext(legacy_ssl_support=legacy_ssl_support),
-                source_address=self.source_address),
+                source_address=self.source_address,
+                connection_pool=self._connection_pool),
             HTTPCookieProcessor(cookiejar),
             DataHandler(),
             UnknownHandler(),
@@ -561,6 +561,12 @@ def read(self, amt: int | None = None) -> bytes:
         except Exception as e:
             raise TransportError(cause=e) from e
 
+    def readinto(self, b) -> int:
+        # Subclasses should redefine this method if they can read into the buffer without a copy.
+        data = self.read(len(b))
+        memoryview(b)[:len(data)] = data
+        return len(data)
+
     def close(self):
         if not self.fp.closed:
             self.fp.close()
@@ -614,6 +614,16 @@ def _preset_alias_callback(option, opt_str, value, parser):
         '--socket-timeout',
         dest='socket_timeout', type=float, default=None, metavar='SECONDS',
         help='Time to wait before giving up, in seconds')
+    network.add_option(
+        '--keep-alive-pool-size',
+        dest='keep_alive_pool_size', type=int, default=None, metavar='N',
+        help=(
+            'Maximum number of idle keep-alive connections to keep open per host '
+            'when the built-in urllib request handler is used. 0 disables connection reuse (default is 10)'))
+    network.add_option(
+        '--keep-alive-timeout',
+        dest='keep_alive_timeout', type=float, default=None, metavar='SECONDS',
+        help='Time after which idle keep-alive connections are closed, in seconds (default is 30)')
     network.add_option(
         '--source-address',
         metavar='IP', dest='source_address', default=None,
@@ -779,11 +789,22 @@ def _preset_alias_callback(option, opt_str, value, parser):
     selection.add_option(
         '--download-archive', metavar='FILE',
         dest='download_archive',
-        help='Download only videos not listed in the archive file. Record the IDs of all downloaded videos in it')
+        help=(
+            'Download only videos not listed in the archive file. Record the IDs of all downloaded videos in it. '
+            'If FILE is an SQLite database (or a new file with a .db, .sqlite or .sqlite3 extension), '
+            'the IDs are looked up in the database instead of being loaded into memory'))
     selection.add_option(
         '--no-download-archive',
         dest='download_archive', action='store_const', const=None,
         help='Do not use archive file (default)')
+    selection.add_option(
+        '--import-archive', metavar='FILE',
+        dest='import_archive', default=None,
+        help='Add the IDs from the text archive FILE to the --download-archive')
+    selection.add_option(
+        '--export-archive', metavar='FILE',
+        dest='export_archive', default=None,
+        help='Write the IDs in the --download-archive to FILE in the text format')
     selection.add_option(
         '--max-downloads',
         dest='max_downloads', metavar='NUMBER', type=int, default=None,
@@ -1011,6 +1032,19 @@ def _preset_alias_callback(option, opt_str, value, parser):
         '-N', '--concurrent-fragments',
         dest='concurrent_fragment_downloads', metavar='N', default=1, type=int,
         help='Number of fragments of a dash/hlsnative video that should be downloaded concurrently (default is %default)')
+    downloader.add_option(
+        '--fragment-hedge-delay',
+        dest='fragment_hedge_delay', metavar='SECONDS', default=None, type=float,
+        help=(
+            'Request a fragment once more over another connection if it holds up writing the '
+            'following fragments for SECONDS (default is disabled). Requires --concurrent-fragments'))
+    downloader.add_option(
+        '--concurrent-streams',
+        dest='concurrent_streams', metavar='N', default=1, type=int,
+        help=(
+            'Number of streams of a video that are downloaded concurrently (default is %default), '
+            'i.e. the formats that are merged and the subtitles, including the live chat replay. '
+            'The --limit-rate is shared between them. The streams of a live video are downloaded one at a time'))
     downloader.add_option(
         '-r', '--limit-rate', '--rate-limit',
         dest='ratelimit', metavar='RATE',
@@ -1060,6 +1094,12 @@ def _preset_alias_callback(option, opt_str, value, parser):
         '--no-keep-fragments',
         action='store_false', dest='keep_fragments',
         help='Delete downloaded fragments after downloading is finished (default)')
+    downloader.add_option(
+        '--fragment-buffer-size',
+        dest='fragment_buffer_size', metavar='SIZE', default=None,
+        help=(
+            'Download fragments into memory instead of writing each of them to disk, e.g. 10M (default is disabled). '
+            'Fragments larger than SIZE are spilled to temporary files. Ignored with --keep-fragments'))
     downloader.add_option(
         '--buffer-size',
         dest='buffersize', metavar='SIZE', default='1024',
@@ -1078,6 +1118,12 @@ def _preset_alias_callback(option, opt_str, value, parser):
         help=(
             'Size of a chunk for chunk-based HTTP downloading, e.g. 10485760 or 10M (default is disabled). '
             'May be useful for bypassing bandwidth throttling imposed by a webserver (experimental)'))
+    downloader.add_option(
+        '--http-connections',
+        dest='http_connections', metavar='N', default=1, type=int,
+        help=(
+            'Number of connections to download a single HTTP file over, each of them fetching a part of the file '
+            '(default is %default). Requires the server to support ranged requests. Not used with --http-chunk-size'))
     downloader.add_option(
         '--test',
         action='store_true', dest='test', default=False,
@@ -1570,6 +1616,20 @@ def _preset_alias_callback(option, opt_str, value, parser):
         '--rm-cache-dir',
         action='store_true', dest='rm_cachedir',
         help='Delete all filesystem cache files')
+    filesystem.add_option(
+        '--cache-backend',
+        metavar='BACKEND', dest='cache_backend', default='files', choices=('files', 'sqlite'),
+        help=(
+            'How to store the cache in the cache dir. One of "files" (one JSON file per entry; default) '
+            'or "sqlite" (a single SQLite database)'))
+    filesystem.add_option(
+        '--cache-max-age',
+        metavar='SECONDS', dest='cache_max_age', default=None, type=float,
+        help='Discard cache entries that are older than SECONDS')
+    filesystem.add_option(
+        '--cache-max-size',
+        metavar='SIZE', dest='cache_max_size', default=None,
+        help='Maximum size of each section of the cache (e.g. 10M). The oldest entries are removed first')
 
     thumbnail = optparse.OptionGroup(parser, 'Thumbnail Options')
     thumbnail.add_option(
@@ -1902,6 +1962,12 @@ def _preset_alias_callback(option, opt_str, value, parser):
         '--extractor-retries',
         dest='extractor_retries', metavar='RETRIES', default=3,
         help='Number of retries for known extractor errors (default is %default), or "infinite"')
+    extractor.add_option(
+        '--concurrent-extractions',
+        dest='concurrent_extractions', metavar='N', default=1, type=int,
+        help=(
+            'Number of playlist entries that are extracted concurrently (default is %default). '
+            'The entries are still filtered and downloaded one at a time and in order'))
     extractor.add_option(
         '--allow-dynamic-mpd', '--no-ignore-dynamic-mpd',
         action='store_true', dest='dynamic_mpd', default=True,
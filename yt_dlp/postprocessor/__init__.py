@@ -16,6 +16,7 @@
     FFmpegFixupTimestampPP,
     FFmpegMergerPP,
     FFmpegMetadataPP,
+    FFmpegPlanPP,
     FFmpegPostProcessor,
     FFmpegSplitChaptersPP,
     FFmpegSubtitlesConvertorPP,
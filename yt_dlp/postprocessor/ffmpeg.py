@@ -1,10 +1,12 @@
 import collections
 import contextvars
 import functools
+import hashlib
 import itertools
 import json
 import os
 import re
+import shutil
 import subprocess
 import time
 
@@ -85,6 +87,9 @@ class FFmpegPostProcessorError(PostProcessingError):
 
 class FFmpegPostProcessor(PostProcessor):
     _ffmpeg_location = contextvars.ContextVar('ffmpeg_location', default=None)
+    # Whether run() only rewrites the file through _stream_copy_file,
+    # so that YoutubeDL can collect its operation into an FFmpegPlanPP
+    _PLANNABLE = False
 
     def __init__(self, downloader=None):
         PostProcessor.__init__(self, downloader)
@@ -128,12 +133,31 @@ def _determine_executables(self):
         return paths
 
     _version_cache, _features_cache = {None: None}, {}
+    # ffprobe output of the recently probed files, by path
+    _probe_cache = collections.OrderedDict()
+    _PROBE_CACHE_SIZE = 64
+
+    def _get_version_output(self, path):
+        """The output of "path -bsfs", which is cached across runs for each build of the executable"""
+        exe = path if os.path.isabs(path) else shutil.which(path)
+        try:
+            stat = os.stat(exe)
+        except (OSError, TypeError):
+            return _get_exe_version_output(path, ['-bsfs'])
+        cache = getattr(self._downloader, 'cache', None)
+        key = hashlib.sha256(f'{os.path.abspath(exe)}\0{stat.st_size}\0{stat.st_mtime_ns}'.encode()).hexdigest()
+        out = cache and traverse_obj(cache.load('ffmpeg', key), ('output', {str}))
+        if not out:
+            out = _get_exe_version_output(path, ['-bsfs'])
+            if out and cache:
+                cache.store('ffmpeg', key, {'output': out})
+        return out
 
     def _get_ffmpeg_version(self, prog):
         path = self._paths.get(prog)
         if path in self._version_cache:
             return self._version_cache[path], self._features_cache.get(path, {})
-        out = _get_exe_version_output(path, ['-bsfs'])
+        out = self._get_version_output(path)
         ver = detect_exe_version(out) if out else False
         if ver:
             regexs = [
@@ -232,6 +256,10 @@ def check_version(self):
     def get_audio_codec(self, path):
         if not self.probe_available and not self.available:
             raise PostProcessingError('ffprobe and ffmpeg not found. Please install or provide the path using --ffmpeg-location')
+        if self.probe_basename == 'ffprobe':
+            return next((
+                stream.get('codec_name') for stream in traverse_obj(self._probe_file(path), ('streams', ..., {dict}))
+                if stream.get('codec_type') == 'audio'), None)
         try:
             if self.probe_available:
                 cmd = [
@@ -273,6 +301,13 @@ def get_metadata_object(self, path, opts=[]):
             raise PostProcessingError('ffprobe not found. Please install or provide the path using --ffmpeg-location')
         self.check_version()
 
+        if not opts:
+            metadata = self._probe_file(path)
+            if metadata is not None:
+                return metadata
+        return json.loads(self._run_ffprobe(path, opts)[0])
+
+    def _run_ffprobe(self, path, opts=[]):
         cmd = [
             self.probe_executable,
             encodeArgument('-hide_banner'),
@@ -285,8 +320,39 @@ def get_metadata_object(self, path, opts=[]):
         cmd += opts
         cmd.append(self._ffmpeg_filename_argument(path))
         self.write_debug(f'ffprobe command line: {shell_quote(cmd)}')
-        stdout, _, _ = Popen.run(cmd, text=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE, stdin=subprocess.PIPE)
-        return json.loads(stdout)
+        stdout, _, returncode = Popen.run(
+            cmd, text=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE, stdin=subprocess.PIPE)
+        return stdout, returncode
+
+    def _probe_file(self, path):
+        """
+        ffprobe the format and streams of a file, reusing the result for as long as the file is unchanged
+        @returns    The parsed ffprobe output, or None if the file could not be probed
+        """
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        path = os.path.abspath(path)
+        # utime is restored after ffmpeg rewrites a file, but the inode and ctime change
+        stat_key = (stat.st_size, stat.st_mtime_ns, stat.st_ctime_ns, stat.st_ino)
+        cached_key, stdout = self._probe_cache.get(path, (None, None))
+        if cached_key != stat_key:
+            try:
+                stdout, returncode = self._run_ffprobe(path)
+            except OSError:
+                return None
+            if returncode != 0:
+                return None
+            self._probe_cache.pop(path, None)
+            self._probe_cache[path] = stat_key, stdout
+            while len(self._probe_cache) > self._PROBE_CACHE_SIZE:
+                self._probe_cache.popitem(last=False)
+        try:
+            # Parsed for each caller, since they may modify the result
+            return json.loads(stdout)
+        except ValueError:
+            return None
 
     def get_stream_number(self, path, keys, value):
         streams = self.get_metadata_object(path)['streams']
@@ -366,6 +432,37 @@ def make_args(file, args, name, number):
     def run_ffmpeg(self, path, out_path, opts, **kwargs):
         return self.run_ffmpeg_multiple_files([path], out_path, opts, **kwargs)
 
+    def _rewrite_file(self, filename, inputs, opts):
+        temp_filename = prepend_extension(filename, 'temp')
+        self.run_ffmpeg_multiple_files([filename, *inputs], temp_filename, opts)
+        os.replace(temp_filename, filename)
+
+    def _stream_copy_file(self, info, message, opts, *, inputs=(), files_to_delete=(), temp_files=(), plannable=True):
+        """
+        Replace info['filepath'] with the output of ffmpeg on it and the extra inputs
+
+        If YoutubeDL is collecting the operations of consecutive postprocessors into an
+        FFmpegPlanPP, the operation is only recorded, to be run together with the others.
+        Input indices in opts count the file as input 0 and the extra inputs from 1
+        @param temp_files   Files that are deleted once the operation has run
+        @returns            The files_to_delete that run() should return
+        """
+        plan = info.get('__ffmpeg_plan')
+        if plan:
+            if plannable and plan.add(self, info, message, opts, inputs, files_to_delete, temp_files):
+                return []
+            plan.run_operations(info)
+        self.to_screen(message)
+        self._rewrite_file(info['filepath'], inputs, opts)
+        self._delete_downloaded_files(*temp_files)
+        return list(files_to_delete)
+
+    def _run_pending_operations(self, info):
+        """Run the operations collected so far, before info['filepath'] is read"""
+        plan = info.get('__ffmpeg_plan')
+        if plan:
+            plan.run_operations(info)
+
     @staticmethod
     def _ffmpeg_filename_argument(fn):
         # Always use 'file:' because the filename may contain ':' (ffmpeg
@@ -580,6 +677,7 @@ def _options(target_ext):
 
 class FFmpegEmbedSubtitlePP(FFmpegPostProcessor):
     SUPPORTED_EXTS = ('mp4', 'mov', 'm4a', 'webm', 'mkv', 'mka')
+    _PLANNABLE = True
 
     def __init__(self, downloader=None, already_have_subtitle=False):
         super().__init__(downloader)
@@ -634,8 +732,6 @@ def run(self, info):
         if not sub_langs:
             return [], info
 
-        input_files = [filename, *sub_filenames]
-
         opts = [
             *self.stream_copy_opts(ext=info['ext']),
             # Don't copy the existing subtitles, we may be running the
@@ -650,16 +746,14 @@ def run(self, info):
                 opts.extend([f'-metadata:s:s:{i}', f'handler_name={name}',
                              f'-metadata:s:s:{i}', f'title={name}'])
 
-        temp_filename = prepend_extension(filename, 'temp')
-        self.to_screen(f'Embedding subtitles in "{filename}"')
-        self.run_ffmpeg_multiple_files(input_files, temp_filename, opts)
-        os.replace(temp_filename, filename)
-
-        files_to_delete = [] if self._already_have_subtitle else sub_filenames
+        files_to_delete = self._stream_copy_file(
+            info, f'Embedding subtitles in "{filename}"', opts, inputs=sub_filenames,
+            files_to_delete=[] if self._already_have_subtitle else sub_filenames)
         return files_to_delete, info
 
 
 class FFmpegMetadataPP(FFmpegPostProcessor):
+    _PLANNABLE = True
 
     def __init__(self, downloader, add_metadata=True, add_chapters=True, add_infojson='if_exists'):
         FFmpegPostProcessor.__init__(self, downloader)
@@ -686,10 +780,12 @@ def run(self, info):
         if self._add_metadata:
             options.extend(self._get_metadata_opts(info))
 
+        infojson_options = []
         if self._add_infojson:
             if info['ext'] in ('mkv', 'mka'):
                 infojson_filename = info.get('infojson_filename')
-                options.extend(self._get_infojson_opts(info, infojson_filename))
+                infojson_options = list(self._get_infojson_opts(info, infojson_filename))
+                options.extend(infojson_options)
                 if not infojson_filename:
                     files_to_delete.append(info.get('infojson_filename'))
             elif self._add_infojson is True:
@@ -699,13 +795,11 @@ def run(self, info):
             self.to_screen('There isn\'t any metadata to add')
             return [], info
 
-        temp_filename = prepend_extension(filename, 'temp')
-        self.to_screen(f'Adding metadata to "{filename}"')
-        self.run_ffmpeg_multiple_files(
-            (filename, metadata_filename), temp_filename,
-            itertools.chain(self._options(info['ext']), *options))
-        self._delete_downloaded_files(*files_to_delete)
-        os.replace(temp_filename, filename)
+        self._stream_copy_file(
+            info, f'Adding metadata to "{filename}"', list(itertools.chain(self._options(info['ext']), *options)),
+            inputs=[metadata_filename] if metadata_filename else [], temp_files=files_to_delete,
+            # The stream numbers of the attachment depend on the other streams of the output
+            plannable=not infojson_options)
         return [], info
 
     @staticmethod
@@ -798,6 +892,7 @@ def _get_infojson_opts(self, info, infofn):
             write_json_file(self._downloader.sanitize_info(info, self.get_param('clean_infojson', True)), infofn)
             info['infojson_filename'] = infofn
 
+        self._run_pending_operations(info)
         old_stream, new_stream = self.get_stream_number(info['filepath'], ('tags', 'mimetype'), 'application/json')
         if old_stream is not None:
             yield ('-map', f'-0:{old_stream}')
@@ -839,7 +934,12 @@ def can_merge(self):
 
 
 class FFmpegFixupPostProcessor(FFmpegPostProcessor):
-    def _fixup(self, msg, filename, options):
+    _PLANNABLE = True
+
+    def _fixup(self, msg, filename, options, info=None):
+        if info is not None:
+            self._stream_copy_file(info, f'{msg} of "{filename}"', list(options))
+            return
         temp_filename = prepend_extension(filename, 'temp')
 
         self.to_screen(f'{msg} of "{filename}"')
@@ -854,7 +954,7 @@ def run(self, info):
         stretched_ratio = info.get('stretched_ratio')
         if stretched_ratio not in (None, 1):
             self._fixup('Fixing aspect ratio', info['filepath'], [
-                *self.stream_copy_opts(), '-aspect', f'{stretched_ratio:f}'])
+                *self.stream_copy_opts(), '-aspect', f'{stretched_ratio:f}'], info)
         return [], info
 
 
@@ -862,7 +962,7 @@ class FFmpegFixupM4aPP(FFmpegFixupPostProcessor):
     @PostProcessor._restrict_to(images=False, video=False)
     def run(self, info):
         if info.get('container') == 'm4a_dash':
-            self._fixup('Correcting container', info['filepath'], [*self.stream_copy_opts(), '-f', 'mp4'])
+            self._fixup('Correcting container', info['filepath'], [*self.stream_copy_opts(), '-f', 'mp4'], info)
         return [], info
 
 
@@ -885,7 +985,7 @@ def run(self, info):
             if self.get_audio_codec(info['filepath']) == 'aac':
                 args.extend(['-bsf:a', 'aac_adtstoasc'])
             self._fixup('Fixing MPEG-TS in MP4 container', info['filepath'], [
-                *self.stream_copy_opts(), *args])
+                *self.stream_copy_opts(), *args], info)
         return [], info
 
 
@@ -906,7 +1006,7 @@ def run(self, info):
             opts = ['-vf', 'setpts=PTS-STARTPTS']
         else:
             opts = ['-c', 'copy', '-bsf', 'setts=ts=TS-STARTPTS']
-        self._fixup('Fixing frame timestamp', info['filepath'], [*opts, *self.stream_copy_opts(False), '-ss', self.trim])
+        self._fixup('Fixing frame timestamp', info['filepath'], [*opts, *self.stream_copy_opts(False), '-ss', self.trim], info)
         return [], info
 
 
@@ -915,7 +1015,7 @@ class FFmpegCopyStreamPP(FFmpegFixupPostProcessor):
 
     @PostProcessor._restrict_to(images=False)
     def run(self, info):
-        self._fixup(self.MESSAGE, info['filepath'], self.stream_copy_opts())
+        self._fixup(self.MESSAGE, info['filepath'], self.stream_copy_opts(), info)
         return [], info
 
 
@@ -927,6 +1027,90 @@ class FFmpegFixupDuplicateMoovPP(FFmpegCopyStreamPP):
     MESSAGE = 'Fixing duplicate MOOV atoms'
 
 
+class FFmpegPlanPP(FFmpegPostProcessor):
+    """
+    Runs the stream copy operations of consecutive postprocessors in a single ffmpeg invocation
+
+    The operations are collected by FFmpegPostProcessor._stream_copy_file while YoutubeDL
+    runs the postprocessors, and are run once a postprocessor that reads the file
+    (or the plan itself) is run. Should the combined command fail, the operations
+    are run one at a time
+    """
+    _Operation = collections.namedtuple('_Operation', ('pp', 'message', 'inputs', 'opts', 'temp_files'))
+    # Options whose value starts with an input index
+    _INPUT_OPTS = {'-map': r'-?', '-map_metadata': '', '-map_chapters': ''}
+
+    def __init__(self, downloader=None):
+        super().__init__(downloader)
+        self._operations = []
+        self._files_to_delete = []
+
+    @classmethod
+    def _own_opts(cls, opts, ext):
+        for base in (list(cls.stream_copy_opts(ext=ext)), list(cls.stream_copy_opts())):
+            if opts[:len(base)] == base:
+                return opts[len(base):]
+        return None
+
+    def _has_own_args(self, pp):
+        key = re.escape(pp.pp_key().lower())
+        return any(re.match(rf'{key}(?:$|[+_])', name) for name in self.get_param('postprocessor_args') or {})
+
+    def add(self, pp, info, message, opts, inputs, files_to_delete, temp_files):
+        """
+        Record an operation of pp on info['filepath']
+        @returns    Whether the operation was recorded. Otherwise, pp has to run it itself
+        """
+        opts = list(opts)
+        # Only operations that copy all the streams of the file can be combined
+        if self._own_opts(opts, info['ext']) is None or self._has_own_args(pp):
+            return False
+        if any(type(op.pp) is type(pp) for op in self._operations):
+            self.run_operations(info)
+        pp.to_screen(message)
+        self._operations.append(self._Operation(pp, message, list(inputs), opts, list(temp_files)))
+        self._files_to_delete.extend(files_to_delete)
+        return True
+
+    @classmethod
+    def _combine(cls, operations, ext):
+        inputs, opts = [], list(cls.stream_copy_opts(ext=ext))
+        for op in operations:
+            offset = len(inputs)
+            inputs.extend(op.inputs)
+            own_opts = iter(cls._own_opts(op.opts, ext))
+            for opt in own_opts:
+                opts.append(opt)
+                sign = cls._INPUT_OPTS.get(opt.split(':')[0])
+                if sign is not None:
+                    opts.append(re.sub(
+                        rf'^({sign})([1-9]\d*)', lambda m: f'{m.group(1)}{int(m.group(2)) + offset}', next(own_opts)))
+        return inputs, opts
+
+    def run_operations(self, info):
+        operations, self._operations = self._operations, []
+        if not operations:
+            return
+        filename = info['filepath']
+        if len(operations) == 1:
+            operations[0].pp._rewrite_file(filename, operations[0].inputs, operations[0].opts)
+        else:
+            self.to_screen(f'Running {len(operations)} operations in a single pass on "{filename}"')
+            try:
+                self._rewrite_file(filename, *self._combine(operations, info['ext']))
+            except FFmpegPostProcessorError as e:
+                self.report_warning(f'Unable to run the operations in a single pass: {e.msg}; running them one at a time')
+                for op in operations:
+                    op.pp.to_screen(op.message)
+                    op.pp._rewrite_file(filename, op.inputs, op.opts)
+        self._delete_downloaded_files(*itertools.chain.from_iterable(op.temp_files for op in operations))
+
+    def run(self, info):
+        self.run_operations(info)
+        files_to_delete, self._files_to_delete = self._files_to_delete, []
+        return files_to_delete, info
+
+
 class FFmpegSubtitlesConvertorPP(FFmpegPostProcessor):
     SUPPORTED_EXTS = MEDIA_EXTENSIONS.subtitles
 
@@ -770,14 +770,21 @@ def expand_path(s):
     return os.path.expandvars(compat_expanduser(s))
 
 
-def orderedSet(iterable, *, lazy=False):
-    """Remove all duplicates from the input iterable"""
+def orderedSet(iterable, *, lazy=False, key=None):
+    """Remove all duplicates from the input iterable, comparing key(item) if key is given"""
     def _iter():
-        seen = []  # Do not use set since the items can be unhashable
+        seen, seen_unhashable = set(), []  # The items can be unhashable
         for x in iterable:
-            if x not in seen:
-                seen.append(x)
-                yield x
+            k = x if key is None else key(x)
+            try:
+                if k in seen:
+                    continue
+                seen.add(k)
+            except TypeError:
+                if k in seen_unhashable:
+                    continue
+                seen_unhashable.append(k)
+            yield x
 
     return _iter() if lazy else list(_iter())
 
@@ -2411,7 +2418,25 @@ class PlaylistEntries:
     MissingEntry = object()
     is_exhausted = False
 
-    def __init__(self, ydl, info_dict):
+    class _EntryStream:
+        """Entries that are read in increasing order without being kept in memory"""
+
+        def __init__(self, iterable):
+            self._iterable = iter(iterable)
+            self._index, self._entry = -1, None
+
+        def __getitem__(self, i):
+            assert i >= self._index, 'streamed entries cannot be read again'
+            while self._index < i:
+                try:
+                    self._entry = next(self._iterable)
+                except StopIteration:
+                    raise LazyList.IndexError(i)
+                self._index += 1
+            return self._entry
+
+    def __init__(self, ydl, info_dict, *, stream=False):
+        """@param stream    Do not keep the entries of a generator in memory, if they are requested in order"""
         self.ydl = ydl
 
         # _entries must be assigned now since infodict can change during iteration
@@ -2430,6 +2455,8 @@ def __init__(self, ydl, info_dict):
                 self._entries[i - 1] = entry
         elif isinstance(entries, (list, PagedList, LazyList)):
             self._entries = entries
+        elif stream and self._is_in_order(self._get_playlist_items()):
+            self._entries = self._EntryStream(entries)
         else:
             self._entries = LazyList(entries)
 
@@ -2453,7 +2480,21 @@ def parse_playlist_items(cls, string):
                 raise ValueError(f'Step in {segment!r} cannot be zero')
             yield slice(int_or_none(start), float_or_none(end), int_or_none(step)) if has_range else int(start)
 
-    def get_requested_items(self):
+    @classmethod
+    def _is_in_order(cls, playlist_items):
+        """Whether the items are requested in increasing order, from the start of the playlist"""
+        last = 0
+        try:
+            for index in cls.parse_playlist_items(playlist_items):
+                start, stop, step = (index, index, 1) if isinstance(index, int) else (index.start, index.stop, index.step)
+                if (start or 1) <= last or (stop or 0) < 0 or (step or 1) < 0:
+                    return False
+                last = stop or math.inf
+        except ValueError:
+            return False
+        return True
+
+    def _get_playlist_items(self):
         playlist_items = self.ydl.params.get('playlist_items')
         playlist_start = self.ydl.params.get('playliststart', 1)
         playlist_end = self.ydl.params.get('playlistend')
@@ -2461,11 +2502,13 @@ def get_requested_items(self):
         if playlist_end in (-1, None):
             playlist_end = ''
         if not playlist_items:
-            playlist_items = f'{playlist_start}:{playlist_end}'
+            return f'{playlist_start}:{playlist_end}'
         elif playlist_start != 1 or playlist_end:
             self.ydl.report_warning('Ignoring playliststart and playlistend because playlistitems was given', only_once=True)
+        return playlist_items
 
-        for index in self.parse_playlist_items(playlist_items):
+    def get_requested_items(self):
+        for index in self.parse_playlist_items(self._get_playlist_items()):
             for i, entry in self[index]:
                 yield i, entry
                 if not entry:
@@ -2479,7 +2522,9 @@ def get_requested_items(self):
                     return
 
     def get_full_count(self):
-        if self.is_exhausted and not self.is_incomplete:
+        if isinstance(self._entries, self._EntryStream):
+            return None
+        elif self.is_exhausted and not self.is_incomplete:
             return len(self)
         elif isinstance(self._entries, InAdvancePagedList):
             if self._entries._pagesize == 1:
@@ -5433,6 +5478,7 @@ def __init__(self, ydl, field_preference):
         self.ydl = ydl
         self._order = []
         self.evaluate_params(self.ydl.params, field_preference)
+        self._field_keys = [self._build_field_key(field) for field in self._order]
         if ydl.params.get('verbose'):
             self.print_verbose_info(self.ydl.write_debug)
 
@@ -5599,6 +5645,77 @@ def _calculate_field_preference(self, format_, field):
             value = get_value(field)
         return self._calculate_field_preference_from_value(format_, field, type_, value)
 
+    def _build_order_function(self, field):
+        order_list = (self._use_free_order and self._get_field_setting(field, 'order_free')) or self._get_field_setting(field, 'order')
+        list_length = len(order_list)
+        empty_pos = order_list.index('') if '' in order_list else list_length + 1
+        regexes = self._get_field_setting(field, 'regex') and [
+            (re.compile(regex).match, list_length - i) for i, regex in enumerate(order_list) if regex]
+
+        @functools.lru_cache(maxsize=256)
+        def order(value):
+            if value is None:
+                return list_length - (order_list.index(value) if value in order_list else empty_pos)
+            value = value.lower()
+            if regexes:
+                return next((preference for match, preference in regexes if match(value)), list_length - empty_pos)
+            return list_length - (order_list.index(value) if value in order_list else empty_pos)
+        return order
+
+    def _build_field_key(self, field):
+        """ Compile the settings of a field into a function that calculates its preference for a format
+        Equivalent to _calculate_field_preference, but does not look up the settings for every format
+        """
+        type_ = self._get_field_setting(field, 'type')
+        if type_ == 'ordered' and self._get_field_setting(field, 'convert') == 'order':
+            convert = self._build_order_function(field)
+        elif type_ == 'ordered':  # The conversion can change the settings while sorting
+            return lambda format_: self._calculate_field_preference(format_, field)
+        elif type_ == 'extractor':
+            maximum = self._get_field_setting(field, 'max')
+            convert = lambda value: -1 if value is None or (maximum is not None and value >= maximum) else value
+        elif type_ == 'boolean':
+            in_list = self._get_field_setting(field, 'in_list')
+            not_in_list = self._get_field_setting(field, 'not_in_list')
+            convert = lambda value: 0 if ((in_list is None or value in in_list) and (not_in_list is None or value not in not_in_list)) else -1
+        else:
+            convert = None
+
+        if type_ == 'multiple':
+            function = self._get_field_setting(field, 'function')
+            keys = [self._get_field_setting(f, 'field') for f in self._get_field_setting(field, 'field')]
+            get_value = lambda format_: function(format_.get(key) for key in keys)
+        else:
+            key = self._get_field_setting(field, 'field')
+            get_value = lambda format_: format_.get(key)
+
+        reverse = self._get_field_setting(field, 'reverse')
+        closest = self._get_field_setting(field, 'closest')
+        limit = self._get_field_setting(field, 'limit')
+        default = self._get_field_setting(field, 'default')
+        is_string = self._get_field_setting(field, 'convert') == 'string'
+
+        def field_key(format_):
+            value = get_value(format_)
+            if convert:
+                value = convert(value)
+            # try to convert to number; float_or_none is not used since it is comparatively slow
+            try:
+                val_num = default if value is None else float(value)
+            except (ValueError, TypeError):
+                val_num = default
+            is_num = not is_string and val_num is not None
+            if is_num:
+                value = val_num
+
+            return ((-10, 0) if value is None
+                    else (1, value, 0) if not is_num  # if a field has mixed strings and numbers, strings are sorted higher
+                    else (0, -abs(value - limit), value - limit if reverse else limit - value) if closest
+                    else (0, value, 0) if not reverse and (limit is None or value <= limit)
+                    else (0, -value, 0) if limit is None or (reverse and value == limit) or value > limit
+                    else (-1, value, 0))
+        return field_key
+
     @staticmethod
     def _fill_sorting_fields(format):
         # Determine missing protocol
@@ -5637,7 +5754,7 @@ def _fill_sorting_fields(format):
 
     def calculate_preference(self, format):
         self._fill_sorting_fields(format)
-        return tuple(self._calculate_field_preference(format, field) for field in self._order)
+        return tuple(field_key(format) for field_key in self._field_keys)
 
 
 def filesize_from_tbr(tbr, duration):
@@ -15,7 +15,6 @@ class ProgressCalculator:
 
     def __init__(self, initial: int):
         self._initial = initial or 0
-        self.downloaded = self._initial
 
         self.elapsed: float = 0
         self.speed = SmoothValue(0, smoothing=0.7)
@@ -25,54 +24,75 @@ def __init__(self, initial: int):
         self._start_time = time.monotonic()
         self._last_update = self._start_time
 
+        # Each thread only writes to its own entries, so updating them does not need
+        # the lock. It is only held while sampling the speed
         self._lock = threading.Lock()
         self._thread_sizes: dict[int, int] = {}
+        self._thread_downloaded: dict[int, int] = {}
 
         self._times = [self._start_time]
         self._downloaded = [self.downloaded]
 
+    @property
+    def downloaded(self):
+        return self._initial + sum(self._thread_downloaded.copy().values())
+
     @property
     def total(self):
         return self._total
 
     @total.setter
     def total(self, value: int | None):
-        with self._lock:
-            if value is not None and value < self.downloaded:
-                value = self.downloaded
-
-            self._total = value
+        if value is not None:
+            value = max(value, self.downloaded)
+        self._total = value
 
     def thread_reset(self):
+        self._thread_sizes[threading.get_ident()] = 0
+
+    def thread_discard(self):
+        """Stop counting what the current thread downloaded since its last reset, e.g. an aborted download"""
         current_thread = threading.get_ident()
-        with self._lock:
-            self._thread_sizes[current_thread] = 0
+        size = self._thread_sizes.get(current_thread, 0)
+        self._thread_sizes[current_thread] = 0
+        self._thread_downloaded[current_thread] = self._thread_downloaded.get(current_thread, 0) - size
+        self._update()
 
     def update(self, size: int | None):
         if not size:
             return
 
         current_thread = threading.get_ident()
+        last_size = self._thread_sizes.get(current_thread, 0)
+        self._thread_sizes[current_thread] = size
+        self._thread_downloaded[current_thread] = self._thread_downloaded.get(current_thread, 0) + size - last_size
+        self._update()
 
-        with self._lock:
-            last_size = self._thread_sizes.get(current_thread, 0)
-            self._thread_sizes[current_thread] = size
-            self._update(size - last_size)
-
-    def _update(self, size: int):
+    def _update(self):
         current_time = time.monotonic()
 
-        self.downloaded += size
+        downloaded = self.downloaded
         self.elapsed = current_time - self._start_time
-        if self.total is not None and self.downloaded > self.total:
-            self._total = self.downloaded
+        if self._total is not None and downloaded > self._total:
+            self._total = downloaded
+
+        if self._last_update + self.SAMPLING_RATE > current_time:
+            return
+        # Another thread is already sampling
+        if not self._lock.acquire(blocking=False):
+            return
+        try:
+            self._sample(current_time, downloaded)
+        finally:
+            self._lock.release()
 
+    def _sample(self, current_time: float, downloaded: int):
         if self._last_update + self.SAMPLING_RATE > current_time:
             return
         self._last_update = current_time
 
         self._times.append(current_time)
-        self._downloaded.append(self.downloaded)
+        self._downloaded.append(downloaded)
 
         offset = bisect.bisect_left(self._times, current_time - self.SAMPLING_WINDOW)
         del self._times[:offset]
@@ -86,9 +106,9 @@ def _update(self, size: int):
         if not download_time:
             return
 
-        self.speed.set((self.downloaded - self._downloaded[0]) / download_time)
+        self.speed.set((downloaded - self._downloaded[0]) / download_time)
         if self.total and self.speed.value and self.elapsed > self.GRACE_PERIOD:
-            self.eta.set((self.total - self.downloaded) / self.speed.value)
+            self.eta.set((self.total - downloaded) / self.speed.value)
         else:
             self.eta.reset()
 
@@ -107,3 +127,26 @@ def set(self, value: float):
 
     def reset(self):
         self.value = self.smooth = self._initial
+
+
+class RateLimiter:
+    """Keeps the combined speed of the downloads that share it under a rate limit"""
+    # Time for which unused bandwidth can be used up later (seconds)
+    BURST = 1
+
+    def __init__(self, rate: float):
+        self.rate = rate
+        self._lock = threading.Lock()
+        # The time by which all the bytes consumed so far may have been downloaded
+        self._allowed_time = time.monotonic()
+
+    def consume(self, size: int):
+        """Sleep until size more bytes can be downloaded without exceeding the rate"""
+        if not size:
+            return
+        with self._lock:
+            now = time.monotonic()
+            self._allowed_time = max(self._allowed_time, now - self.BURST) + size / self.rate
+            delay = self._allowed_time - now
+        if delay > 0:
+            time.sleep(delay)
@@ -0,0 +1,15 @@
+# Autogenerated by devscripts/update-version.py
+
+__version__ = '2026.10.18'
+
+RELEASE_GIT_HEAD = '18394d2c7785d8d4d55f336ec1534debd3efcb98'
+
+VARIANT = None
+
+UPDATE_HINT = None
+
+CHANNEL = 'stable'
+
+ORIGIN = 'local'
+
+_pkg_version = '2026.10.18'